@@ -1,14 +1,10 @@
+import importlib
+
 import streamlit as st
-import pandas as pd
 
-# Import page modules
-import home
-import marathon_performance
-import training_metrics
-import heart_rate_analysis
-import route_visualization
-import background
-import contact
+# Page table, dataset loaders and theme colors (shared with static_site.py)
+from page_registry import COLORS, PAGES, load_dataset
+from athletes import DEFAULT_ATHLETE, SESSION_KEY, athlete_profile, list_athletes
 
 # Page configuration for a wide layout
 st.set_page_config(
@@ -17,7 +13,7 @@ st.set_page_config(
     layout="wide"                         # Use full width of the page
 )
 
-colors = ["#00d9ff", "#b957ff", "#1a0d2e", "#0a0420", "#e0f4ff"]
+colors = COLORS
 
 # Load external CSS file and add enhancements
 def load_css(file_path):
@@ -206,58 +202,31 @@ with st.sidebar:
     st.title("The Sub-3:30 Protocol")
     st.markdown("<hr>", unsafe_allow_html=True)
 
+    # Athlete whose data the pages show (?athlete=<id> links to one); data
+    # modules read it from the session, fragment reruns included
+    athlete_ids = list_athletes()
+    if st.session_state.get(SESSION_KEY) not in athlete_ids:
+        requested = st.query_params.get("athlete", DEFAULT_ATHLETE)
+        st.session_state[SESSION_KEY] = requested if requested in athlete_ids else DEFAULT_ATHLETE
+    if len(athlete_ids) > 1:
+        st.selectbox("Athlete", athlete_ids, key=SESSION_KEY, format_func=lambda athlete_id: athlete_profile(athlete_id)['name'])
+        st.query_params["athlete"] = st.session_state[SESSION_KEY]
+        st.markdown("<hr>", unsafe_allow_html=True)
+
     # Navigation Menu
     page = st.radio(
         "Navigation",
-        ["Home", "Project Background", "Race Performance Analytics", "Training Volume Analysis", "Cardiovascular Efficiency", "Geospatial Visualization", "Contact"],
+        list(PAGES),
         label_visibility="collapsed"
     )
 
     st.markdown("<hr>", unsafe_allow_html=True)
 
-# Load datasets
-activities_df = pd.read_csv("datasets/activities_dataset.csv")
-challenges_df = pd.read_csv("datasets/global_challenges.csv")
-vo2max_df = pd.read_csv("datasets/VO₂ Max.csv", skiprows=1, names=['Month', 'Activity Type', 'VO2 Max'])
-
-# Prepare Heart Rate Data
-# Filter out race distances (marathons > 40km) and ensure HR data exists
-df_hr = activities_df[
-    (activities_df['Activity Type'] == 'Run') &
-    (activities_df['Average Heart Rate'].notna()) &
-    (activities_df['Distance'] <= 40)
-].copy()
-
-# Parse dates and add Year column
-df_hr['Activity Date'] = pd.to_datetime(df_hr['Activity Date'], format="%b %d, %Y, %I:%M:%S %p")
-df_hr['Year'] = df_hr['Activity Date'].dt.year
-
-# Calculate pace
-df_hr['Pace (min/km)'] = 1000 / (df_hr['Average Speed'] * 60)
-df_hr = df_hr.rename(columns={'Average Heart Rate': 'Avg HR (bpm)'})
-
 # PAGE ROUTING
-if page == "Home":
-    home.render(colors)
-
-elif page == "Project Background":
-    background.render(colors)
-
-elif page == "Race Performance Analytics":
-    marathon_performance.render(colors, vo2max_df)
-
-elif page == "Training Volume Analysis":
-    training_metrics.render(colors, activities_df)
-
-elif page == "Cardiovascular Efficiency":
-    heart_rate_analysis.render(colors, df_hr)
-
-elif page == "Geospatial Visualization":
-    route_visualization.render(colors)
-
-elif page == "Contact":
-    contact.render(colors)
-
+# Datasets are parsed once per process and re-read only when their files
+# change; each page loads just the ones it renders.
+module_name, datasets = PAGES[page]
+importlib.import_module(module_name).render(colors, *(load_dataset(name) for name in datasets))
 
 
 # Footer (displayed on all pages)
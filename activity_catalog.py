@@ -0,0 +1,156 @@
+"""
+Activity Catalog
+
+A compact, date-sorted metadata index of every activity, built from the
+Strava export without opening any activity files; pages search and filter
+it through the activity store (activity_store), which is built from it.
+Per-activity values derived from GPS tracks at ingest (track summaries)
+are stored separately and joined in by activity ID, as are tracks
+assigned from bulk export files to activities without their own file.
+The catalog is persisted next to the track cache and rebuilt
+automatically when any of these sources change.
+"""
+
+import os
+import pickle
+from typing import Optional
+
+import pandas as pd
+
+from athletes import athlete_path
+from bulk_import import BULK_MATCHES_PATH, load_bulk_matches
+from data_loader import ACTIVITIES_CSV, load_activities
+from track_store import CACHE_DIR
+
+CATALOG_PATH = os.path.join(CACHE_DIR, "activity_catalog.pkl")
+TRACK_SUMMARIES_PATH = os.path.join(CACHE_DIR, "track_summaries.pkl")
+
+# Bump when the catalog's columns change so persisted catalogs are rebuilt
+CATALOG_VERSION = 2
+
+# Activities at or above this distance are treated as races (marathons)
+MARATHON_MIN_KM = 42.0
+
+# Named races in the export that aren't marathon distance or flagged as competitions
+RACE_NAME_PATTERN = r"Marathon, \d{4}|Half Marathon|Colonist 10K|^TC10K$"
+
+
+def source_signature(path: str) -> tuple:
+    """Identify a version of a source file by (size, mtime); None if it doesn't exist."""
+    path = athlete_path(path)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def catalog_signature(
+    dataset_path: str = ACTIVITIES_CSV,
+    summaries_path: str = TRACK_SUMMARIES_PATH,
+    bulk_matches_path: str = BULK_MATCHES_PATH,
+) -> tuple:
+    """Identify the versions of the sources the catalog is built from."""
+    return (CATALOG_VERSION, source_signature(dataset_path), source_signature(summaries_path), source_signature(bulk_matches_path))
+
+
+def build_catalog(
+    activities_df: pd.DataFrame,
+    track_summaries: Optional[pd.DataFrame] = None,
+    bulk_matches: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Build the activity catalog from the Strava activities export.
+
+    Args:
+        activities_df (pd.DataFrame): Activities export from data_loader.load_activities
+        track_summaries (pd.DataFrame, optional): Per-activity track values keyed by 'activity_id'
+        bulk_matches (pd.DataFrame, optional): Track references from bulk files keyed by
+            'activity_id'; used as the filename of activities without their own file
+
+    Returns:
+        pd.DataFrame sorted by date with columns ['activity_id', 'date', 'name',
+        'type', 'distance_km', 'moving_time_s', 'avg_heart_rate', 'filename',
+        'is_race'] plus any track summary columns (NaN for activities without
+        a track)
+    """
+    names = activities_df['Activity Name'].fillna('')
+    distance_km = activities_df['Distance']
+
+    catalog = pd.DataFrame({
+        'activity_id': activities_df['Activity ID'],
+        'date': activities_df['Activity Date'],
+        'name': names,
+        'type': activities_df['Activity Type'],
+        'distance_km': distance_km,
+        'moving_time_s': activities_df['Moving Time'],
+        'avg_heart_rate': activities_df['Average Heart Rate'],
+        'filename': activities_df['Filename'].fillna(''),
+        'is_race': activities_df['Competition'] | (distance_km >= MARATHON_MIN_KM) | names.str.contains(RACE_NAME_PATTERN, case=False),
+    })
+
+    if bulk_matches is not None and len(bulk_matches) > 0:
+        bulk_files = catalog['activity_id'].map(bulk_matches.set_index('activity_id')['filename'])
+        catalog['filename'] = catalog['filename'].mask((catalog['filename'] == '') & bulk_files.notna(), bulk_files)
+
+    if track_summaries is not None and len(track_summaries) > 0:
+        catalog = catalog.merge(track_summaries, on='activity_id', how='left')
+
+    return catalog.sort_values('date', kind='stable').reset_index(drop=True)
+
+
+def load_catalog(
+    dataset_path: str = ACTIVITIES_CSV,
+    catalog_path: str = CATALOG_PATH,
+    summaries_path: str = TRACK_SUMMARIES_PATH,
+    bulk_matches_path: str = BULK_MATCHES_PATH,
+) -> pd.DataFrame:
+    """
+    Load the persisted catalog, rebuilding it if the source CSV, the
+    track summaries or the bulk file matches have changed.
+
+    Returns:
+        pd.DataFrame catalog (see build_catalog)
+    """
+    dataset_path = athlete_path(dataset_path)
+    catalog_path = athlete_path(catalog_path)
+    summaries_path = athlete_path(summaries_path)
+    bulk_matches_path = athlete_path(bulk_matches_path)
+    signature = catalog_signature(dataset_path, summaries_path, bulk_matches_path)
+
+    if os.path.exists(catalog_path):
+        with open(catalog_path, 'rb') as f:
+            stored = pickle.load(f)
+        if stored.get('source') == signature:
+            return stored['catalog']
+
+    catalog = build_catalog(load_activities(dataset_path), load_track_summaries(summaries_path), load_bulk_matches(bulk_matches_path))
+    save_catalog(catalog, signature, catalog_path)
+    return catalog
+
+
+def load_track_summaries(summaries_path: str = TRACK_SUMMARIES_PATH) -> Optional[pd.DataFrame]:
+    """Load the per-activity track summaries written at ingest, if any."""
+    summaries_path = athlete_path(summaries_path)
+    if not os.path.exists(summaries_path):
+        return None
+    return pd.read_pickle(summaries_path)
+
+
+def save_track_summaries(summaries: pd.DataFrame, summaries_path: str = TRACK_SUMMARIES_PATH) -> None:
+    """Persist per-activity track summaries (one row per 'activity_id')."""
+    summaries_path = athlete_path(summaries_path)
+    os.makedirs(os.path.dirname(summaries_path), exist_ok=True)
+    tmp_path = f"{summaries_path}.{os.getpid()}.tmp"
+    summaries.to_pickle(tmp_path)
+    os.replace(tmp_path, summaries_path)
+
+
+def save_catalog(catalog: pd.DataFrame, signature: tuple, catalog_path: str = CATALOG_PATH) -> None:
+    """Persist the catalog with the signature of the sources it was built from."""
+    catalog_path = athlete_path(catalog_path)
+    os.makedirs(os.path.dirname(catalog_path), exist_ok=True)
+    tmp_path = f"{catalog_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'source': signature, 'catalog': catalog}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, catalog_path)
+
@@ -0,0 +1,145 @@
+"""
+Enriched Activities
+
+The canonical activities frame every page works from. The columns pages
+used to derive on each rerun (period keys, pace, heart-rate zone, distance
+category, workout type, grade-adjusted pace) are computed once per data
+version with vectorized operations and cached process-wide, so a rerun
+only filters the shared frame. Heart-rate zones are relative to the active
+athlete's maximum heart rate (see athletes).
+"""
+
+import numpy as np
+import pandas as pd
+
+from activity_catalog import catalog_signature, load_catalog
+from athletes import max_heart_rate
+from data_loader import ACTIVITIES_CSV, cached_frame, data_version, load_activities
+
+# Heart rate zone constants
+ZONE2_LOWER_PCT = 0.60  # Zone 2 lower bound (60% of max HR)
+ZONE2_UPPER_PCT = 0.70  # Zone 2 upper bound (70% of max HR)
+
+# Upper bounds (share of max HR) and labels of the heart-rate zones
+HR_ZONES = [
+    (0.60, 'Recovery (< 60%)'),
+    (0.70, 'Zone 2 (60-70%)'),
+    (0.80, 'Moderate (70-80%)'),
+    (0.90, 'Threshold (80-90%)'),
+    (np.inf, 'Maximum (> 90%)'),
+]
+
+# Upper bounds (km) and labels of the run distance categories
+DISTANCE_CATEGORIES = [
+    (5, 'Recovery (< 5km)'),
+    (10, 'Short (5-10km)'),
+    (15, 'Medium (10-15km)'),
+    (25, 'Long (15-25km)'),
+    (np.inf, 'Ultra Long (> 25km)'),
+]
+
+# Runs at or above this distance without another workout keyword are long runs
+LONG_RUN_MIN_KM = 18
+
+# Activities above this distance are races, left out of heart-rate trends
+HR_MAX_DISTANCE_KM = 40
+
+
+def _bucket(values: pd.Series, bounds) -> np.ndarray:
+    """Label of the first bucket whose upper bound a value is below (None for NaN)."""
+    labels = np.array([label for _, label in bounds], dtype=object)
+    index = np.searchsorted(np.array([bound for bound, _ in bounds]), values.to_numpy(dtype=float), side='right')
+    result = labels[np.minimum(index, len(labels) - 1)]
+    result[values.isna().to_numpy()] = None
+    return result
+
+
+def workout_types(activities: pd.DataFrame) -> np.ndarray:
+    """Workout type of each activity from keywords in its name and description."""
+    name = activities['Activity Name'].fillna('').str.lower()
+    desc = activities['Activity Description'].fillna('').str.lower()
+
+    def named(*words):
+        return np.logical_or.reduce([name.str.contains(word, regex=False).to_numpy() for word in words])
+
+    def described(*words):
+        return np.logical_or.reduce([desc.str.contains(word, regex=False).to_numpy() for word in words])
+
+    zone2 = named('zone 2') | described('z2')
+    # First matching rule wins
+    rules = [
+        (zone2 & named('long'), 'Long Run (Zone 2)'),
+        (zone2, 'Easy/Zone 2'),
+        (named('tempo') | described('tempo'), 'Tempo'),
+        (named('track', 'repeats') | described('800m', '400m', '200m'), 'Track/Intervals'),
+        (named('marathon pace') | described('marathon pace'), 'Marathon Pace'),
+        (named('speedwork', 'hill'), 'Speedwork/Hills'),
+        (named('shakeout'), 'Shakeout'),
+        (activities['Distance'].to_numpy() >= LONG_RUN_MIN_KM, 'Long Run'),
+    ]
+    return np.select([mask for mask, _ in rules], [label for _, label in rules], default='Easy Run').astype(object)
+
+
+def enrich_activities(activities: pd.DataFrame, catalog: pd.DataFrame = None, max_hr: float = None) -> pd.DataFrame:
+    """
+    Add the derived columns pages use to the activities export.
+
+    Args:
+        activities (pd.DataFrame): Frame from data_loader.load_activities
+        catalog (pd.DataFrame, optional): Activity catalog, for grade-adjusted pace
+        max_hr (float, optional): Maximum heart rate (bpm) the zones are relative
+            to; defaults to the active athlete's
+
+    Returns:
+        pd.DataFrame with the export columns plus 'Year', 'Month' and 'Week'
+        (periods), 'Week_Start', 'Pace (min/km)', 'HR_Zone',
+        'Distance_Category', 'Workout_Type' and 'GAP (min/km)' (NaN until
+        ingest has run)
+    """
+    enriched = activities.copy()
+    dates = enriched['Activity Date']
+    enriched['Year'] = dates.dt.year
+    enriched['Month'] = dates.dt.to_period('M')
+    enriched['Week'] = dates.dt.to_period('W')
+    enriched['Week_Start'] = enriched['Week'].dt.start_time
+
+    with np.errstate(divide='ignore'):
+        enriched['Pace (min/km)'] = 1000 / (enriched['Average Speed'] * 60)
+    enriched['HR_Zone'] = _bucket(enriched['Average Heart Rate'] / (max_hr or max_heart_rate()), HR_ZONES)
+    enriched['Distance_Category'] = _bucket(enriched['Distance'], DISTANCE_CATEGORIES)
+    enriched['Workout_Type'] = workout_types(enriched)
+
+    gap_pace = np.nan
+    if catalog is not None and 'gap_pace_min_km' in catalog.columns:
+        gap_pace = enriched['Activity ID'].map(catalog.set_index('activity_id')['gap_pace_min_km'])
+    enriched['GAP (min/km)'] = gap_pace
+    return enriched
+
+
+def enriched_version() -> tuple:
+    """Identify the inputs of the enriched frame (activities export, catalog and max heart rate)."""
+    return (data_version(ACTIVITIES_CSV), catalog_signature(), max_heart_rate())
+
+
+def load_enriched_activities() -> pd.DataFrame:
+    """Canonical enriched activities frame, cached per data version (read-only)."""
+    return cached_frame('enriched_activities', enriched_version(), lambda: enrich_activities(load_activities(), load_catalog()))
+
+
+def load_heart_rate_activities() -> pd.DataFrame:
+    """
+    Runs with heart-rate data for the cardiovascular pages, races left out.
+
+    Returns:
+        Read-only enriched rows with 'Average Heart Rate' as 'Avg HR (bpm)'
+    """
+    def build():
+        enriched = load_enriched_activities()
+        runs = enriched[
+            (enriched['Activity Type'] == 'Run') &
+            (enriched['Average Heart Rate'].notna()) &
+            (enriched['Distance'] <= HR_MAX_DISTANCE_KM)
+        ]
+        return runs.rename(columns={'Average Heart Rate': 'Avg HR (bpm)'})
+
+    return cached_frame('heart_rate_activities', enriched_version(), build)
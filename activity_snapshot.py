@@ -0,0 +1,254 @@
+"""
+Activities Snapshot
+
+A typed, columnar copy of the Strava activities export. Ingest writes
+every column of activities_dataset.csv as its own .npy file plus a
+schema.json describing them, so loading the activities is a memory-map of
+binary arrays instead of parsing ~100 columns of CSV text.
+
+The export repeats several column names (Distance in km and again in
+metres, Elapsed Time, Max Heart Rate, Relative Effort, Commute), which
+pandas would silently suffix with ".1". The snapshot gives every column a
+unique snake_case name with its unit (distance_km vs distance_m), parses
+dates and epoch timestamps, and stores booleans as booleans. The schema
+records the source header of each column and the content hash of the CSV
+it was built from, so a stale snapshot is detected and ignored.
+"""
+
+import csv
+import json
+import os
+import re
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from athletes import athlete_path
+from data_loader import ACTIVITIES_CSV, STRAVA_DATE_FORMAT, file_version
+from track_store import CACHE_DIR
+
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshot", "activities")
+SCHEMA_FILE = "schema.json"
+
+# Bump when column naming or the stored layout changes
+SNAPSHOT_VERSION = 1
+
+# Snapshot names for export headers, keyed by (header, occurrence). Headers
+# not listed are snake_cased; units are made explicit wherever the export
+# leaves them implicit.
+COLUMN_NAMES = {
+    ('Activity Date', 0): 'activity_date',
+    ('Elapsed Time', 0): 'elapsed_time_s',
+    ('Distance', 0): 'distance_km',
+    ('Max Heart Rate', 0): 'max_heart_rate_bpm',
+    ('Relative Effort', 0): 'relative_effort',
+    ('Commute', 0): 'commute',
+    ('Athlete Weight', 0): 'athlete_weight_kg',
+    ('Bike Weight', 0): 'bike_weight_kg',
+    ('Elapsed Time', 1): 'elapsed_time_detail_s',
+    ('Moving Time', 0): 'moving_time_s',
+    ('Distance', 1): 'distance_m',
+    ('Max Speed', 0): 'max_speed_mps',
+    ('Average Speed', 0): 'average_speed_mps',
+    ('Elevation Gain', 0): 'elevation_gain_m',
+    ('Elevation Loss', 0): 'elevation_loss_m',
+    ('Elevation Low', 0): 'elevation_low_m',
+    ('Elevation High', 0): 'elevation_high_m',
+    ('Max Grade', 0): 'max_grade_pct',
+    ('Average Grade', 0): 'average_grade_pct',
+    ('Average Positive Grade', 0): 'average_positive_grade_pct',
+    ('Average Negative Grade', 0): 'average_negative_grade_pct',
+    ('Max Cadence', 0): 'max_cadence_rpm',
+    ('Average Cadence', 0): 'average_cadence_rpm',
+    ('Max Heart Rate', 1): 'max_heart_rate_detail_bpm',
+    ('Average Heart Rate', 0): 'average_heart_rate_bpm',
+    ('Max Watts', 0): 'max_power_w',
+    ('Average Watts', 0): 'average_power_w',
+    ('Calories', 0): 'calories_kcal',
+    ('Max Temperature', 0): 'max_temperature_c',
+    ('Average Temperature', 0): 'average_temperature_c',
+    ('Relative Effort', 1): 'relative_effort_detail',
+    ('Total Work', 0): 'total_work_j',
+    ('Uphill Time', 0): 'uphill_time_s',
+    ('Downhill Time', 0): 'downhill_time_s',
+    ('Other Time', 0): 'other_time_s',
+    ('Start Time', 0): 'start_time',
+    ('Weighted Average Power', 0): 'weighted_average_power_w',
+    ('Commute', 1): 'commute_detail',
+    ('Total Weight Lifted', 0): 'total_weight_lifted_kg',
+    ('Grade Adjusted Distance', 0): 'grade_adjusted_distance_m',
+    ('Weather Observation Time', 0): 'weather_observation_time',
+    ('Weather Temperature', 0): 'weather_temperature_c',
+    ('Apparent Temperature', 0): 'apparent_temperature_c',
+    ('Dewpoint', 0): 'dewpoint_c',
+    ('Humidity', 0): 'humidity_fraction',
+    ('Weather Pressure', 0): 'weather_pressure_hpa',
+    ('Wind Speed', 0): 'wind_speed_mps',
+    ('Wind Gust', 0): 'wind_gust_mps',
+    ('Wind Bearing', 0): 'wind_bearing_deg',
+    ('Precipitation Intensity', 0): 'precipitation_intensity_mm_h',
+    ('Sunrise Time', 0): 'sunrise_time',
+    ('Sunset Time', 0): 'sunset_time',
+    ('Precipitation Probability', 0): 'precipitation_probability_fraction',
+    ('Cloud Cover', 0): 'cloud_cover_fraction',
+    ('Weather Visibility', 0): 'weather_visibility_m',
+    ('Average Elapsed Speed', 0): 'average_elapsed_speed_mps',
+    ('Dirt Distance', 0): 'dirt_distance_m',
+    ('Newly Explored Distance', 0): 'newly_explored_distance_m',
+    ('Newly Explored Dirt Distance', 0): 'newly_explored_dirt_distance_m',
+    ('Carbon Saved', 0): 'carbon_saved_kg',
+    ('Pool Length', 0): 'pool_length_m',
+    # Despite its name, the export stores this as a speed
+    ('Average Grade Adjusted Pace', 0): 'average_grade_adjusted_speed_mps',
+    ('Timer Time', 0): 'timer_time_s',
+}
+
+# Columns holding Unix epoch seconds, stored as datetimes
+EPOCH_COLUMNS = {'weather_observation_time', 'sunrise_time', 'sunset_time', 'start_time'}
+
+# 0/1 flag columns (the export writes some of them as floats), stored as booleans
+BOOL_COLUMNS = {'commute', 'commute_detail', 'from_upload', 'flagged', 'recovery', 'with_pet', 'competition', 'long_run', 'for_a_cause', 'prefer_perceived_exertion'}
+
+
+def snapshot_name(header: str, occurrence: int) -> str:
+    """Snapshot column name for the nth occurrence of an export header."""
+    name = COLUMN_NAMES.get((header, occurrence))
+    if name is None:
+        name = re.sub(r'[^0-9a-z]+', '_', header.lower()).strip('_')
+        if occurrence:
+            name = f"{name}_{occurrence + 1}"
+    return name
+
+
+def _export_headers(csv_path: str) -> List[str]:
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f))
+
+
+def _typed_column(name: str, values: pd.Series) -> np.ndarray:
+    """Convert one exported column to the array stored in the snapshot."""
+    if name == 'activity_date':
+        return pd.to_datetime(values, format=STRAVA_DATE_FORMAT).to_numpy(dtype='datetime64[ns]')
+    if name in EPOCH_COLUMNS:
+        return pd.to_datetime(values.astype(float), unit='s').to_numpy(dtype='datetime64[ns]')
+    if name in BOOL_COLUMNS:
+        return values.fillna(0).astype(float).to_numpy() != 0
+    if pd.api.types.is_string_dtype(values.dtype):
+        return values.fillna('').astype(str).to_numpy(dtype=str)
+    return values.to_numpy()
+
+
+def build_snapshot(csv_path: str = ACTIVITIES_CSV) -> Tuple[Dict[str, np.ndarray], dict]:
+    """
+    Convert the activities export into typed columns.
+
+    Returns:
+        (columns, schema): arrays by snapshot name, and the schema with one
+        entry per column ('name', 'source', 'occurrence', 'dtype', 'has_missing')
+    """
+    csv_path = athlete_path(csv_path)
+    headers = _export_headers(csv_path)
+    # Read without a header row so repeated names aren't mangled
+    raw = pd.read_csv(csv_path, header=None, skiprows=1, low_memory=False)
+
+    columns, entries, seen = {}, [], {}
+    for position, header in enumerate(headers):
+        occurrence = seen.get(header, 0)
+        seen[header] = occurrence + 1
+        name = snapshot_name(header, occurrence)
+        column = _typed_column(name, raw[position])
+        columns[name] = column
+        entries.append({
+            'name': name,
+            'source': header,
+            'occurrence': occurrence,
+            'dtype': column.dtype.str,
+            'has_missing': bool(raw[position].isna().any()),
+        })
+
+    schema = {
+        'version': SNAPSHOT_VERSION,
+        'source_version': file_version(csv_path),
+        'rows': len(raw),
+        'columns': entries,
+    }
+    return columns, schema
+
+
+def write_snapshot(csv_path: str = ACTIVITIES_CSV, snapshot_dir: str = SNAPSHOT_DIR) -> dict:
+    """
+    Write the snapshot, replacing any previous one as a whole.
+
+    Returns:
+        The written schema
+    """
+    snapshot_dir = athlete_path(snapshot_dir)
+    columns, schema = build_snapshot(csv_path)
+
+    tmp_dir = f"{snapshot_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, values in columns.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), values, allow_pickle=False)
+    with open(os.path.join(tmp_dir, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=1)
+
+    old_dir = f"{snapshot_dir}.{os.getpid()}.old"
+    if os.path.exists(snapshot_dir):
+        os.replace(snapshot_dir, old_dir)
+    os.replace(tmp_dir, snapshot_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return schema
+
+
+def load_schema(snapshot_dir: str = SNAPSHOT_DIR) -> Optional[dict]:
+    """Schema of the written snapshot (None if there isn't one)."""
+    snapshot_dir = athlete_path(snapshot_dir)
+    path = os.path.join(snapshot_dir, SCHEMA_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def snapshot_is_current(schema: Optional[dict], csv_path: str = ACTIVITIES_CSV) -> bool:
+    """Whether a snapshot schema matches the current export and snapshot layout."""
+    csv_path = athlete_path(csv_path)
+    return (
+        schema is not None
+        and schema.get('version') == SNAPSHOT_VERSION
+        and schema.get('source_version') == file_version(csv_path)
+    )
+
+
+def load_snapshot(names: Optional[List[str]] = None, snapshot_dir: str = SNAPSHOT_DIR) -> pd.DataFrame:
+    """
+    Memory-map snapshot columns into a frame.
+
+    Numeric, boolean and datetime columns stay memory-mapped (read-only);
+    text columns are decoded, with missing values restored as NaN.
+
+    Args:
+        names (list, optional): Snapshot column names to load (all if omitted)
+
+    Returns:
+        pd.DataFrame with the requested columns in the given order
+    """
+    snapshot_dir = athlete_path(snapshot_dir)
+    schema = load_schema(snapshot_dir)
+    entries = {entry['name']: entry for entry in schema['columns']}
+    names = names or list(entries)
+
+    columns = {}
+    for name in names:
+        values = np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode='r')
+        if values.dtype.kind == 'U':
+            text = values.astype(object)
+            if entries[name]['has_missing']:
+                text = np.where(values == '', None, text)
+            columns[name] = pd.Series(text, dtype='str')
+        else:
+            columns[name] = values
+    return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,330 @@
+"""
+Activity Store
+
+An embedded SQLite database with one row per activity: the catalog's
+columns (file, race flag, route, start cluster, bounds) and the enriched
+frame's derived columns (period keys, pace, zone, distance category,
+workout type). It is indexed for the filters the pages run, on (type,
+date), route_id, is_race and filename, so pages query just the rows and
+aggregates they show instead of holding the whole history in memory.
+
+Ingest writes the store next to the catalog. It records the version of its
+inputs (activities export, catalog sources, max heart rate); if they have
+changed since, or ingest hasn't run, the store is rebuilt on first use.
+Like the rest of the cache it lives in the active athlete's partition.
+
+Dates are stored as ISO text ('YYYY-MM-DD HH:MM:SS'), which sorts and
+compares chronologically.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, timedelta
+from typing import Iterable, Optional, Sequence, Tuple
+from urllib.request import pathname2url
+
+import numpy as np
+import pandas as pd
+
+from activity_catalog import load_catalog
+from activity_frame import enriched_version, load_enriched_activities
+from athletes import athlete_path
+from track_store import CACHE_DIR
+
+STORE_PATH = os.path.join(CACHE_DIR, "activities.sqlite")
+
+# Bump when the table layout or the meaning of a column changes
+STORE_VERSION = 2
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Column -> SQL type of the activities table
+STORE_COLUMNS = {
+    'activity_id': 'INTEGER PRIMARY KEY',
+    'date': 'TEXT NOT NULL',
+    'type': 'TEXT',
+    'name': 'TEXT',
+    'name_search': 'TEXT',
+    'distance_km': 'REAL',
+    'moving_time_s': 'REAL',
+    'elapsed_time_s': 'REAL',
+    'avg_heart_rate': 'REAL',
+    'pace_min_km': 'REAL',
+    'gap_pace_min_km': 'REAL',
+    'year': 'INTEGER',
+    'week_start': 'TEXT',
+    'hr_zone': 'TEXT',
+    'distance_category': 'TEXT',
+    'workout_type': 'TEXT',
+    'filename': 'TEXT',
+    'is_race': 'INTEGER',
+    'route_id': 'INTEGER',
+    'start_cluster': 'INTEGER',
+    'is_home': 'INTEGER',
+    'min_lat': 'REAL',
+    'min_lon': 'REAL',
+    'max_lat': 'REAL',
+    'max_lon': 'REAL',
+}
+
+# Catalog columns copied as is (NULL until ingest has written them)
+CATALOG_COLUMNS = ['filename', 'is_race', 'route_id', 'start_cluster', 'is_home', 'min_lat', 'min_lon', 'max_lat', 'max_lon']
+
+STORE_INDEXES = {
+    'activities_type_date': ('type', 'date'),
+    'activities_route': ('route_id',),
+    'activities_race': ('is_race',),
+    'activities_filename': ('filename',),
+}
+
+_lock = threading.Lock()
+_current: dict = {}     # store path -> inputs it was last checked against
+
+
+def store_inputs() -> str:
+    """Identify the inputs of the store (layout version and enriched frame inputs)."""
+    return json.dumps([STORE_VERSION, enriched_version()], default=str)
+
+
+def store_rows(enriched: pd.DataFrame, catalog: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rows of the activities table.
+
+    Args:
+        enriched (pd.DataFrame): Frame from activity_frame.load_enriched_activities
+        catalog (pd.DataFrame): Catalog from activity_catalog.load_catalog
+
+    Returns:
+        pd.DataFrame with the STORE_COLUMNS, missing values as None
+    """
+    rows = pd.DataFrame({
+        'activity_id': enriched['Activity ID'].to_numpy(),
+        'date': enriched['Activity Date'].dt.strftime(DATE_FORMAT).to_numpy(),
+        'type': enriched['Activity Type'].astype(object).to_numpy(),
+        'name': enriched['Activity Name'].to_numpy(),
+        'name_search': enriched['Activity Name'].str.casefold().to_numpy(),
+        'distance_km': enriched['Distance'].to_numpy(),
+        'moving_time_s': enriched['Moving Time'].to_numpy(),
+        'elapsed_time_s': enriched['Elapsed Time'].to_numpy(),
+        'avg_heart_rate': enriched['Average Heart Rate'].to_numpy(),
+        'pace_min_km': enriched['Pace (min/km)'].replace([np.inf, -np.inf], np.nan).to_numpy(),
+        'gap_pace_min_km': enriched['GAP (min/km)'].to_numpy(dtype=float),
+        'year': enriched['Year'].to_numpy(),
+        'week_start': enriched['Week_Start'].dt.strftime('%Y-%m-%d').to_numpy(),
+        'hr_zone': enriched['HR_Zone'].to_numpy(),
+        'distance_category': enriched['Distance_Category'].to_numpy(),
+        'workout_type': enriched['Workout_Type'].to_numpy(),
+    })
+    rows = rows.merge(catalog.reindex(columns=['activity_id'] + CATALOG_COLUMNS), on='activity_id', how='left')
+    rows = rows[list(STORE_COLUMNS)].astype(object)
+    return rows.where(rows.notna(), None)
+
+
+def write_store(path: str = STORE_PATH) -> int:
+    """
+    Build the store from the enriched activities and the catalog, replacing
+    any previous one as a whole.
+
+    Returns:
+        Number of activities written
+    """
+    path = athlete_path(path)
+    inputs = store_inputs()
+    rows = store_rows(load_enriched_activities(), load_catalog())
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    with closing(sqlite3.connect(tmp_path)) as db:
+        columns = ", ".join(f"{name} {sql_type}" for name, sql_type in STORE_COLUMNS.items())
+        db.execute(f"CREATE TABLE activities ({columns})")
+        db.executemany(
+            f"INSERT INTO activities VALUES ({', '.join('?' * len(STORE_COLUMNS))})",
+            rows.itertuples(index=False, name=None)
+        )
+        for index, indexed in STORE_INDEXES.items():
+            db.execute(f"CREATE INDEX {index} ON activities ({', '.join(indexed)})")
+        # Index statistics for the query planner
+        db.execute("ANALYZE")
+        db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        db.execute("INSERT INTO meta VALUES ('inputs', ?)", (inputs,))
+        db.commit()
+    os.replace(tmp_path, path)
+
+    with _lock:
+        _current[path] = inputs
+    return len(rows)
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Read-only connection to a store file."""
+    return sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+
+
+def _stored_inputs(path: str) -> Optional[str]:
+    """Inputs recorded in a store file (None if it is missing or unreadable)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with closing(_connect(path)) as db:
+            row = db.execute("SELECT value FROM meta WHERE key = 'inputs'").fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+def current_store(path: str = STORE_PATH) -> str:
+    """Path of the active athlete's store, rebuilt first if its inputs changed."""
+    path = athlete_path(path)
+    inputs = store_inputs()
+    with _lock:
+        if _current.get(path) == inputs:
+            return path
+
+    if _stored_inputs(path) != inputs:
+        write_store(path)
+    with _lock:
+        _current[path] = inputs
+    return path
+
+
+def read_sql(sql: str, params: Sequence = (), path: str = STORE_PATH) -> pd.DataFrame:
+    """Run a query against the current store; the result as a pd.DataFrame."""
+    with closing(_connect(current_store(path))) as db:
+        return pd.read_sql_query(sql, db, params=list(params))
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Stored date text as datetimes."""
+    return pd.to_datetime(values, format=DATE_FORMAT)
+
+
+def store_summary() -> dict:
+    """
+    Ranges the activity filters offer.
+
+    Returns:
+        dict with 'first_date', 'last_date' (date), 'max_distance_km',
+        'types' (sorted), and whether start clusters have been written at
+        ingest ('has_locations')
+    """
+    summary = read_sql(
+        "SELECT MIN(date) AS first_date, MAX(date) AS last_date, MAX(distance_km) AS max_distance_km,"
+        " COUNT(start_cluster) AS located FROM activities"
+    ).iloc[0]
+    types = read_sql("SELECT DISTINCT type FROM activities WHERE type IS NOT NULL ORDER BY type")['type']
+    return {
+        'first_date': date.fromisoformat(summary['first_date'][:10]),
+        'last_date': date.fromisoformat(summary['last_date'][:10]),
+        'max_distance_km': float(summary['max_distance_km']),
+        'types': types.tolist(),
+        'has_locations': bool(summary['located']),
+    }
+
+
+def query_activities(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    types: Optional[Iterable[str]] = None,
+    min_distance_km: Optional[float] = None,
+    max_distance_km: Optional[float] = None,
+    races_only: bool = False,
+    search: Optional[str] = None,
+    home: Optional[bool] = None,
+    with_file: bool = False,
+    limit: Optional[int] = None,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Filter the activities in SQL. Type and date filters use the (type,
+    date) index, races_only the race flag index.
+
+    Args:
+        start, end (date, optional): Inclusive date range
+        types (iterable, optional): Activity types to keep
+        min_distance_km, max_distance_km (float, optional): Distance range
+        races_only (bool): Keep only activities flagged as races
+        search (str, optional): Case-insensitive substring of the activity name
+        home (bool, optional): Keep only home-base (True) or away (False) runs;
+            requires the start-location clusters written at ingest
+        with_file (bool): Keep only activities with a track file
+        limit (int, optional): Most recent matches to return
+
+    Returns:
+        (matches, total): matching rows, most recent first, indexed by
+        'activity_id' with 'date' parsed; and the number of matches
+        before the limit
+    """
+    clauses, params = [], []
+    if start:
+        clauses.append("date >= ?")
+        params.append(start.strftime(DATE_FORMAT))
+    if end:
+        clauses.append("date < ?")
+        params.append((end + timedelta(days=1)).strftime(DATE_FORMAT))
+    if types:
+        types = list(types)
+        clauses.append(f"type IN ({', '.join('?' * len(types))})")
+        params += types
+    if min_distance_km is not None:
+        clauses.append("distance_km >= ?")
+        params.append(min_distance_km)
+    if max_distance_km is not None:
+        clauses.append("distance_km <= ?")
+        params.append(max_distance_km)
+    if races_only:
+        clauses.append("is_race = 1")
+    if search:
+        escaped = search.casefold().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        # Matched against the casefolded name: LIKE ignores case for ASCII only
+        clauses.append("name_search LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    if home is not None:
+        clauses.append("start_cluster >= 0 AND COALESCE(is_home, 0) = ?")
+        params.append(int(home))
+    if with_file:
+        clauses.append("filename != ''")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    total = int(read_sql(f"SELECT COUNT(*) AS n FROM activities {where}", params)['n'].iloc[0])
+    matches = read_sql(
+        f"SELECT * FROM activities {where} ORDER BY date DESC, activity_id DESC{' LIMIT ?' if limit else ''}",
+        params + ([limit] if limit else [])
+    )
+    matches['date'] = parse_dates(matches['date'])
+    return matches.set_index('activity_id'), total
+
+
+def activities_by_id(activity_ids: Iterable[int]) -> pd.DataFrame:
+    """
+    Rows of the given activities, in the given order ('date' parsed).
+    Activities the store doesn't have (e.g. named by an index from an
+    earlier ingest) are left out.
+    """
+    activity_ids = [int(activity_id) for activity_id in activity_ids]
+    rows = read_sql(
+        f"SELECT * FROM activities WHERE activity_id IN ({', '.join('?' * len(activity_ids))})",
+        activity_ids
+    )
+    rows['date'] = parse_dates(rows['date'])
+    return rows.set_index('activity_id').reindex(activity_ids).dropna(subset=['date'])
+
+
+def activity_bounds(filepath: str) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Map framing for an activity file from the bounds written at ingest.
+
+    Returns:
+        (min_lat, min_lon, max_lat, max_lon), or None if the store has no
+        bounds for the file (not ingested yet)
+    """
+    rows = read_sql(
+        "SELECT min_lat, min_lon, max_lat, max_lon FROM activities WHERE filename = ? AND min_lat IS NOT NULL LIMIT 1",
+        (filepath,)
+    )
+    if len(rows) == 0:
+        return None
+    return tuple(float(value) for value in rows.iloc[0])
@@ -0,0 +1,231 @@
+"""
+Athlete Partitions
+
+The dashboard serves any number of athletes from one data layout,
+partitioned by athlete ID:
+
+    athletes/<id>/athlete.json        profile (name, max heart rate)
+    athletes/<id>/datasets/*.csv      Strava exports
+    athletes/<id>/activities/         activity files
+    .cache/athletes/<id>/...          catalog, track cache and aggregates
+
+The original single-athlete layout at the top level (datasets/,
+activities/, .cache/) is the partition of DEFAULT_ATHLETE, so existing
+checkouts keep working unchanged.
+
+Modules keep their single-athlete path constants; every function that
+reads or writes one passes it through athlete_path, which relocates it into
+the active athlete's partition. The active athlete is set with use_athlete
+(scripts, workers) or, in the app, by the session's selection.
+
+In-process caches (loaded frames, figures, the pages' athlete_cache
+getters) are split per athlete with athlete_partition, and only the
+MAX_ACTIVE_ATHLETES most recently used athletes keep theirs, so memory is
+bounded by the active athletes rather than all of them, and one athlete's
+data never evicts another's.
+"""
+
+import functools
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+ATHLETES_DIR = "athletes"
+CACHE_ROOT = ".cache"
+PROFILE_FILE = "athlete.json"
+
+DEFAULT_ATHLETE = "default"
+DEFAULT_ATHLETE_NAME = "Aditya Padmarajan"
+DEFAULT_MAX_HEART_RATE = 196  # Max heart rate (bpm) of profiles that don't set one
+
+# Athletes whose in-process caches are kept (least recently used dropped first)
+MAX_ACTIVE_ATHLETES = 8
+
+# Session state key of the athlete selected in the app
+SESSION_KEY = "athlete"
+
+ATHLETE_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+_active: ContextVar[Optional[str]] = ContextVar('athlete', default=None)
+_lock = threading.Lock()
+_partitions: "OrderedDict[str, Dict[str, object]]" = OrderedDict()   # athlete -> cache name -> partition
+_profiles: Dict[str, tuple] = {}                                      # profile path -> (mtime_ns, profile)
+
+
+def validate_athlete(athlete_id: str) -> str:
+    """Check an athlete ID is a plain name (it becomes a path component); returns it."""
+    if not isinstance(athlete_id, str) or not ATHLETE_ID_PATTERN.fullmatch(athlete_id):
+        raise ValueError(f"Invalid athlete ID: {athlete_id!r}")
+    return athlete_id
+
+
+def _session_athlete() -> Optional[str]:
+    """Athlete selected in the running Streamlit session, if any."""
+    # Fragment reruns run in a fresh thread, outside the script run's
+    # context, so the app keeps its selection in session state instead
+    if 'streamlit' not in sys.modules:
+        return None
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    return st.session_state.get(SESSION_KEY)
+
+
+def active_athlete() -> str:
+    """ID of the athlete whose data is read and written now."""
+    return _active.get() or _session_athlete() or DEFAULT_ATHLETE
+
+
+@contextmanager
+def use_athlete(athlete_id: str):
+    """Make an athlete active for the enclosed block (in this thread/context)."""
+    token = _active.set(validate_athlete(athlete_id))
+    try:
+        yield athlete_id
+    finally:
+        _active.reset(token)
+
+
+def set_active_athlete(athlete_id: str) -> None:
+    """Make an athlete active for the rest of this context (e.g. a worker process)."""
+    _active.set(validate_athlete(athlete_id))
+
+
+def athlete_path(path: str, athlete_id: Optional[str] = None) -> str:
+    """
+    Relocate a path of the single-athlete layout into an athlete's partition.
+
+    Relative paths move under athletes/<id>/, cache paths under
+    .cache/athletes/<id>/. Absolute paths, paths already in a partition and
+    every path of DEFAULT_ATHLETE are returned unchanged, so relocating
+    twice is harmless.
+    """
+    athlete_id = athlete_id or active_athlete()
+    if athlete_id == DEFAULT_ATHLETE or not path or os.path.isabs(path):
+        return path
+    parts = os.path.normpath(path).split(os.sep)
+    if parts[0] == ATHLETES_DIR or parts[:2] == [CACHE_ROOT, ATHLETES_DIR]:
+        return path
+    if parts[0] == CACHE_ROOT:
+        return os.path.join(CACHE_ROOT, ATHLETES_DIR, athlete_id, *parts[1:])
+    return os.path.join(ATHLETES_DIR, athlete_id, *parts)
+
+
+def list_athletes() -> List[str]:
+    """IDs of the athletes with data: DEFAULT_ATHLETE, then athletes/<id>/ in name order."""
+    athlete_ids = [DEFAULT_ATHLETE]
+    if os.path.isdir(ATHLETES_DIR):
+        athlete_ids += sorted(
+            name for name in os.listdir(ATHLETES_DIR)
+            if name != DEFAULT_ATHLETE and ATHLETE_ID_PATTERN.fullmatch(name) and os.path.isdir(os.path.join(ATHLETES_DIR, name))
+        )
+    return athlete_ids
+
+
+def athlete_profile(athlete_id: Optional[str] = None) -> dict:
+    """
+    An athlete's profile: athlete.json in their partition, over defaults
+    (the athlete ID as name, DEFAULT_MAX_HEART_RATE).
+
+    Returns:
+        Dict with at least 'name' and 'max_heart_rate' (shared, read-only)
+    """
+    athlete_id = athlete_id or active_athlete()
+    defaults = {
+        'name': DEFAULT_ATHLETE_NAME if athlete_id == DEFAULT_ATHLETE else athlete_id,
+        'max_heart_rate': DEFAULT_MAX_HEART_RATE,
+    }
+    path = athlete_path(PROFILE_FILE, athlete_id)
+    if not os.path.exists(path):
+        return defaults
+
+    mtime = os.stat(path).st_mtime_ns
+    with _lock:
+        cached = _profiles.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        profile = {**defaults, **json.load(f)}
+    with _lock:
+        _profiles[path] = (mtime, profile)
+    return profile
+
+
+def max_heart_rate(athlete_id: Optional[str] = None) -> int:
+    """An athlete's maximum heart rate (bpm), for heart-rate zones."""
+    return athlete_profile(athlete_id)['max_heart_rate']
+
+
+def athlete_partition(cache: str, factory: Callable[[], object] = dict, athlete_id: Optional[str] = None):
+    """
+    An athlete's share of a process-wide cache.
+
+    Args:
+        cache (str): Cache name, unique per module
+        factory (callable): Creates an empty partition (dict by default)
+        athlete_id (str, optional): Defaults to the active athlete
+
+    Returns:
+        The partition, created on first use. When more than
+        MAX_ACTIVE_ATHLETES athletes have partitions, the least recently
+        used athlete's partitions (of every cache) are dropped.
+    """
+    athlete_id = athlete_id or active_athlete()
+    with _lock:
+        caches = _partitions.get(athlete_id)
+        if caches is None:
+            caches = _partitions[athlete_id] = {}
+            while len(_partitions) > MAX_ACTIVE_ATHLETES:
+                _partitions.popitem(last=False)
+        else:
+            _partitions.move_to_end(athlete_id)
+        partition = caches.get(cache)
+        if partition is None:
+            partition = caches[cache] = factory()
+        return partition
+
+
+def athlete_cache(max_entries: int):
+    """
+    Memoize a page's resource getter per athlete.
+
+    Stands in for st.cache_resource where the resources belong to an
+    athlete: the getter's first argument is the athlete ID (pass
+    active_athlete()), the call runs with that athlete active, and
+    max_entries caps each athlete's entries in an LRU partition of its own,
+    so a busy athlete can't evict anyone else's. The other arguments must be
+    hashable.
+    """
+    def decorate(getter: Callable) -> Callable:
+        cache = f"{getter.__module__}.{getter.__qualname__}"
+
+        @functools.wraps(getter)
+        def cached(athlete_id: str, *args):
+            entries = athlete_partition(cache, OrderedDict, athlete_id)
+            with _lock:
+                if args in entries:
+                    entries.move_to_end(args)
+                    return entries[args]
+
+            # Built outside the lock (concurrent misses may build twice)
+            with use_athlete(athlete_id):
+                value = getter(athlete_id, *args)
+            with _lock:
+                entries[args] = value
+                entries.move_to_end(args)
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+            return value
+
+        return cached
+
+    return decorate
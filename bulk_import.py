@@ -0,0 +1,147 @@
+"""
+Bulk Export Import
+
+Merged exports (GOTOES collages, "download all" GPX files) pack many runs
+into one GPX file as separate tracks. Each track is matched to a catalog
+activity by start time, with the start point checked against the
+activity's own track when ingest has one, so the tracks of a bulk file
+can be ingested in one pass. Activities without their own file take
+their track from the bulk file via a track reference ("file.gpx#N").
+"""
+
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from athletes import athlete_path
+from gpx_utils import haversine_distance, split_tracks
+from track_store import CACHE_DIR, load_track, track_ref
+
+BULK_MATCHES_PATH = os.path.join(CACHE_DIR, "bulk_matches.pkl")
+
+MAX_START_TIME_DIFF_S = 120   # Start times further apart than this don't match
+MAX_START_DISTANCE_M = 500    # Start points further apart than this don't match
+
+
+def track_starts(tracks: List[Dict[str, np.ndarray]]) -> pd.DataFrame:
+    """
+    Start time and start point of each track.
+
+    Returns:
+        pd.DataFrame with ['track', 'start_time', 'start_lat', 'start_lon'];
+        start_time is epoch seconds (NaN if the track has no timestamps)
+    """
+    first_time = []
+    for streams in tracks:
+        timed = np.flatnonzero(~np.isnan(streams['time']))
+        first_time.append(streams['time'][timed[0]] if len(timed) else np.nan)
+
+    return pd.DataFrame({
+        'track': np.arange(len(tracks)),
+        'start_time': np.array(first_time, dtype=np.float64),
+        'start_lat': np.array([streams['lat'][0] for streams in tracks], dtype=np.float64),
+        'start_lon': np.array([streams['lon'][0] for streams in tracks], dtype=np.float64),
+    })
+
+
+def match_tracks(
+    starts: pd.DataFrame,
+    catalog: pd.DataFrame,
+    max_time_diff_s: float = MAX_START_TIME_DIFF_S,
+    max_distance_m: float = MAX_START_DISTANCE_M,
+) -> pd.DataFrame:
+    """
+    Match tracks to catalog activities by start time and start point.
+
+    Each track takes the activity with the nearest start time (binary
+    search on the date-sorted catalog). Where the catalog knows the
+    activity's start point, it must lie within max_distance_m of the
+    track's. If several tracks match one activity, the closest in time wins.
+
+    Args:
+        starts (pd.DataFrame): Track starts from track_starts
+        catalog (pd.DataFrame): Activity catalog sorted by date
+
+    Returns:
+        pd.DataFrame with ['track', 'activity_id', 'time_diff_s',
+        'start_distance_m'] for matched tracks only
+    """
+    if len(catalog) == 0 or len(starts) == 0:
+        return pd.DataFrame({'track': [], 'activity_id': [], 'time_diff_s': [], 'start_distance_m': []})
+
+    catalog_times = catalog['date'].values.astype('datetime64[s]').astype(np.float64)
+    track_times = starts['start_time'].values
+    timed = ~np.isnan(track_times)
+
+    # Nearest catalog start on either side of each track start
+    after = np.clip(np.searchsorted(catalog_times, np.where(timed, track_times, 0)), 1, len(catalog_times) - 1)
+    before = after - 1
+    nearest = np.where(
+        np.abs(catalog_times[before] - track_times) <= np.abs(catalog_times[after] - track_times),
+        before, after
+    )
+    time_diff = np.abs(catalog_times[nearest] - track_times)
+
+    catalog_lat = catalog['start_lat'].values[nearest] if 'start_lat' in catalog.columns else np.full(len(starts), np.nan)
+    catalog_lon = catalog['start_lon'].values[nearest] if 'start_lon' in catalog.columns else np.full(len(starts), np.nan)
+    start_distance = haversine_distance(starts['start_lat'].values, starts['start_lon'].values, catalog_lat, catalog_lon)
+
+    matched = timed & (time_diff <= max_time_diff_s) & ~(start_distance > max_distance_m)
+
+    matches = pd.DataFrame({
+        'track': starts['track'].values[matched],
+        'activity_id': catalog['activity_id'].values[nearest[matched]],
+        'time_diff_s': time_diff[matched],
+        'start_distance_m': start_distance[matched],
+    })
+    return (matches.sort_values('time_diff_s', kind='stable')
+            .drop_duplicates('activity_id')
+            .sort_values('track')
+            .reset_index(drop=True))
+
+
+def import_bulk_file(filepath: str, catalog: pd.DataFrame) -> pd.DataFrame:
+    """
+    Split a multi-track file and match its tracks to the catalog.
+
+    Returns:
+        pd.DataFrame of matches (see match_tracks) with a 'filename' track
+        reference per match and 'has_file', whether the activity already
+        has its own activity file
+    """
+    tracks = split_tracks(load_track(filepath))
+    if not tracks:
+        return pd.DataFrame(columns=['track', 'activity_id', 'time_diff_s', 'start_distance_m', 'filename', 'has_file'])
+
+    matches = match_tracks(track_starts(tracks), catalog)
+    matches['filename'] = [track_ref(filepath, track) for track in matches['track']]
+
+    own_files = catalog.set_index('activity_id')['filename']
+    matches['has_file'] = own_files.loc[matches['activity_id']].values != ''
+    return matches
+
+
+def load_bulk_matches(path: str = BULK_MATCHES_PATH) -> pd.DataFrame:
+    """Track references assigned to activities from bulk files (None if there are none)."""
+    path = athlete_path(path)
+    if not os.path.exists(path):
+        return None
+    return pd.read_pickle(path)
+
+
+def save_bulk_matches(matches: pd.DataFrame, path: str = BULK_MATCHES_PATH) -> None:
+    """
+    Merge new bulk matches into the persisted table (one row per
+    'activity_id'; later imports replace earlier ones).
+    """
+    path = athlete_path(path)
+    previous = load_bulk_matches(path)
+    if previous is not None:
+        matches = pd.concat([previous[~previous['activity_id'].isin(matches['activity_id'])], matches], ignore_index=True)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    matches[['activity_id', 'filename']].to_pickle(tmp_path)
+    os.replace(tmp_path, path)
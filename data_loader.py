@@ -0,0 +1,205 @@
+"""
+Dataset Loader
+
+Loads the CSV datasets the pages share, once per process. Each dataset is
+read with explicit dtypes and only the columns the dashboard uses, and
+cached until its file changes: a rerun costs one os.stat per dataset. When
+size or mtime change the file is hashed, and it is only re-parsed if its
+content actually differs. The activities come from the columnar snapshot
+written at ingest (see activity_snapshot) when it matches the CSV, so they
+are memory-mapped rather than parsed.
+
+Paths are read from the active athlete's partition (see athletes), and the
+cached frames are kept per athlete.
+
+Cached frames are read-only (their numeric arrays are flagged
+non-writable), and pages receive a shallow copy, so adding columns or
+filtering never touches the shared frame. Copy data before modifying it
+in place.
+"""
+
+import csv
+import hashlib
+import os
+import threading
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from athletes import athlete_partition, athlete_path
+
+DATASET_DIR = "datasets"
+ACTIVITIES_CSV = os.path.join(DATASET_DIR, "activities_dataset.csv")
+CHALLENGES_CSV = os.path.join(DATASET_DIR, "global_challenges.csv")
+VO2MAX_CSV = os.path.join(DATASET_DIR, "VO₂ Max.csv")
+
+STRAVA_DATE_FORMAT = "%b %d, %Y, %I:%M:%S %p"
+
+# Columns the pages use, with their dtypes. The export repeats some column
+# names; the first occurrence is the one loaded (e.g. Distance in km).
+ACTIVITY_COLUMNS = {
+    'Activity ID': 'int64',
+    'Activity Date': 'datetime64[ns]',
+    'Activity Name': 'str',
+    'Activity Type': 'category',
+    'Activity Description': 'str',
+    'Elapsed Time': 'float64',
+    'Distance': 'float64',
+    'Moving Time': 'float64',
+    'Average Speed': 'float64',
+    'Average Heart Rate': 'float64',
+    'Filename': 'str',
+    'Competition': 'bool',
+}
+
+CHALLENGE_COLUMNS = {
+    'Join Date': 'str',
+    'Name': 'str',
+    'Completed': 'bool',
+}
+
+VO2MAX_COLUMNS = {
+    'Month': 'str',
+    'Activity Type': 'str',
+    'VO2 Max': 'float64',
+}
+
+_lock = threading.Lock()
+_signatures: Dict[str, tuple] = {}     # path -> (size, mtime_ns, content hash)
+
+
+def file_version(path: str) -> str:
+    """
+    Content hash of a file (16 hex characters).
+
+    The hash is recomputed only when the file's size or mtime change.
+    """
+    stat = os.stat(path)
+    with _lock:
+        cached = _signatures.get(path)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    version = digest.hexdigest()[:16]
+
+    with _lock:
+        _signatures[path] = (stat.st_size, stat.st_mtime_ns, version)
+    return version
+
+
+def data_version(*paths: str) -> str:
+    """
+    Identify the combined version of the given datasets (all of them if
+    none are given), for keying caches of anything derived from them.
+    """
+    paths = tuple(athlete_path(path) for path in paths or (ACTIVITIES_CSV, CHALLENGES_CSV, VO2MAX_CSV))
+    if len(paths) == 1:
+        return file_version(paths[0])
+    combined = "|".join(file_version(path) for path in paths)
+    return hashlib.sha1(combined.encode('utf-8')).hexdigest()[:16]
+
+
+def _first_positions(path: str, names: List[str]) -> List[int]:
+    """Positions of the first header column with each name (headers may repeat)."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f))
+    return [header.index(name) for name in names]
+
+
+def _read_only(frame: pd.DataFrame) -> pd.DataFrame:
+    """Rebuild a frame on non-writable copies of its numpy-backed columns."""
+    columns = {}
+    for name in frame.columns:
+        column = frame[name]
+        if isinstance(column.dtype, np.dtype):
+            # Memory-mapped snapshot columns are read-only already
+            values = column.to_numpy()
+            if values.flags.writeable:
+                values = values.copy()
+                values.flags.writeable = False
+            columns[name] = values
+        else:
+            columns[name] = column.array
+    return pd.DataFrame(columns, index=frame.index, copy=False)
+
+
+def cached_frame(name: str, version, build) -> pd.DataFrame:
+    """
+    Shallow copy of a process-wide cached frame, rebuilt when its version changes.
+
+    Args:
+        name (str): Cache slot; one frame is kept per name and athlete
+        version: Hashable identifier of the inputs the frame is built from
+        build (callable): Returns the frame when the cached one is missing or stale
+
+    Returns:
+        Read-only pd.DataFrame (see module docstring)
+    """
+    frames = athlete_partition('frames')    # cache slot -> (version, frame)
+    with _lock:
+        cached = frames.get(name)
+    if cached is None or cached[0] != version:
+        frame = _read_only(build())
+        with _lock:
+            frames[name] = (version, frame)
+        cached = (version, frame)
+    return cached[1].copy(deep=False)
+
+
+def _cached(name: str, path: str, read) -> pd.DataFrame:
+    """Cached frame of a dataset file, re-read when the file's content changes."""
+    path = athlete_path(path)
+    return cached_frame(name, file_version(path), lambda: read(path))
+
+
+def _read_activities(path: str) -> pd.DataFrame:
+    # Imported here: the snapshot module builds on this one
+    from activity_snapshot import load_schema, load_snapshot, snapshot_is_current, snapshot_name
+
+    names = list(ACTIVITY_COLUMNS)
+    if snapshot_is_current(load_schema(), path):
+        frame = load_snapshot([snapshot_name(name, 0) for name in names])
+        frame.columns = names
+    else:
+        positions = _first_positions(path, names)
+        read_as = {'datetime64[ns]': 'str', 'bool': 'float64'}  # flags are exported as 0/1 with blanks
+        dtypes = {position: read_as.get(dtype, dtype) for position, dtype in zip(positions, ACTIVITY_COLUMNS.values())}
+        # usecols keeps file order; restore the declared order
+        frame = pd.read_csv(path, usecols=positions, dtype=dtypes)[names]
+        frame['Activity Date'] = pd.to_datetime(frame['Activity Date'], format=STRAVA_DATE_FORMAT)
+        frame['Competition'] = frame['Competition'].fillna(0) != 0
+    return frame.astype(ACTIVITY_COLUMNS, copy=False)
+
+
+def _read_challenges(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, usecols=list(CHALLENGE_COLUMNS), dtype=CHALLENGE_COLUMNS)
+
+
+def _read_vo2max(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, skiprows=1, names=list(VO2MAX_COLUMNS), dtype=VO2MAX_COLUMNS)
+
+
+def load_activities(path: str = ACTIVITIES_CSV) -> pd.DataFrame:
+    """
+    Strava activities export, one row per activity.
+
+    Returns:
+        Read-only pd.DataFrame with the ACTIVITY_COLUMNS (Distance in km,
+        times in seconds, Activity Date parsed)
+    """
+    return _cached('activities', path, _read_activities)
+
+
+def load_challenges(path: str = CHALLENGES_CSV) -> pd.DataFrame:
+    """Strava challenge participation: read-only pd.DataFrame with the CHALLENGE_COLUMNS."""
+    return _cached('challenges', path, _read_challenges)
+
+
+def load_vo2max(path: str = VO2MAX_CSV) -> pd.DataFrame:
+    """Monthly VO₂ Max estimates: read-only pd.DataFrame with ['Month', 'Activity Type', 'VO2 Max']."""
+    return _cached('vo2max', path, _read_vo2max)
@@ -0,0 +1,174 @@
+"""
+Exploration Coverage
+
+Tracks the set of ~100 m grid cells ever visited as a sorted int64 array
+of packed cell keys. Each new activity is merged in incrementally: its
+cells are looked up with a binary search and only unseen cells are
+inserted, so an ingest costs O(points log cells) instead of replaying the
+whole history. The state also keeps a per-activity series (new cells,
+total cells, newly explored distance) for coverage-over-time charts.
+
+Activities must be added in date order; backfilling an older activity
+requires a rebuild (see update_coverage).
+"""
+
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from athletes import athlete_path
+from location_clusters import grid_cells, pack_cells, CELL_OFFSET, METRES_PER_DEGREE
+from track_store import CACHE_DIR
+
+COVERAGE_CELL_M = 100
+COVERAGE_PATH = os.path.join(CACHE_DIR, "coverage.npz")
+
+
+def empty_coverage() -> Dict[str, np.ndarray]:
+    """Coverage state with no visited cells."""
+    return {
+        'cells': np.empty(0, dtype=np.int64),
+        'activity_ids': np.empty(0, dtype=np.int64),
+        'dates': np.empty(0, dtype='datetime64[ns]'),
+        'new_cells': np.empty(0, dtype=np.int64),
+        'total_cells': np.empty(0, dtype=np.int64),
+        'new_distance_m': np.empty(0, dtype=np.float64),
+    }
+
+
+def load_coverage(path: str = COVERAGE_PATH) -> Dict[str, np.ndarray]:
+    """Load the persisted coverage state (empty if none exists)."""
+    path = athlete_path(path)
+    if not os.path.exists(path):
+        return empty_coverage()
+    with np.load(path) as stored:
+        return {name: stored[name] for name in stored.files}
+
+
+def save_coverage(state: Dict[str, np.ndarray], path: str = COVERAGE_PATH) -> None:
+    """Write the coverage state atomically."""
+    path = athlete_path(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **state)
+    os.replace(tmp_path, path)
+
+
+def point_cells(streams: Dict[str, np.ndarray], cell_size_m: float = COVERAGE_CELL_M) -> np.ndarray:
+    """Packed coverage cell key of every trackpoint."""
+    rows, cols = grid_cells(streams['lat'], streams['lon'], cell_size_m)
+    return pack_cells(rows, cols)
+
+
+def add_activity(state: Dict[str, np.ndarray], activity_id: int, date: np.datetime64, streams: Dict[str, np.ndarray]) -> int:
+    """
+    Merge one activity's cells into the coverage state in place.
+
+    Returns:
+        Number of cells the activity visited for the first time
+    """
+    visited = state['cells']
+    cells = point_cells(streams)
+
+    index = np.searchsorted(visited, cells)
+    seen = np.zeros(len(cells), dtype=bool)
+    in_range = index < len(visited)
+    seen[in_range] = visited[index[in_range]] == cells[in_range]
+
+    # Distance of the steps ending in an unseen cell
+    steps = np.diff(streams['distance'], prepend=streams['distance'][:1])
+    new_distance = steps[~seen].sum()
+
+    new_cells = np.unique(cells[~seen])
+    state['cells'] = np.insert(visited, np.searchsorted(visited, new_cells), new_cells)
+
+    state['activity_ids'] = np.append(state['activity_ids'], np.int64(activity_id))
+    state['dates'] = np.append(state['dates'], np.datetime64(date, 'ns'))
+    state['new_cells'] = np.append(state['new_cells'], len(new_cells))
+    state['total_cells'] = np.append(state['total_cells'], len(state['cells']))
+    state['new_distance_m'] = np.append(state['new_distance_m'], new_distance)
+    return len(new_cells)
+
+
+def update_coverage(activities: pd.DataFrame, load_streams, state: Dict[str, np.ndarray] = None) -> Tuple[Dict[str, np.ndarray], bool]:
+    """
+    Add activities that aren't in the coverage state yet.
+
+    If any of them predates the newest activity already counted, or an
+    activity that was counted is no longer in the list, the state is
+    rebuilt from scratch so first visits stay attributed to the right
+    activity.
+
+    Args:
+        activities (pd.DataFrame): Catalog rows with 'activity_id', 'date' and 'filename'
+        load_streams (callable): Returns the streams for a filename
+        state (dict, optional): Existing coverage state (loaded from disk if omitted)
+
+    Returns:
+        (updated state, whether it was rebuilt)
+    """
+    if state is None:
+        state = load_coverage()
+
+    pending = activities[~activities['activity_id'].isin(state['activity_ids'])].sort_values('date', kind='stable')
+    rebuilt = False
+
+    backfilled = len(pending) and len(state['dates']) and pending['date'].values[0] < state['dates'].max()
+    removed = not np.isin(state['activity_ids'], activities['activity_id'].values).all()
+    if backfilled or removed:
+        state = empty_coverage()
+        pending = activities.sort_values('date', kind='stable')
+        rebuilt = True
+
+    for activity_id, date, filename in zip(pending['activity_id'], pending['date'].values, pending['filename']):
+        # Activities without GPS are recorded too (with no new cells) so they aren't revisited
+        add_activity(state, activity_id, date, load_streams(filename))
+
+    return state, rebuilt
+
+
+def coverage_series(state: Dict[str, np.ndarray], cell_size_m: float = COVERAGE_CELL_M) -> pd.DataFrame:
+    """
+    Coverage over time, one row per activity.
+
+    Returns:
+        pd.DataFrame with ['activity_id', 'date', 'new_cells', 'total_cells',
+        'new_distance_km', 'area_km2']
+    """
+    return pd.DataFrame({
+        'activity_id': state['activity_ids'],
+        'date': state['dates'],
+        'new_cells': state['new_cells'],
+        'total_cells': state['total_cells'],
+        'new_distance_km': state['new_distance_m'] / 1000,
+        'area_km2': state['total_cells'] * (cell_size_m / 1000) ** 2,
+    })
+
+
+def cell_bounds(cells: np.ndarray, cell_size_m: float = COVERAGE_CELL_M) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Corner coordinates of packed cell keys (inverse of location_clusters.grid_cells).
+
+    Returns:
+        (south, west, north, east) arrays in degrees
+    """
+    cell_deg = cell_size_m / METRES_PER_DEGREE
+    rows = ((cells >> 32) & 0xFFFFFFFF) - CELL_OFFSET
+    cols = (cells & 0xFFFFFFFF) - CELL_OFFSET
+
+    south = rows * cell_deg
+    lon_deg = cell_deg / np.cos(np.radians(south + cell_deg / 2))
+    west = cols * lon_deg
+    return south, west, south + cell_deg, west + lon_deg
+
+
+def explored_by_activity(state: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Per-activity exploration values keyed by 'activity_id' for the track summaries."""
+    return pd.DataFrame({
+        'activity_id': state['activity_ids'],
+        'explored_cells': state['new_cells'],
+        'explored_distance_km': state['new_distance_m'] / 1000,
+    })
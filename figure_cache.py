@@ -0,0 +1,160 @@
+"""
+Figure Cache
+
+The dashboard's Plotly figures are built from datasets that only change on
+ingest, yet building them (property validation on every trace and layout
+update) was most of a page rerun. Pages now get each figure from this
+cache, keyed by (page, figure id, data version, theme colors, page source):
+
+- in memory, the built figure is kept process-wide and handed to
+  st.plotly_chart as is, so a rerun does no pandas or Plotly construction
+- on disk, the figure is stored as its serialized JSON, so a fresh process
+  or another worker loads it instead of rebuilding it; only the latest
+  file of each (page, figure id) is kept, so data refreshes and code edits
+  don't accumulate stale files
+
+The page's source file is part of the key, so editing a figure's code
+invalidates it. Summary values quoted in the pages' captions are cached the
+same way (cached_values), in memory only. Both are kept per athlete (see
+athletes): each active athlete has their own in-memory LRU, and their
+figure files live in their cache partition. Cached figures are shared
+across sessions: emit them, don't modify them.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+from athletes import athlete_partition, athlete_path
+from data_loader import file_version
+from track_store import CACHE_DIR
+
+FIGURE_CACHE_DIR = os.path.join(CACHE_DIR, "figures")
+
+# Bump when the stored figure layout changes
+FIGURE_CACHE_VERSION = 1
+
+MAX_CACHED_FIGURES = 256    # Figures kept in memory per athlete (least recently used dropped first)
+
+_lock = threading.Lock()
+
+
+def figure_key(page: str, figure_id: str, version, colors: Iterable[str], source: str = "") -> str:
+    """
+    Identify one figure built from one data version in one theme.
+
+    Args:
+        page (str): Page the figure belongs to
+        figure_id (str): Figure name, unique within the page
+        version: JSON-serializable identifier of the data the figure is built from
+        colors (list): Theme color palette
+        source (str): Version of the code that builds the figure
+
+    Returns:
+        16-character hex digest
+    """
+    signature = json.dumps([FIGURE_CACHE_VERSION, page, figure_id, version, list(colors), source], default=str)
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+
+
+def _source_version(build: Callable) -> str:
+    """Content hash of the file defining a figure builder ('' if it has none)."""
+    path = inspect.getsourcefile(build)
+    return file_version(path) if path else ""
+
+
+def cached_figure(
+    page: str,
+    figure_id: str,
+    version,
+    colors: Iterable[str],
+    build: Callable[[], go.Figure],
+    cache_dir: str = FIGURE_CACHE_DIR,
+) -> go.Figure:
+    """
+    Get a figure from memory or disk, building and storing it on a miss.
+
+    Args:
+        page, figure_id, version, colors: Cache key (see figure_key)
+        build (callable): Returns the figure; only called on a miss
+
+    Returns:
+        The cached go.Figure (shared, read-only)
+    """
+    key = figure_key(page, figure_id, version, colors, _source_version(build))
+    figures: "OrderedDict[str, go.Figure]" = athlete_partition('figures', OrderedDict)
+    with _lock:
+        figure = figures.get(key)
+        if figure is not None:
+            figures.move_to_end(key)
+            return figure
+
+    slot_dir = os.path.join(athlete_path(cache_dir), page, figure_id)
+    path = os.path.join(slot_dir, f"{key}.json")
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            figure = pio.from_json(f.read())
+    else:
+        figure = build()
+        os.makedirs(slot_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(pio.to_json(figure, validate=False))
+        os.replace(tmp_path, path)
+        _remove_stale(slot_dir, path)
+
+    with _lock:
+        figures[key] = figure
+        while len(figures) > MAX_CACHED_FIGURES:
+            figures.popitem(last=False)
+    return figure
+
+
+def _remove_stale(slot_dir: str, current: str) -> None:
+    """Delete a figure's files from other data versions, code versions or themes."""
+    for name in os.listdir(slot_dir):
+        path = os.path.join(slot_dir, name)
+        if name.endswith('.json') and path != current:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass    # Removed by a concurrent writer
+
+
+def plotly_chart(page: str, figure_id: str, version, colors: Iterable[str], build: Callable[[], go.Figure], **kwargs) -> None:
+    """Emit a cached figure with st.plotly_chart (keyword arguments are passed through)."""
+    st.plotly_chart(cached_figure(page, figure_id, version, colors, build), **kwargs)
+
+
+def cached_values(page: str, name: str, version, build: Callable[[], dict]) -> dict:
+    """
+    Summary values of a page, computed once per data version.
+
+    Args:
+        page (str): Page the values belong to
+        name (str): Name of the value set, unique within the page
+        version: Hashable identifier of the data they are computed from
+        build (callable): Returns the values; only called when the version changes
+
+    Returns:
+        The cached dict (shared, read-only)
+    """
+    key = (version, _source_version(build))
+    values_cache = athlete_partition('values')     # (page, name) -> (key, values)
+    with _lock:
+        cached = values_cache.get((page, name))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    values = build()
+    with _lock:
+        values_cache[(page, name)] = (key, values)
+    return values
@@ -0,0 +1,181 @@
+"""
+Grade-Adjusted Pace (GAP)
+
+Converts speed on hills into the equivalent flat-ground speed using the
+metabolic cost of running on a slope from Minetti et al. (2002), "Energy
+cost of walking and running at extreme uphill and downhill slopes",
+J Appl Physiol 93:1039-1046:
+
+    C(i) = 155.4 i^5 - 30.4 i^4 - 43.3 i^3 + 46.3 i^2 + 19.5 i + 3.6   (J/kg/m)
+
+where i is the grade as a fraction. GAP speed = speed * C(i) / C(0).
+
+Streams are computed on the smoothed distance grid from elevation.py, so
+an activity takes about a millisecond and the full history can be
+processed at ingest.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional
+
+from elevation import elevation_profile
+
+# Minetti cost polynomial coefficients, highest power first
+MINETTI_COEFFICIENTS = (155.4, -30.4, -43.3, 46.3, 19.5, 3.6)
+MINETTI_GRADE_LIMIT = 0.45  # The fit is only valid for grades within ±45%
+
+# Standard best-effort distances (m)
+BEST_EFFORT_DISTANCES = {
+    '1K': 1000,
+    '5K': 5000,
+    '10K': 10000,
+    'Half Marathon': 21097.5,
+    'Marathon': 42195,
+}
+
+
+def running_cost(grade: np.ndarray) -> np.ndarray:
+    """Metabolic cost of running (J/kg/m) at the given grade fraction."""
+    return np.polyval(MINETTI_COEFFICIENTS, np.clip(grade, -MINETTI_GRADE_LIMIT, MINETTI_GRADE_LIMIT))
+
+
+def gap_stream(streams: Dict[str, np.ndarray], profile: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute speed and grade-adjusted speed along the distance grid.
+
+    Args:
+        streams (dict): Track arrays from gpx_utils.parse_activity_streams
+        profile (dict, optional): Precomputed elevation.elevation_profile of the streams
+
+    Returns:
+        Dict of arrays on the elevation profile's distance grid:
+        'distance' (m), 'time' and 'gap_time' (cumulative s from the first
+        sample; gap_time is the equivalent flat-ground time), 'grade' (%),
+        'speed' and 'gap_speed' (m/s), and 'heart_rate' (bpm).
+        All arrays are empty if the track lacks time or elevation data.
+    """
+    if profile is None:
+        profile = elevation_profile(streams)
+    distance = profile['distance']
+    valid_time = ~np.isnan(streams['time'])
+
+    if len(distance) < 2 or valid_time.sum() < 2:
+        empty = np.empty(0, dtype=np.float64)
+        return {name: empty for name in ('distance', 'time', 'gap_time', 'grade', 'speed', 'gap_speed', 'heart_rate')}
+
+    time = np.interp(distance, streams['distance'][valid_time], streams['time'][valid_time])
+    time -= time[0]
+
+    valid_hr = ~np.isnan(streams['heart_rate'])
+    if valid_hr.any():
+        heart_rate = np.interp(distance, streams['distance'][valid_hr], streams['heart_rate'][valid_hr])
+    else:
+        heart_rate = np.full(len(distance), np.nan)
+
+    # Per-step speed, with each step's grade taken at its midpoint
+    step_distance = np.diff(distance)
+    step_time = np.diff(time)
+    step_grade = (profile['grade'][1:] + profile['grade'][:-1]) / 200
+    cost_ratio = running_cost(step_grade) / running_cost(np.zeros(1))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        speed = np.where(step_time > 0, step_distance / step_time, np.nan)
+    gap_time = np.concatenate(([0.0], np.cumsum(step_time / cost_ratio)))
+
+    # Step values are reported at the step's end sample
+    speed = np.concatenate(([speed[0]], speed))
+    gap_speed = speed * np.concatenate(([cost_ratio[0]], cost_ratio))
+
+    return {
+        'distance': distance,
+        'time': time,
+        'gap_time': gap_time,
+        'grade': profile['grade'],
+        'speed': speed,
+        'gap_speed': gap_speed,
+        'heart_rate': heart_rate,
+    }
+
+
+def average_gap_pace(stream: Dict[str, np.ndarray]) -> float:
+    """Whole-activity grade-adjusted pace in min/km (NaN if unavailable)."""
+    if len(stream['distance']) < 2 or stream['distance'][-1] <= stream['distance'][0]:
+        return np.nan
+    return stream['gap_time'][-1] / 60 / ((stream['distance'][-1] - stream['distance'][0]) / 1000)
+
+
+def gap_splits(stream: Dict[str, np.ndarray], split_m: float = 1000) -> List[dict]:
+    """
+    Actual and grade-adjusted pace for each full split.
+
+    Returns:
+        List of split dicts with 'split', 'distance_km', 'pace_min_km',
+        'gap_min_km', 'avg_grade' and 'avg_hr'
+    """
+    distance = stream['distance']
+    if len(distance) < 2:
+        return []
+
+    boundaries = np.arange(distance[0], distance[-1] + 1e-9, split_m)
+    if len(boundaries) < 2:
+        return []
+
+    split_time = np.diff(np.interp(boundaries, distance, stream['time']))
+    split_gap_time = np.diff(np.interp(boundaries, distance, stream['gap_time']))
+
+    # Mean grade and HR per split via a segment reduce over the grid
+    split_index = np.searchsorted(boundaries, distance, side='right') - 1
+    in_split = split_index < len(boundaries) - 1
+    counts = np.bincount(split_index[in_split], minlength=len(boundaries) - 1)
+    grade_sums = np.bincount(split_index[in_split], weights=stream['grade'][in_split], minlength=len(boundaries) - 1)
+    hr_sums = np.bincount(split_index[in_split], weights=stream['heart_rate'][in_split], minlength=len(boundaries) - 1)
+
+    minutes_per_km = 1000 / split_m / 60
+    splits = []
+    for i in range(len(boundaries) - 1):
+        splits.append({
+            'split': i + 1,
+            'distance_km': boundaries[i + 1] / 1000,
+            'pace_min_km': split_time[i] * minutes_per_km,
+            'gap_min_km': split_gap_time[i] * minutes_per_km,
+            'avg_grade': grade_sums[i] / counts[i] if counts[i] else np.nan,
+            'avg_hr': hr_sums[i] / counts[i] if counts[i] else np.nan
+        })
+    return splits
+
+
+def best_efforts(stream: Dict[str, np.ndarray], distances: Dict[str, float] = BEST_EFFORT_DISTANCES) -> List[dict]:
+    """
+    Fastest efforts over standard distances.
+
+    Each effort is a sliding window over the cumulative time arrays, so
+    the search is a single vectorized subtraction per distance.
+
+    Returns:
+        List of dicts with 'effort', 'distance_m', 'time_s' (fastest
+        elapsed time), 'gap_time_s' (grade-adjusted time of that same
+        stretch) and 'start_km' for every distance the activity covers
+    """
+    distance = stream['distance']
+    if len(distance) < 2:
+        return []
+
+    step_m = distance[1] - distance[0]
+    efforts = []
+    for name, effort_m in distances.items():
+        steps = int(round(effort_m / step_m))
+        if steps < 1 or steps >= len(distance):
+            continue
+
+        window_time = stream['time'][steps:] - stream['time'][:-steps]
+        window_gap_time = stream['gap_time'][steps:] - stream['gap_time'][:-steps]
+        best = int(np.argmin(window_time))
+
+        efforts.append({
+            'effort': name,
+            'distance_m': effort_m,
+            'time_s': window_time[best],
+            'gap_time_s': window_gap_time[best],
+            'start_km': distance[best] / 1000
+        })
+    return efforts
@@ -3,10 +3,15 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 
-# Constants for heart rate zone calculations
-MAX_HEART_RATE = 196  # User's maximum heart rate (bpm)
-ZONE2_LOWER_PCT = 0.60  # Zone 2 lower bound (60% of max HR)
-ZONE2_UPPER_PCT = 0.70  # Zone 2 upper bound (70% of max HR)
+# Heart rate zones are assigned once in the shared activities frame
+from activity_frame import ZONE2_LOWER_PCT, ZONE2_UPPER_PCT, enriched_version
+from athletes import max_heart_rate
+from figure_cache import cached_values, plotly_chart
+
+
+PAGE = "heart_rate_analysis"
+
+ZONE_ORDER = ['Recovery (< 60%)', 'Zone 2 (60-70%)', 'Moderate (70-80%)', 'Threshold (80-90%)', 'Maximum (> 90%)']
 
 
 def format_pace(pace_decimal):
@@ -18,45 +23,57 @@ def format_pace(pace_decimal):
     return f"{minutes}:{seconds:02d}"
 
 
-def render(colors, df_hr):
-    """
-    Render the Heart Rate Efficiency Analysis page with cardiovascular metrics.
+def _year_runs(df_hr, year):
+    return df_hr[df_hr['Year'] == year]
 
-    Args:
-        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
-        df_hr (pd.DataFrame): Heart rate data with columns ['Year', 'Avg HR (bpm)', 'Pace (min/km)', 'Activity Date']
-    """
-    st.title("Heart Rate Efficiency Analysis")
-    st.markdown("*Cardiovascular adaptation and aerobic development through Zone 2 training*")
 
-    # Validate required columns exist
-    required_columns = ['Year', 'Avg HR (bpm)', 'Pace (min/km)', 'Activity Date']
-    missing_columns = [col for col in required_columns if col not in df_hr.columns]
+def _zone_counts(runs):
+    """Runs per heart-rate zone, in zone order (zones without runs left out)."""
+    zone_counts = runs['HR_Zone'].value_counts()
+    return zone_counts.reindex([z for z in ZONE_ORDER if z in zone_counts.index], fill_value=0)
 
-    if missing_columns:
-        st.error(f"Missing required columns: {', '.join(missing_columns)}")
-        return
 
-    if len(df_hr) == 0:
-        st.warning("No heart rate data available for analysis.")
-        return
+def monthly_trends(df_hr):
+    """Monthly average HR and pace over 2024-2025."""
+    df_analysis_monthly = df_hr[df_hr['Year'].isin([2024, 2025])].rename(columns={'Month': 'Year-Month'})
 
-    # Filter data for the three key marathons: RVM 2024, BMO 2025, RVM 2025
-    # We'll focus on training data from 2024 and 2025
-    df_2024 = df_hr[df_hr['Year'] == 2024].copy()
-    df_2025 = df_hr[df_hr['Year'] == 2025].copy()
-    df_analysis = df_hr[df_hr['Year'].isin([2024, 2025])].copy()
+    monthly_stats = df_analysis_monthly.groupby('Year-Month').agg({
+        'Avg HR (bpm)': 'mean',
+        'Pace (min/km)': 'mean'
+    }).reset_index()
 
-    # Check if we have data for analysis
-    if len(df_2024) == 0 and len(df_2025) == 0:
-        st.warning("No heart rate data available for 2024 or 2025. This analysis requires data from these years.")
-        return
+    monthly_stats['Year-Month'] = monthly_stats['Year-Month'].astype(str)
+    return monthly_stats
 
-    # Display data availability notice
-    if len(df_2024) == 0:
-        st.info("ℹ️ Note: No 2024 data available. Analysis will focus on 2025 data only.")
-    elif len(df_2025) == 0:
-        st.info("ℹ️ Note: No 2025 data available. Analysis will focus on 2024 data only.")
+
+def monthly_efficiency(df_hr):
+    """Monthly efficiency metric (HR / pace) over 2024-2025, plus 'GAP Efficiency' when GAP is known."""
+    df_analysis_eff = df_hr[df_hr['Year'].isin([2024, 2025])].rename(columns={'Month': 'Year-Month'})
+    df_analysis_eff['Efficiency'] = df_analysis_eff['Avg HR (bpm)'] / df_analysis_eff['Pace (min/km)']
+
+    # Grade-adjusted efficiency (HR / GAP) removes the effect of hilly routes
+    has_gap = 'GAP (min/km)' in df_analysis_eff.columns and df_analysis_eff['GAP (min/km)'].notna().any()
+    if has_gap:
+        df_analysis_eff['GAP Efficiency'] = df_analysis_eff['Avg HR (bpm)'] / df_analysis_eff['GAP (min/km)']
+
+    efficiency = df_analysis_eff.groupby('Year-Month').agg(
+        {'Efficiency': 'mean', 'GAP Efficiency': 'mean'} if has_gap else {'Efficiency': 'mean'}
+    ).reset_index()
+
+    efficiency['Year-Month'] = efficiency['Year-Month'].astype(str)
+    return efficiency
+
+
+def heart_rate_stats(df_hr):
+    """
+    Summary values quoted on the page, computed once per data version.
+
+    Returns:
+        dict of plain values: run counts, average HR and pace, HR efficiency
+        and Zone 2 share per year, and the monthly efficiency change
+    """
+    df_2024 = _year_runs(df_hr, 2024)
+    df_2025 = _year_runs(df_hr, 2025)
 
     # Calculate key HR efficiency metrics
     avg_hr_2024 = df_2024['Avg HR (bpm)'].mean() if len(df_2024) > 0 else 0
@@ -70,8 +87,9 @@ def render(colors, df_hr):
     efficiency_improvement = ((hr_efficiency_2024 - hr_efficiency_2025) / hr_efficiency_2024) * 100 if hr_efficiency_2024 > 0 else 0
 
     # Calculate Zone 2 percentages (60-70% of max HR)
-    zone2_lower = ZONE2_LOWER_PCT * MAX_HEART_RATE  # 118 bpm (60% of 196)
-    zone2_upper = ZONE2_UPPER_PCT * MAX_HEART_RATE  # 137 bpm (70% of 196)
+    max_hr = max_heart_rate()
+    zone2_lower = ZONE2_LOWER_PCT * max_hr  # 118 bpm at a max HR of 196
+    zone2_upper = ZONE2_UPPER_PCT * max_hr  # 137 bpm at a max HR of 196
 
     zone2_runs_2024 = len(df_2024[(df_2024['Avg HR (bpm)'] >= zone2_lower) & (df_2024['Avg HR (bpm)'] <= zone2_upper)])
     zone2_pct_2024 = (zone2_runs_2024 / len(df_2024) * 100) if len(df_2024) > 0 else 0
@@ -79,73 +97,43 @@ def render(colors, df_hr):
     zone2_runs_2025 = len(df_2025[(df_2025['Avg HR (bpm)'] >= zone2_lower) & (df_2025['Avg HR (bpm)'] <= zone2_upper)])
     zone2_pct_2025 = (zone2_runs_2025 / len(df_2025) * 100) if len(df_2025) > 0 else 0
 
-    # KEY PERFORMANCE METRICS
-    st.markdown("### Cardiovascular Efficiency at a Glance")
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        hr_diff = avg_hr_2024 - avg_hr_2025
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[0]};
-                    text-align: center;'>
-            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Avg HR Change</h4>
-            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{hr_diff:.1f} bpm</h2>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>2024 → 2025</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col2:
-        pace_improvement = avg_pace_2024 - avg_pace_2025
-        pace_improvement_formatted = format_pace(abs(pace_improvement)) if pace_improvement != 0 else "0:00"
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[1]};
-                    text-align: center;'>
-            <h4 style='color: {colors[1]}; margin: 0; font-size: 14px;'>Pace Improvement</h4>
-            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{pace_improvement_formatted}</h2>
-            <p style='color: {colors[0]}; margin: 0; font-size: 12px;'>/km faster</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col3:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid #00ff9f;
-                    text-align: center;'>
-            <h4 style='color: #00ff9f; margin: 0; font-size: 14px;'>Efficiency Gain</h4>
-            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{efficiency_improvement:.1f}%</h2>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>HR per pace</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col4:
-        zone2_increase = zone2_pct_2025 - zone2_pct_2024
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[0]};
-                    text-align: center;'>
-            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Zone 2 Increase</h4>
-            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>+{zone2_increase:.1f}%</h2>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>More aerobic work</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # Zone 2 share of the zone distribution
+    zone_2024 = _zone_counts(df_2024)
+    zone_2025 = _zone_counts(df_2025)
+    zone_2024_pct = (zone_2024 / zone_2024.sum() * 100).round(1)
+    zone_2025_pct = (zone_2025 / zone_2025.sum() * 100).round(1)
 
-    st.markdown("<br>", unsafe_allow_html=True)
+    # Calculate efficiency improvement percentage
+    efficiency = monthly_efficiency(df_hr)
+    eff_start = efficiency['Efficiency'].iloc[0] if len(efficiency) > 0 else 0
+    eff_end = efficiency['Efficiency'].iloc[-1] if len(efficiency) > 0 else 0
+    eff_total_improvement = ((eff_start - eff_end) / eff_start) * 100 if eff_start > 0 else 0
 
-    # VISUALIZATION 1: HR EFFICIENCY COMPARISON - 2024 vs 2025
-    st.markdown("### Heart Rate Efficiency Evolution: 2024 vs 2025")
-    st.markdown("*Lower heart rate at faster paces indicates improved cardiovascular efficiency*")
+    return {
+        'runs_2024': len(df_2024),
+        'runs_2025': len(df_2025),
+        'avg_hr_2024': avg_hr_2024,
+        'avg_pace_2024': avg_pace_2024,
+        'avg_hr_2025': avg_hr_2025,
+        'avg_pace_2025': avg_pace_2025,
+        'hr_efficiency_2024': hr_efficiency_2024,
+        'hr_efficiency_2025': hr_efficiency_2025,
+        'efficiency_improvement': efficiency_improvement,
+        'zone2_runs_2024': zone2_runs_2024,
+        'zone2_pct_2024': zone2_pct_2024,
+        'zone2_runs_2025': zone2_runs_2025,
+        'zone2_pct_2025': zone2_pct_2025,
+        'zone2_2024_pct_val': zone_2024_pct.get('Zone 2 (60-70%)', 0),
+        'zone2_2025_pct_val': zone_2025_pct.get('Zone 2 (60-70%)', 0),
+        'eff_total_improvement': eff_total_improvement,
+    }
+
+
+def _efficiency_figure(df_hr, colors):
+    """HR vs pace scatter plot comparing 2024 and 2025."""
+    df_2024 = _year_runs(df_hr, 2024)
+    df_2025 = _year_runs(df_hr, 2025)
 
-    # Create HR vs Pace scatter plot comparing 2024 and 2025
     fig_efficiency = go.Figure()
 
     # 2024 data points
@@ -210,154 +198,39 @@ def render(colors, df_hr):
         hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
         margin=dict(l=70, r=30, t=30, b=60)
     )
+    return fig_efficiency
 
-    st.plotly_chart(fig_efficiency, use_container_width=True)
-
-    # Insights for HR Efficiency Evolution
-    pace_improvement_text = format_pace(pace_improvement)
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid {colors[0]};
-                margin: 20px 0;'>
-        <h4 style='color: {colors[0]}; margin-top: 0; font-size: 15px;'>Analysis: Cardiovascular Efficiency Gains</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The scatter plot compares heart rate response to pace between 2024 and 2025 training. The 2025 data points (cyan)
-            show a downward shift compared to 2024 (purple), indicating lower heart rates at equivalent paces. This represents
-            improved cardiovascular efficiency—the heart requires fewer beats to sustain the same running pace.
-        </p>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            Average heart rate decreased by <strong>{hr_diff:.1f} bpm</strong> while average pace improved by
-            <strong>{pace_improvement_text} /km</strong>, resulting in a <strong>{efficiency_improvement:.1f}% efficiency improvement</strong>.
-            This adaptation is primarily driven by increased Zone 2 training volume in 2025, which enhanced aerobic base and
-            mitochondrial density.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # VISUALIZATION 2: ZONE DISTRIBUTION COMPARISON
-    st.markdown("### Training Zone Distribution: 2024 vs 2025")
-    st.markdown("*Increased Zone 2 focus in 2025 built superior aerobic foundation*")
-
-    # Define HR zones
-    def categorize_hr_zone(avg_hr, max_hr=MAX_HEART_RATE):
-        percentage = (avg_hr / max_hr) * 100
-        if percentage < 60:
-            return 'Recovery (< 60%)'
-        elif percentage < 70:
-            return 'Zone 2 (60-70%)'
-        elif percentage < 80:
-            return 'Moderate (70-80%)'
-        elif percentage < 90:
-            return 'Threshold (80-90%)'
-        else:
-            return 'Maximum (> 90%)'
-
-    df_2024['HR_Zone'] = df_2024['Avg HR (bpm)'].apply(categorize_hr_zone)
-    df_2025['HR_Zone'] = df_2025['Avg HR (bpm)'].apply(categorize_hr_zone)
-
-    zone_2024 = df_2024['HR_Zone'].value_counts()
-    zone_2025 = df_2025['HR_Zone'].value_counts()
-
-    zone_order = ['Recovery (< 60%)', 'Zone 2 (60-70%)', 'Moderate (70-80%)', 'Threshold (80-90%)', 'Maximum (> 90%)']
-    zone_2024 = zone_2024.reindex([z for z in zone_order if z in zone_2024.index], fill_value=0)
-    zone_2025 = zone_2025.reindex([z for z in zone_order if z in zone_2025.index], fill_value=0)
-
-    # Calculate percentages
-    zone_2024_pct = (zone_2024 / zone_2024.sum() * 100).round(1)
-    zone_2025_pct = (zone_2025 / zone_2025.sum() * 100).round(1)
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        fig_zone_2024 = go.Figure()
-        fig_zone_2024.add_trace(go.Pie(
-            labels=zone_2024.index.tolist(),
-            values=zone_2024.values.tolist(),
-            marker=dict(
-                colors=['#0099ff', '#00d9ff', '#00ff9f', '#ffaa00', '#ff5555'],
-                line=dict(color='#000000', width=2)
-            ),
-            textfont=dict(size=13, color='white'),
-            hovertemplate="<b>%{label}</b><br>Runs: %{value}<br>Percentage: %{percent}<extra></extra>"
-        ))
-
-        fig_zone_2024.update_layout(
-            title=dict(text="2024 Zone Distribution", font=dict(size=16, color=colors[0])),
-            height=450,
-            paper_bgcolor="black",
-            font=dict(family='Arial', color=colors[0]),
-            legend=dict(font=dict(color=colors[4], size=11)),
-            margin=dict(l=20, r=20, t=50, b=20)
-        )
-
-        st.plotly_chart(fig_zone_2024, use_container_width=True)
-
-    with col2:
-        fig_zone_2025 = go.Figure()
-        fig_zone_2025.add_trace(go.Pie(
-            labels=zone_2025.index.tolist(),
-            values=zone_2025.values.tolist(),
-            marker=dict(
-                colors=['#0099ff', '#00d9ff', '#00ff9f', '#ffaa00', '#ff5555'],
-                line=dict(color='#000000', width=2)
-            ),
-            textfont=dict(size=13, color='white'),
-            hovertemplate="<b>%{label}</b><br>Runs: %{value}<br>Percentage: %{percent}<extra></extra>"
-        ))
 
-        fig_zone_2025.update_layout(
-            title=dict(text="2025 Zone Distribution", font=dict(size=16, color=colors[0])),
-            height=450,
-            paper_bgcolor="black",
-            font=dict(family='Arial', color=colors[0]),
-            legend=dict(font=dict(color=colors[4], size=11)),
-            margin=dict(l=20, r=20, t=50, b=20)
-        )
+def _zone_figure(df_hr, year, colors):
+    """Heart-rate zone distribution of one year's runs."""
+    zone_counts = _zone_counts(_year_runs(df_hr, year))
 
-        st.plotly_chart(fig_zone_2025, use_container_width=True)
-
-    # Insights for Zone Distribution
-    zone2_2024_pct_val = zone_2024_pct.get('Zone 2 (60-70%)', 0)
-    zone2_2025_pct_val = zone_2025_pct.get('Zone 2 (60-70%)', 0)
-    zone2_change = zone2_2025_pct_val - zone2_2024_pct_val
-
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid {colors[1]};
-                margin: 20px 0;'>
-        <h4 style='color: {colors[1]}; margin-top: 0; font-size: 15px;'>Analysis: Strategic Zone 2 Focus</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The comparison reveals a significant shift in training distribution between 2024 and 2025. Zone 2 training (60-70% max HR)
-            increased from <strong>{zone2_2024_pct_val:.1f}%</strong> in 2024 to <strong>{zone2_2025_pct_val:.1f}%</strong> in 2025,
-            representing a <strong>+{zone2_change:.1f} percentage point increase</strong>. This strategic emphasis on aerobic base
-            building formed the foundation for improved marathon performance.
-        </p>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            Zone 2 training occurs at an intensity where the body primarily uses fat for fuel and maximizes mitochondrial development.
-            The increased volume in this zone enhanced aerobic capacity, allowing for sustained faster paces at lower heart rates.
-            This adaptation is reflected in the improved efficiency metrics and ultimately contributed to the sub-3:30 marathon performance.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # VISUALIZATION 3: MONTHLY HR AND PACE PROGRESSION
-    st.markdown("### Monthly Heart Rate and Pace Trends")
-    st.markdown("*Tracking cardiovascular adaptation through 2024-2025 training cycle*")
+    fig_zone = go.Figure()
+    fig_zone.add_trace(go.Pie(
+        labels=zone_counts.index.tolist(),
+        values=zone_counts.values.tolist(),
+        marker=dict(
+            colors=['#0099ff', '#00d9ff', '#00ff9f', '#ffaa00', '#ff5555'],
+            line=dict(color='#000000', width=2)
+        ),
+        textfont=dict(size=13, color='white'),
+        hovertemplate="<b>%{label}</b><br>Runs: %{value}<br>Percentage: %{percent}<extra></extra>"
+    ))
 
-    # Prepare monthly data
-    df_analysis_monthly = df_analysis.copy()
-    df_analysis_monthly['Year-Month'] = df_analysis_monthly['Activity Date'].dt.to_period('M')
+    fig_zone.update_layout(
+        title=dict(text=f"{year} Zone Distribution", font=dict(size=16, color=colors[0])),
+        height=450,
+        paper_bgcolor="black",
+        font=dict(family='Arial', color=colors[0]),
+        legend=dict(font=dict(color=colors[4], size=11)),
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+    return fig_zone
 
-    monthly_stats = df_analysis_monthly.groupby('Year-Month').agg({
-        'Avg HR (bpm)': 'mean',
-        'Pace (min/km)': 'mean'
-    }).reset_index()
 
-    monthly_stats['Year-Month'] = monthly_stats['Year-Month'].astype(str)
+def _monthly_trends_figure(df_hr, colors):
+    """Monthly average HR and pace on two axes."""
+    monthly_stats = monthly_trends(df_hr)
 
     fig_monthly = make_subplots(specs=[[{"secondary_y": True}]])
 
@@ -435,51 +308,19 @@ def render(colors, df_hr):
         hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
         margin=dict(l=70, r=70, t=30, b=120)
     )
+    return fig_monthly
 
-    st.plotly_chart(fig_monthly, use_container_width=True)
-
-    # Insights for Monthly Progression
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid #00ff9f;
-                margin: 20px 0;'>
-        <h4 style='color: #00ff9f; margin-top: 0; font-size: 15px;'>Analysis: Progressive Adaptation Pattern</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The dual-axis chart tracks monthly averages for heart rate and pace across the 2024-2025 training period.
-            The inverse relationship between the two metrics demonstrates cardiovascular adaptation: as pace decreases
-            (improves), heart rate also tends to decrease, indicating more efficient oxygen delivery and utilization.
-        </p>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            Periods of increased Zone 2 training volume correspond to subsequent improvements in both metrics. The trend shows
-            gradual progression with some variability due to training periodization—buildup phases show higher heart rates
-            due to increased volume and intensity, while recovery periods and tapers show decreased heart rates. The overall
-            trajectory demonstrates sustained improvement in aerobic fitness across the training cycle.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # VISUALIZATION 4: HR EFFICIENCY METRIC OVER TIME
-    st.markdown("### Cardiovascular Efficiency Metric Progression")
-    st.markdown("*HR/Pace ratio: lower values indicate better aerobic fitness*")
-
-    # Calculate efficiency metric (HR divided by pace)
-    df_analysis_eff = df_analysis.copy()
-    df_analysis_eff['Efficiency'] = df_analysis_eff['Avg HR (bpm)'] / df_analysis_eff['Pace (min/km)']
-    df_analysis_eff['Year-Month'] = df_analysis_eff['Activity Date'].dt.to_period('M')
 
-    monthly_efficiency = df_analysis_eff.groupby('Year-Month').agg({
-        'Efficiency': 'mean'
-    }).reset_index()
-
-    monthly_efficiency['Year-Month'] = monthly_efficiency['Year-Month'].astype(str)
+def _efficiency_metric_figure(df_hr, colors):
+    """Monthly efficiency metric, grade-adjusted when GAP is known."""
+    efficiency = monthly_efficiency(df_hr)
+    has_gap = 'GAP Efficiency' in efficiency.columns
 
     fig_eff_metric = go.Figure()
 
     fig_eff_metric.add_trace(go.Scatter(
-        x=monthly_efficiency['Year-Month'],
-        y=monthly_efficiency['Efficiency'],
+        x=efficiency['Year-Month'],
+        y=efficiency['Efficiency'],
         mode='lines+markers',
         name='Efficiency Metric',
         marker=dict(size=10, color=colors[0], line=dict(color=colors[4], width=2)),
@@ -489,6 +330,18 @@ def render(colors, df_hr):
         hovertemplate="<b>%{x}</b><br>Efficiency: %{y:.2f}<extra></extra>"
     ))
 
+    if has_gap:
+        fig_eff_metric.add_trace(go.Scatter(
+            x=efficiency['Year-Month'],
+            y=efficiency['GAP Efficiency'],
+            mode='lines+markers',
+            name='Grade-Adjusted Efficiency (HR / GAP)',
+            marker=dict(size=8, color=colors[1], line=dict(color=colors[4], width=1)),
+            line=dict(width=2, color=colors[1], dash='dot'),
+            connectgaps=True,
+            hovertemplate="<b>%{x}</b><br>GAP Efficiency: %{y:.2f}<extra></extra>"
+        ))
+
     fig_eff_metric.update_layout(
         height=500,
         plot_bgcolor="black",
@@ -519,13 +372,217 @@ def render(colors, df_hr):
         hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
         margin=dict(l=70, r=30, t=30, b=120)
     )
+    return fig_eff_metric
 
-    st.plotly_chart(fig_eff_metric, use_container_width=True)
 
-    # Calculate efficiency improvement percentage
-    eff_start = monthly_efficiency['Efficiency'].iloc[0] if len(monthly_efficiency) > 0 else 0
-    eff_end = monthly_efficiency['Efficiency'].iloc[-1] if len(monthly_efficiency) > 0 else 0
-    eff_total_improvement = ((eff_start - eff_end) / eff_start) * 100 if eff_start > 0 else 0
+def render(colors, df_hr):
+    """
+    Render the Heart Rate Efficiency Analysis page with cardiovascular metrics.
+
+    Args:
+        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
+        df_hr (pd.DataFrame): Heart rate data with columns ['Year', 'Avg HR (bpm)', 'Pace (min/km)', 'Activity Date']
+    """
+    st.title("Heart Rate Efficiency Analysis")
+    st.markdown("*Cardiovascular adaptation and aerobic development through Zone 2 training*")
+
+    # Validate required columns exist
+    required_columns = ['Year', 'Avg HR (bpm)', 'Pace (min/km)', 'Activity Date']
+    missing_columns = [col for col in required_columns if col not in df_hr.columns]
+
+    if missing_columns:
+        st.error(f"Missing required columns: {', '.join(missing_columns)}")
+        return
+
+    if len(df_hr) == 0:
+        st.warning("No heart rate data available for analysis.")
+        return
+
+    version = enriched_version()
+    stats = cached_values(PAGE, 'stats', version, lambda: heart_rate_stats(df_hr))
+
+    # Check if we have data for analysis
+    if stats['runs_2024'] == 0 and stats['runs_2025'] == 0:
+        st.warning("No heart rate data available for 2024 or 2025. This analysis requires data from these years.")
+        return
+
+    # Display data availability notice
+    if stats['runs_2024'] == 0:
+        st.info("ℹ️ Note: No 2024 data available. Analysis will focus on 2025 data only.")
+    elif stats['runs_2025'] == 0:
+        st.info("ℹ️ Note: No 2025 data available. Analysis will focus on 2024 data only.")
+
+    avg_hr_2024, avg_pace_2024 = stats['avg_hr_2024'], stats['avg_pace_2024']
+    avg_hr_2025, avg_pace_2025 = stats['avg_hr_2025'], stats['avg_pace_2025']
+    hr_efficiency_2024, hr_efficiency_2025 = stats['hr_efficiency_2024'], stats['hr_efficiency_2025']
+    efficiency_improvement = stats['efficiency_improvement']
+    zone2_runs_2024, zone2_pct_2024 = stats['zone2_runs_2024'], stats['zone2_pct_2024']
+    zone2_runs_2025, zone2_pct_2025 = stats['zone2_runs_2025'], stats['zone2_pct_2025']
+
+    # KEY PERFORMANCE METRICS
+    st.markdown("### Cardiovascular Efficiency at a Glance")
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        hr_diff = avg_hr_2024 - avg_hr_2025
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[0]};
+                    text-align: center;'>
+            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Avg HR Change</h4>
+            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{hr_diff:.1f} bpm</h2>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>2024 → 2025</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        pace_improvement = avg_pace_2024 - avg_pace_2025
+        pace_improvement_formatted = format_pace(abs(pace_improvement)) if pace_improvement != 0 else "0:00"
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[1]};
+                    text-align: center;'>
+            <h4 style='color: {colors[1]}; margin: 0; font-size: 14px;'>Pace Improvement</h4>
+            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{pace_improvement_formatted}</h2>
+            <p style='color: {colors[0]}; margin: 0; font-size: 12px;'>/km faster</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid #00ff9f;
+                    text-align: center;'>
+            <h4 style='color: #00ff9f; margin: 0; font-size: 14px;'>Efficiency Gain</h4>
+            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{efficiency_improvement:.1f}%</h2>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>HR per pace</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        zone2_increase = zone2_pct_2025 - zone2_pct_2024
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[0]};
+                    text-align: center;'>
+            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Zone 2 Increase</h4>
+            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>+{zone2_increase:.1f}%</h2>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>More aerobic work</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # VISUALIZATION 1: HR EFFICIENCY COMPARISON - 2024 vs 2025
+    st.markdown("### Heart Rate Efficiency Evolution: 2024 vs 2025")
+    st.markdown("*Lower heart rate at faster paces indicates improved cardiovascular efficiency*")
+
+    plotly_chart(PAGE, 'efficiency_scatter', version, colors, lambda: _efficiency_figure(df_hr, colors), use_container_width=True)
+
+    # Insights for HR Efficiency Evolution
+    pace_improvement_text = format_pace(pace_improvement)
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid {colors[0]};
+                margin: 20px 0;'>
+        <h4 style='color: {colors[0]}; margin-top: 0; font-size: 15px;'>Analysis: Cardiovascular Efficiency Gains</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The scatter plot compares heart rate response to pace between 2024 and 2025 training. The 2025 data points (cyan)
+            show a downward shift compared to 2024 (purple), indicating lower heart rates at equivalent paces. This represents
+            improved cardiovascular efficiency—the heart requires fewer beats to sustain the same running pace.
+        </p>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            Average heart rate decreased by <strong>{hr_diff:.1f} bpm</strong> while average pace improved by
+            <strong>{pace_improvement_text} /km</strong>, resulting in a <strong>{efficiency_improvement:.1f}% efficiency improvement</strong>.
+            This adaptation is primarily driven by increased Zone 2 training volume in 2025, which enhanced aerobic base and
+            mitochondrial density.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # VISUALIZATION 2: ZONE DISTRIBUTION COMPARISON
+    st.markdown("### Training Zone Distribution: 2024 vs 2025")
+    st.markdown("*Increased Zone 2 focus in 2025 built superior aerobic foundation*")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        plotly_chart(PAGE, 'zone_2024', version, colors, lambda: _zone_figure(df_hr, 2024, colors), use_container_width=True)
+
+    with col2:
+        plotly_chart(PAGE, 'zone_2025', version, colors, lambda: _zone_figure(df_hr, 2025, colors), use_container_width=True)
+
+    # Insights for Zone Distribution
+    zone2_2024_pct_val = stats['zone2_2024_pct_val']
+    zone2_2025_pct_val = stats['zone2_2025_pct_val']
+    zone2_change = zone2_2025_pct_val - zone2_2024_pct_val
+
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid {colors[1]};
+                margin: 20px 0;'>
+        <h4 style='color: {colors[1]}; margin-top: 0; font-size: 15px;'>Analysis: Strategic Zone 2 Focus</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The comparison reveals a significant shift in training distribution between 2024 and 2025. Zone 2 training (60-70% max HR)
+            increased from <strong>{zone2_2024_pct_val:.1f}%</strong> in 2024 to <strong>{zone2_2025_pct_val:.1f}%</strong> in 2025,
+            representing a <strong>+{zone2_change:.1f} percentage point increase</strong>. This strategic emphasis on aerobic base
+            building formed the foundation for improved marathon performance.
+        </p>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            Zone 2 training occurs at an intensity where the body primarily uses fat for fuel and maximizes mitochondrial development.
+            The increased volume in this zone enhanced aerobic capacity, allowing for sustained faster paces at lower heart rates.
+            This adaptation is reflected in the improved efficiency metrics and ultimately contributed to the sub-3:30 marathon performance.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # VISUALIZATION 3: MONTHLY HR AND PACE PROGRESSION
+    st.markdown("### Monthly Heart Rate and Pace Trends")
+    st.markdown("*Tracking cardiovascular adaptation through 2024-2025 training cycle*")
+
+    plotly_chart(PAGE, 'monthly_trends', version, colors, lambda: _monthly_trends_figure(df_hr, colors), use_container_width=True)
+
+    # Insights for Monthly Progression
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid #00ff9f;
+                margin: 20px 0;'>
+        <h4 style='color: #00ff9f; margin-top: 0; font-size: 15px;'>Analysis: Progressive Adaptation Pattern</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The dual-axis chart tracks monthly averages for heart rate and pace across the 2024-2025 training period.
+            The inverse relationship between the two metrics demonstrates cardiovascular adaptation: as pace decreases
+            (improves), heart rate also tends to decrease, indicating more efficient oxygen delivery and utilization.
+        </p>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            Periods of increased Zone 2 training volume correspond to subsequent improvements in both metrics. The trend shows
+            gradual progression with some variability due to training periodization—buildup phases show higher heart rates
+            due to increased volume and intensity, while recovery periods and tapers show decreased heart rates. The overall
+            trajectory demonstrates sustained improvement in aerobic fitness across the training cycle.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # VISUALIZATION 4: HR EFFICIENCY METRIC OVER TIME
+    st.markdown("### Cardiovascular Efficiency Metric Progression")
+    st.markdown("*HR/Pace ratio: lower values indicate better aerobic fitness*")
+
+    plotly_chart(PAGE, 'efficiency_metric', version, colors, lambda: _efficiency_metric_figure(df_hr, colors), use_container_width=True)
+
+    eff_total_improvement = stats['eff_total_improvement']
 
     st.markdown(f"""
     <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
@@ -676,19 +733,20 @@ def render(colors, df_hr):
         """, unsafe_allow_html=True)
 
         # Heart Rate Zone Calculations
+        max_hr = max_heart_rate()
         st.markdown(f"""
         <h3 style='color: {colors[0]}; margin-top: 20px;'>2. Heart Rate Zone Definitions</h3>
         """, unsafe_allow_html=True)
 
         st.markdown(f"""
         <div style='background: rgba(0, 217, 255, 0.05); padding: 15px; border-radius: 8px; margin-bottom: 20px;'>
-            <h4 style='color: {colors[1]}; font-size: 16px;'>Zone Classification (Max HR = {MAX_HEART_RATE} bpm)</h4>
+            <h4 style='color: {colors[1]}; font-size: 16px;'>Zone Classification (Max HR = {max_hr} bpm)</h4>
             <p style='color: {colors[4]}; font-family: monospace; font-size: 14px; margin: 10px 0;'>
-                Recovery Zone: HR < 60% of max = < {int(0.60 * MAX_HEART_RATE)} bpm<br>
-                Zone 2 (Aerobic): 60-70% of max = {int(0.60 * MAX_HEART_RATE)}-{int(0.70 * MAX_HEART_RATE)} bpm<br>
-                Moderate Zone: 70-80% of max = {int(0.70 * MAX_HEART_RATE)}-{int(0.80 * MAX_HEART_RATE)} bpm<br>
-                Threshold Zone: 80-90% of max = {int(0.80 * MAX_HEART_RATE)}-{int(0.90 * MAX_HEART_RATE)} bpm<br>
-                Maximum Zone: HR > 90% of max = > {int(0.90 * MAX_HEART_RATE)} bpm
+                Recovery Zone: HR < 60% of max = < {int(0.60 * max_hr)} bpm<br>
+                Zone 2 (Aerobic): 60-70% of max = {int(0.60 * max_hr)}-{int(0.70 * max_hr)} bpm<br>
+                Moderate Zone: 70-80% of max = {int(0.70 * max_hr)}-{int(0.80 * max_hr)} bpm<br>
+                Threshold Zone: 80-90% of max = {int(0.80 * max_hr)}-{int(0.90 * max_hr)} bpm<br>
+                Maximum Zone: HR > 90% of max = > {int(0.90 * max_hr)} bpm
             </p>
         </div>
         """, unsafe_allow_html=True)
@@ -700,8 +758,8 @@ def render(colors, df_hr):
                 Zone 2 % = (Number of Zone 2 runs / Total runs) × 100
             </p>
             <p style='color: {colors[4]}; font-size: 13px; margin: 10px 0;'>
-                2024: ({zone2_runs_2024} / {len(df_2024)}) × 100 = {zone2_pct_2024:.1f}%<br>
-                2025: ({zone2_runs_2025} / {len(df_2025)}) × 100 = {zone2_pct_2025:.1f}%<br>
+                2024: ({zone2_runs_2024} / {stats['runs_2024']}) × 100 = {zone2_pct_2024:.1f}%<br>
+                2025: ({zone2_runs_2025} / {stats['runs_2025']}) × 100 = {zone2_pct_2025:.1f}%<br>
                 Change: +{(zone2_pct_2025 - zone2_pct_2024):.1f} percentage points
             </p>
         </div>
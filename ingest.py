@@ -0,0 +1,198 @@
+"""
+Activity Ingest
+
+Builds the activity catalog and parses every activity file into the track
+cache, so the dashboard never parses raw GPS files on a page view. The
+activities export is also written as a typed columnar snapshot that the
+app memory-maps instead of parsing the CSV. Each
+track is also reduced to a row of track summaries (start point, elevation
+gain, grade-adjusted pace, start-location cluster, newly explored cells)
+that is joined into the catalog. Exploration coverage is updated
+incrementally: only activities not yet counted are merged in. Ingest also
+writes the consolidated track table, from which per-activity bounds,
+centers and lengths are computed in one pass of segment reductions, and
+the nearest-activity index for map clicks is rebuilt. New activities are
+assigned to repeated routes and merged into the route x month cube.
+Last, the activity store (the SQLite database pages query) is rebuilt from
+the catalog and the enriched activities.
+
+Multi-track bulk export files (--bulk) are split and matched to catalog
+activities first, so activities without their own file are ingested from
+the bulk file in the same pass.
+
+Ingest works on one athlete's partition at a time (--athlete, see
+athletes); relative paths, including bulk files, are within it.
+
+Usage:
+    python ingest.py [--athlete ID] [--workers N] [--bulk FILE [FILE ...]]
+"""
+
+import argparse
+import logging
+from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from activity_catalog import load_catalog, save_track_summaries
+from activity_snapshot import load_schema, snapshot_is_current, write_snapshot
+from activity_store import write_store
+from athletes import DEFAULT_ATHLETE, active_athlete, list_athletes, set_active_athlete
+from bulk_import import import_bulk_file, save_bulk_matches
+from exploration_coverage import update_coverage, save_coverage, explored_by_activity
+from elevation import elevation_profile
+from grade_adjusted_pace import gap_stream, average_gap_pace
+from location_clusters import cluster_start_locations
+from spatial_index import build_spatial_index, save_spatial_index
+from route_stats import update_route_stats, save_route_stats, route_assignments
+from gpx_utils import batch_route_bounds, batch_center_points, batch_track_lengths
+from track_store import load_track, build_track_table, save_track_table, track_file_exists
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def summarize_track(streams: dict) -> dict:
+    """
+    Reduce an activity's streams to the per-activity values stored in the catalog.
+
+    Returns:
+        Dict of summary values (NaN where the track lacks the data)
+    """
+    n_points = len(streams['lat'])
+    summary = {
+        'n_points': n_points,
+        'start_lat': streams['lat'][0] if n_points else np.nan,
+        'start_lon': streams['lon'][0] if n_points else np.nan,
+    }
+
+    profile = elevation_profile(streams) if n_points else None
+    has_profile = profile is not None and len(profile['gain']) > 0
+    summary['elevation_gain_m'] = profile['gain'][-1] if has_profile else np.nan
+    summary['gap_pace_min_km'] = average_gap_pace(gap_stream(streams, profile)) if has_profile else np.nan
+
+    return summary
+
+
+def summarize_geometry(table: dict) -> pd.DataFrame:
+    """
+    Bounds, center and length of every activity in the consolidated track table.
+
+    Returns:
+        pd.DataFrame keyed by 'activity_id' with ['min_lat', 'min_lon',
+        'max_lat', 'max_lon', 'center_lat', 'center_lon', 'track_distance_km']
+    """
+    lats, lons, offsets = table['lat'], table['lon'], table['offsets']
+    min_lat, min_lon, max_lat, max_lon = batch_route_bounds(lats, lons, offsets)
+    center_lat, center_lon = batch_center_points(lats, lons, offsets)
+
+    return pd.DataFrame({
+        'activity_id': table['activity_id'],
+        'min_lat': min_lat,
+        'min_lon': min_lon,
+        'max_lat': max_lat,
+        'max_lon': max_lon,
+        'center_lat': center_lat,
+        'center_lon': center_lon,
+        'track_distance_km': batch_track_lengths(table['distance'], offsets) / 1000,
+    })
+
+
+def _ingest_file(filepath: str) -> dict:
+    """Parse one activity file into the track cache and summarize it."""
+    return summarize_track(load_track(filepath))
+
+
+def import_bulk_files(bulk_files: List[str]) -> None:
+    """Split bulk export files and assign their tracks to activities without a file."""
+    catalog = load_catalog()
+    for bulk_file in bulk_files:
+        matches = import_bulk_file(bulk_file, catalog)
+        new = matches[~matches['has_file']]
+        if len(new):
+            save_bulk_matches(new)
+        logger.info(
+            f"{bulk_file}: {len(matches)} tracks matched, {len(new)} new activity tracks, "
+            f"{len(matches) - len(new)} already have their own file"
+        )
+
+
+def ingest(workers: int = None, bulk_files: Optional[List[str]] = None) -> None:
+    """
+    Refresh the catalog, warm the track cache and rebuild track summaries
+    of the active athlete.
+
+    Args:
+        workers (int, optional): Parser processes (defaults to the CPU count)
+        bulk_files (list, optional): Multi-track export files to split and match first
+    """
+    # Typed columnar snapshot of the activities export, memory-mapped by the app
+    if not snapshot_is_current(load_schema()):
+        schema = write_snapshot()
+        logger.info(f"Activities snapshot: {schema['rows']} rows, {len(schema['columns'])} columns")
+
+    if bulk_files:
+        import_bulk_files(bulk_files)
+
+    catalog = load_catalog()
+    logger.info(f"Catalog of athlete {active_athlete()}: {len(catalog)} activities")
+
+    activities = catalog[catalog['filename'].map(track_file_exists)]
+    missing = (catalog['filename'] != '').sum() - len(activities)
+    if missing:
+        logger.warning(f"{missing} activity files listed in the catalog were not found")
+
+    filenames = activities['filename'].tolist()
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_active_athlete, initargs=(active_athlete(),)) as pool:
+        summaries = list(pool.map(_ingest_file, filenames, chunksize=4))
+
+    summaries = pd.DataFrame(summaries)
+    summaries.insert(0, 'activity_id', activities['activity_id'].values)
+
+    # Start-location clusters (home bases vs away runs)
+    start_cluster, is_home, clusters = cluster_start_locations(summaries['start_lat'].values, summaries['start_lon'].values)
+    summaries['start_cluster'] = start_cluster
+    summaries['is_home'] = is_home
+    logger.info(f"{len(clusters)} start-location clusters, {int(clusters['is_home'].sum())} home base(s)")
+
+    # Exploration coverage, merged in date order for new activities only
+    coverage, rebuilt = update_coverage(activities, load_track)
+    save_coverage(coverage)
+    summaries = summaries.merge(explored_by_activity(coverage), on='activity_id', how='left')
+    logger.info(f"Coverage: {len(coverage['cells'])} cells visited{' (rebuilt)' if rebuilt else ''}")
+
+    # Consolidated track table: geometry summaries and the nearest-activity index
+    table = build_track_table(activities['activity_id'], map(load_track, filenames))
+    save_track_table(table)
+    summaries = summaries.merge(summarize_geometry(table), on='activity_id', how='left')
+
+    index = build_spatial_index(table)
+    save_spatial_index(index)
+    logger.info(f"Spatial index: {len(index['lat']):,} points in {len(index['cells']):,} cells")
+
+    # Repeated routes and the route x month cube, updated for new activities only
+    routes, rebuilt = update_route_stats(activities, table)
+    save_route_stats(routes)
+    summaries = summaries.merge(route_assignments(routes), on='activity_id', how='left')
+    logger.info(f"Routes: {len(routes['route_cells'])} routes over {len(routes['assignments'])} activities{' (rebuilt)' if rebuilt else ''}")
+
+    save_track_summaries(summaries)
+
+    no_gps = (summaries['n_points'] == 0).sum()
+    logger.info(f"Track cache ready for {len(filenames)} activity files ({no_gps} without GPS)")
+
+    # Rebuild the persisted catalog with the new summaries joined in, and
+    # the activity store from it
+    load_catalog()
+    logger.info(f"Activity store: {write_store()} activities")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the activity catalog and track cache")
+    parser.add_argument("--athlete", default=DEFAULT_ATHLETE, choices=list_athletes(), help="athlete whose data to ingest")
+    parser.add_argument("--workers", type=int, default=None, help="number of parser processes")
+    parser.add_argument("--bulk", nargs="+", default=None, metavar="FILE", help="multi-track GPX export files to split and match")
+    args = parser.parse_args()
+    set_active_athlete(args.athlete)
+    ingest(args.workers, args.bulk)
@@ -0,0 +1,157 @@
+"""
+Start-Location Clustering
+
+Groups activities by where they start: start points are hashed into a
+~1 km grid, and occupied cells that touch (side or corner) are merged
+into one cluster, a grid version of single-linkage clustering. Clusters
+holding a large share of all activities are home bases; everything else
+is an away run (travel, races in other cities).
+
+The work is np.unique plus a few searchsorted passes over the occupied
+cells, so tens of thousands of activities cluster in milliseconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+CELL_SIZE_M = 1000          # Grid cell edge length (m)
+HOME_BASE_MIN_SHARE = 0.10  # Clusters with at least this share of activities are home bases
+
+METRES_PER_DEGREE = 111320  # Length of one degree of latitude (m)
+CELL_OFFSET = 1 << 31       # Shifts signed cell indices into the positive range for packing
+
+
+def grid_cells(lats: np.ndarray, lons: np.ndarray, cell_size_m: float = CELL_SIZE_M):
+    """
+    Hash coordinates into square-ish grid cells.
+
+    Longitude cells are scaled by the cosine of their row's latitude, so
+    cells stay close to cell_size_m wide away from the equator.
+
+    Returns:
+        (rows, cols) int64 arrays
+    """
+    cell_deg = cell_size_m / METRES_PER_DEGREE
+    rows = np.floor(lats / cell_deg).astype(np.int64)
+    row_lat = np.radians((rows + 0.5) * cell_deg)
+    cols = np.floor(lons * np.cos(row_lat) / cell_deg).astype(np.int64)
+    return rows, cols
+
+
+def pack_cells(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Pack (row, col) cell indices into single sortable int64 keys."""
+    return ((rows + CELL_OFFSET) << 32) | (cols + CELL_OFFSET)
+
+
+def _connected_cells(cells: np.ndarray, cell_size_m: float = CELL_SIZE_M) -> np.ndarray:
+    """
+    Label connected components among sorted unique packed cell keys, where
+    cells are connected when they touch (side or corner).
+
+    Returns:
+        Component label per cell (the smallest index in its component)
+    """
+    rows = ((cells >> 32) & 0xFFFFFFFF) - CELL_OFFSET
+    cols = (cells & 0xFFFFFFFF) - CELL_OFFSET
+    cell_deg = cell_size_m / METRES_PER_DEGREE
+    row_scale = np.cos(np.radians((rows + 0.5) * cell_deg))
+
+    def link(members, neighbour_rows, neighbour_cols):
+        neighbours = pack_cells(neighbour_rows, neighbour_cols)
+        index = np.minimum(np.searchsorted(cells, neighbours), len(cells) - 1)
+        found = cells[index] == neighbours
+        sources.append(members[found])
+        targets.append(index[found])
+
+    # Edges to every occupied neighbour: the cells either side in the same
+    # row, and in the rows above and below every cell whose longitude span
+    # overlaps or touches this cell's. Column scaling depends on the row's
+    # latitude, so neighbouring rows' columns don't line up; at Victoria
+    # they drift by more than a column per row.
+    sources, targets = [], []
+    every = np.arange(len(cells))
+    link(every, rows, cols - 1)
+    link(every, rows, cols + 1)
+    for d_row in (-1, 1):
+        ratio = np.cos(np.radians((rows + d_row + 0.5) * cell_deg)) / row_scale
+        first = np.floor(cols * ratio).astype(np.int64)
+        last = np.floor((cols + 1) * ratio).astype(np.int64)
+        for step in range(int((last - first).max()) + 1):
+            within = np.flatnonzero(first + step <= last)
+            link(within, rows[within] + d_row, first[within] + step)
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+
+    # Min-label propagation with pointer jumping until stable
+    labels = np.arange(len(cells))
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, sources, labels[targets])
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def cluster_start_locations(
+    start_lats: np.ndarray,
+    start_lons: np.ndarray,
+    cell_size_m: float = CELL_SIZE_M,
+    home_min_share: float = HOME_BASE_MIN_SHARE,
+):
+    """
+    Cluster activity start points.
+
+    Args:
+        start_lats, start_lons (np.ndarray): Start coordinates (NaN for activities without GPS)
+        cell_size_m (float): Grid cell size in metres
+        home_min_share (float): Share of located activities that makes a cluster a home base
+
+    Returns:
+        (cluster id per activity with -1 for unlocated, is_home per activity,
+        cluster table as pd.DataFrame with ['cluster', 'activities',
+        'center_lat', 'center_lon', 'is_home'] sorted by size). Cluster ids are
+        ranked by size, so cluster 0 is the largest.
+
+    Starts ~90 m apart on either side of a grid row boundary share a cluster:
+
+    >>> ids, _, _ = cluster_start_locations(np.array([48.42756, 48.42836]), np.array([-123.4, -123.4]))
+    >>> ids.tolist()
+    [0, 0]
+    """
+    n = len(start_lats)
+    located = ~(np.isnan(start_lats) | np.isnan(start_lons))
+    cluster_ids = np.full(n, -1, dtype=np.int64)
+    is_home = np.zeros(n, dtype=bool)
+
+    if not located.any():
+        return cluster_ids, is_home, pd.DataFrame(columns=['cluster', 'activities', 'center_lat', 'center_lon', 'is_home'])
+
+    lats, lons = start_lats[located], start_lons[located]
+    rows, cols = grid_cells(lats, lons, cell_size_m)
+    cells, cell_of_activity = np.unique(pack_cells(rows, cols), return_inverse=True)
+
+    # Components over occupied cells, mapped back onto activities
+    _, cell_labels = np.unique(_connected_cells(cells, cell_size_m), return_inverse=True)
+    activity_labels = cell_labels[cell_of_activity]
+
+    # Rank clusters by size so ids are stable and 0 is the largest
+    sizes = np.bincount(activity_labels)
+    order = np.argsort(-sizes, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    located_ids = rank[activity_labels]
+    cluster_ids[located] = located_ids
+
+    ranked_sizes = sizes[order]
+    home_clusters = ranked_sizes >= home_min_share * located.sum()
+    is_home[located] = home_clusters[located_ids]
+
+    table = pd.DataFrame({
+        'cluster': np.arange(len(ranked_sizes)),
+        'activities': ranked_sizes,
+        'center_lat': np.bincount(located_ids, weights=lats) / ranked_sizes,
+        'center_lon': np.bincount(located_ids, weights=lons) / ranked_sizes,
+        'is_home': home_clusters
+    })
+    return cluster_ids, is_home, table
@@ -0,0 +1,152 @@
+"""
+Route Map Artifacts
+
+Everything a route map needs (simplified geometry as encoded polylines,
+line colors, view bounds and the color legend) is computed once per
+activity and style and stored on disk as a small JSON file. Artifacts are
+keyed by the track cache key, so they are reused across sessions and
+restarts and invalidated whenever the activity file or the parser changes;
+writing an artifact deletes those of earlier versions of the same track.
+Drawing a cached route is then a file read plus building the folium map.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from athletes import athlete_path
+from gpx_utils import simplify_route, encode_polyline
+from route_coloring import colored_route_segments, split_runs_at
+from track_store import CACHE_DIR, load_track, track_cache_key
+
+MAP_ARTIFACT_DIR = os.path.join(CACHE_DIR, "maps")
+
+# Bump when the artifact layout or how routes are drawn changes
+MAP_ARTIFACT_VERSION = 1
+
+
+def build_route_artifact(
+    streams: Dict[str, np.ndarray],
+    color: str,
+    metric: Optional[str] = None,
+    bounds: Optional[Tuple[float, float, float, float]] = None,
+) -> dict:
+    """
+    Compute the drawable form of a route.
+
+    The track is simplified and encoded as Google encoded polylines. When a
+    metric is given, consecutive points in the same color bucket are merged
+    into a single polyline. Lines are broken between GPX tracks and segments.
+
+    Args:
+        streams (dict): Track arrays from gpx_utils.parse_activity_streams
+        color (str): Line color when the route isn't metric-colored
+        metric (str, optional): Metric from route_coloring.COLOR_METRICS
+        bounds (tuple, optional): (min_lat, min_lon, max_lat, max_lon);
+            computed from the track if omitted
+
+    Returns:
+        JSON-serializable dict with 'lines' (list of {'encoded', 'color',
+        'weight'}), 'bounds', 'metric' and 'edges' (color bucket edges, None
+        if the route isn't metric-colored or the metric isn't recorded)
+    """
+    lats, lons = streams['lat'], streams['lon']
+    keep = simplify_route(streams['east'], streams['north'])
+
+    if bounds is None:
+        bounds = (float(lats.min()), float(lons.min()), float(lats.max()), float(lons.max()))
+
+    segments = colored_route_segments(streams, metric) if metric else None
+    if segments is None:
+        starts, ends, run_colors, edges = np.array([0]), np.array([len(lats) - 1]), [color], None
+        weight = 4
+    else:
+        starts, ends, run_colors, edges = segments
+        weight = 5
+
+    starts, ends, run_colors = split_runs_at(starts, ends, run_colors, streams['segment_offsets'][1:-1])
+    keep[starts] = True
+    keep[ends] = True
+
+    lines = []
+    for start, end, run_color in zip(starts, ends, run_colors):
+        run_keep = keep[start:end + 1]
+        lines.append({
+            'encoded': encode_polyline(lats[start:end + 1][run_keep], lons[start:end + 1][run_keep]),
+            'color': run_color,
+            'weight': weight,
+        })
+
+    return {
+        'lines': lines,
+        'bounds': [float(b) for b in bounds],
+        'metric': metric,
+        'edges': None if edges is None else [float(e) for e in edges],
+    }
+
+
+def _digest(signature: str) -> str:
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+
+
+def route_artifact_path(filepath: str, color: str, metric: Optional[str] = None, cache_dir: str = MAP_ARTIFACT_DIR) -> str:
+    """
+    Where the artifact of one activity track drawn in one style is stored.
+
+    Returns:
+        <cache_dir>/<track>/<version>/<style>.json, each part a 16-character
+        hex digest: of the track reference, of (artifact version, track
+        cache key) and of (color, metric)
+    """
+    return os.path.join(
+        athlete_path(cache_dir),
+        _digest(filepath),
+        _digest(f"{MAP_ARTIFACT_VERSION}|{track_cache_key(filepath)}"),
+        f"{_digest(f'{color}|{metric}')}.json",
+    )
+
+
+def load_route_artifact(
+    filepath: str,
+    color: str,
+    metric: Optional[str] = None,
+    bounds: Optional[Tuple[float, float, float, float]] = None,
+    cache_dir: str = MAP_ARTIFACT_DIR,
+) -> Optional[dict]:
+    """
+    Load a route's map artifact, building it from the track on a cache miss.
+
+    Returns:
+        Artifact dict (see build_route_artifact), or None if the track has
+        no GPS data
+    """
+    path = route_artifact_path(filepath, color, metric, cache_dir)
+
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    streams = load_track(filepath)
+    if len(streams['lat']) == 0:
+        return None
+
+    artifact = build_route_artifact(streams, color, metric, bounds)
+
+    version_dir = os.path.dirname(path)
+    os.makedirs(version_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+    # Drop the artifacts of earlier versions of the track (other styles of
+    # this version are kept)
+    track_dir = os.path.dirname(version_dir)
+    for name in os.listdir(track_dir):
+        if name != os.path.basename(version_dir):
+            shutil.rmtree(os.path.join(track_dir, name), ignore_errors=True)
+    return artifact
@@ -2,197 +2,85 @@ import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+from athletes import active_athlete, athlete_cache
+from track_store import load_track, track_cache_key, track_file_exists
+from race_comparison import compare_races, km_deltas
+from route_playback import frame_at
+from gpx_utils import simplify_route
+from data_loader import VO2MAX_CSV, data_version
+from figure_cache import cached_values, plotly_chart
 
+# Activity files for the first and latest Royal Victoria Marathon
+RVM_2022_FILE = "activities/8488033460.tcx.gz"
+RVM_2025_FILE = "activities/17205422180.fit.gz"
 
-def render(colors, vo2max_df):
-    """
-    Render the Marathon Performance Analytics page with race data and visualizations.
-
-    Args:
-        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
-        vo2max_df (pd.DataFrame): VO2 Max data with columns ['Month', 'Activity Type', 'VO2 Max']
-    """
-    st.title("Marathon Performance Analytics")
-    st.markdown("*Visualizing 3 years of improvement across 6 marathon races*")
-
-    # Define comprehensive race data
-    races = ["RVM 2022", "BMO 2023", "RVM 2023", "RVM 2024", "BMO 2025", "RVM 2025"]
-    times_minutes = [286.12, 265.80, 256.97, 227.78, 217.38, 206.00]  # In decimal minutes
-    times_labels = ["4:46:07", "4:25:48", "4:16:58", "3:47:47", "3:37:23", "3:26:00"]
-    pace_decimal = [6.50, 6.22, 6.07, 5.37, 5.12, 4.83]
-    pace_labels = ["6:30", "6:13", "6:04", "5:22", "5:07", "4:50"]
-
-    # Calculate key metrics
-    total_improvement = times_minutes[0] - times_minutes[-1]
-    total_improvement_pct = (total_improvement / times_minutes[0]) * 100
-    avg_pace_improvement = pace_decimal[0] - pace_decimal[-1]
-    best_race_improvement = max([times_minutes[i] - times_minutes[i+1] for i in range(len(times_minutes)-1)])
-
-    # KEY PERFORMANCE METRICS - Compact Cards
-    st.markdown("### Performance at a Glance")
-    col1, col2, col3, col4 = st.columns(4)
+PAGE = "marathon_performance"
 
-    with col1:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[0]};
-                    text-align: center;'>
-            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Total Time Saved</h4>
-            <h3 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{int(total_improvement)} min</h2>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>{total_improvement_pct:.1f}% faster</p>
-        </div>
-        """, unsafe_allow_html=True)
 
-    with col2:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[1]};
-                    text-align: center;'>
-            <h4 style='color: {colors[1]}; margin: 0; font-size: 14px;'>Pace Improvement</h4>
-            <h3 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{avg_pace_improvement:.1f} min/km</h2>
-            <p style='color: {colors[0]}; margin: 0; font-size: 12px;'>{pace_labels[0]} → {pace_labels[-1]}</p>
-        </div>
-        """, unsafe_allow_html=True)
+@athlete_cache(max_entries=4)
+def get_track(athlete, filepath, cache_key):
+    """Streams for one activity file, keyed by its track cache key."""
+    return load_track(filepath)
 
-    with col3:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid #00ff9f;
-                    text-align: center;'>
-            <h4 style='color: #00ff9f; margin: 0; font-size: 14px;'>Best Improvement</h4>
-            <h3 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{int(best_race_improvement)} min</h2>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>Single race jump</p>
-        </div>
-        """, unsafe_allow_html=True)
 
-    with col4:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[0]};
-                    text-align: center;'>
-            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Avg Per Race</h4>
-            <h3 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{int(total_improvement/5)} min</h3>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>Consistency rate</p>
-        </div>
-        """, unsafe_allow_html=True)
+@athlete_cache(max_entries=4)
+def get_race_comparison(athlete, first_file, first_key, second_file, second_key):
+    """Two races aligned on a common distance grid, keyed by both tracks' cache keys."""
+    comparison = compare_races(get_track(athlete, first_file, first_key), get_track(athlete, second_file, second_key))
+    return comparison, km_deltas(comparison)
 
-    st.markdown("<br>", unsafe_allow_html=True)
 
-     # RACE NARRATIVES - Detailed Stories
-    st.markdown("### Race Narratives: The Journey")
-    st.markdown("*The story behind each marathon*")
+@athlete_cache(max_entries=4)
+def get_course_outline(athlete, filepath, cache_key):
+    """Simplified course line (lat, lon) for drawing a replay, keyed by the track cache key."""
+    streams = get_track(athlete, filepath, cache_key)
+    keep = simplify_route(streams['east'], streams['north'], tolerance_m=5.0)
+    return streams['lat'][keep], streams['lon'][keep]
 
-    race_narratives = [
-        {
-            'race': 'RVM 2022',
-            'title': 'The Beginning: First Marathon Experience',
-            'story': '''My marathon journey began with a true test of grit and humility. With almost no structured training,
-            little race-day experience, and still regaining strength after a severe illness just weeks before, I stood at the
-            start line just hoping to somehow make it through. By the time I was 16 km into the race, I hit the infamous wall—my
-            legs heavy and cramped, my energy fading. Much of the remainder was a battle of willpower, alternating between running
-            and walking, each step a lesson in perseverance. I crossed the finish line in 4:46:07, managing to secure a sub-5 hour finish.
-            This first marathon exposed my weaknesses—pacing, nutrition, and mental resilience—while igniting a deep desire to improve.
-            It was a humbling beginning, but it became the cornerstone for every breakthrough that followed.''',
-            'key_learning': 'Completion over speed - establishing the foundation.'
-        },
-        {
-            'race': 'BMO 2023',
-            'title': 'Breakthrough Performance: First Sub-4:30',
-            'story': '''I signed up for the BMO Vancouver Marathon 2023 the day after my first RVM, while I was barely recovered. Armed with
-            improved training volume and a longer prep period, this race delivered a significant 20-minute improvement. The 4:25:48 finish represented
-            the first major breakthrough, demonstrating that structured training yields measurable results.''',
-            'key_learning': 'Structured training with adequate preparation time yields substantial improvements.'
-        },
-        {
-            'race': 'RVM 2023',
-            'title': 'Consolidation: Sub-4:20 Achievement',
-            'story': '''Building on previous success, this race focused on maintaining momentum rather than
-            dramatic improvements. Even though I had a better preparation for RVM 2023, I was mentally fatigued after going through 2 consecutive marathons and
-            prep phases over a span of 8 months. This resulted in me slacking off and not following through with the training plan as diligently as before.
-            A 4:16:58 finish showed steady progression—9 minutes faster than the previous race, but I felt that there was untapped potential that I could have unlocked in this race.''',
-            'key_learning': 'Mental fatigue and inconsistent training limit physical gains - mindset matters.'
-        },
-        {
-            'race': 'RVM 2024',
-            'title': 'Major Breakthrough: Sub-4:00 Barrier Broken',
-            'story': '''After RVM 2023, I decided to take time off and came back for RVM 2024 a year later. I saw the most dramatic single-race
-            improvement: 29 minutes faster than the previous marathon. This performance resulted from refined training periodization, improved running
-            economy, and optimal race-day execution. The 3:47:47 finish demonstrated that when training, recovery, and execution align,
-            breakthrough performances become possible.''',
-            'key_learning': 'Strategic recovery and renewed focus enable breakthrough performances.'
-        },
-        {
-            'race': 'BMO 2025',
-            'title': 'First Attempt at Sub-3:30',
-            'story': '''After a successful breakthrough in RVM 2024, I decided to make my first sub-3:30 attempt at BMO 2025.
-            I went through an intensive prep phase with a heavy emphasis on long runs and overall training volume.
-            I secured a finish time of 3:37:23—a 10-minute improvement.
-            Race execution was characterized by even pacing and effective fueling strategy. I hit the wall around 35 km, after which I got slower and couldn't keep
-            up the pace. I understood that I needed more tempo runs, speed work, and lactate threshold-specific training in my training plan to be able to sustain a faster pace
-            for longer.''',
-            'key_learning': 'Volume alone is not enough - specificity and intensity work are essential.'
-        },
-        {
-            'race': 'RVM 2025',
-            'title': 'Peak Performance: Sub-3:30 Achieved',
-            'story': '''The culmination of three years of systematic training. A 3:26:00 finish represented an
-            11-minute improvement and 80-minute total reduction since the first marathon. This performance
-            demonstrated mature race execution: disciplined pacing, efficient energy systems, and mental fortitude.
-            The achievement marks a significant milestone while highlighting the law of diminishing returns ahead.''',
-            'key_learning': 'Mastery comes from sustained, intelligent effort over time.'
-        }
-    ]
 
-    for i, narrative in enumerate(race_narratives):
-        border_color = colors[0] if i % 2 == 0 else colors[1]
+def _running_vo2(vo2max_df):
+    """VO2 Max estimates of running activities."""
+    return vo2max_df[vo2max_df['Activity Type'] == 'running']
 
-        with st.expander(f"**{narrative['race']}** - {times_labels[i]} - {narrative['title']}", expanded=False):
-            st.markdown(f"""
-            <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 8px;
-                    border-left: 4px solid {border_color};
-                    margin: 10px 0;'>
-            <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin-bottom: 15px;'>
-                {narrative['story']}
-            </p>
-            <div style='background: rgba(0, 217, 255, 0.1);
-                        padding: 12px;
-                        border-radius: 6px;
-                        border-left: 3px solid {border_color};'>
-            <p style='color: {border_color}; font-weight: bold; font-size: 13px; margin: 0;'>
-                Key Learning: <span style='color: {colors[4]}; font-weight: normal;'>{narrative['key_learning']}</span>
-            </p>
-            </div>
-            </div>
-            """, unsafe_allow_html=True)
 
-            # Add race-specific metrics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Finish Time", times_labels[i])
-            with col2:
-                st.metric("Average Pace", f"{pace_labels[i]}/km")
-            with col3:
-                if i > 0:
-                    improvement = times_minutes[i-1] - times_minutes[i]
-                    st.metric("Time Improvement", f"{int(improvement)} min", delta=f"-{int(improvement)} min")
-                else:
-                    st.metric("Status", "Baseline")
+def vo2_stats(vo2max_df):
+    """First, peak and latest running VO2 Max estimate."""
+    vo2_2025 = _running_vo2(vo2max_df)
+    return {
+        'start': vo2_2025['VO2 Max'].iloc[0],
+        'peak': vo2_2025['VO2 Max'].max(),
+        'current': vo2_2025['VO2 Max'].iloc[-1],
+    }
 
-    st.markdown("<br>", unsafe_allow_html=True)
 
-    # VISUALIZATION 1: DUAL AXIS PERFORMANCE TIMELINE
-    st.markdown("### Performance Timeline: Time & Pace Evolution")
+def ghost_summary(comparison, deltas):
+    """
+    Values the ghost runner section quotes, computed once per pair of tracks.
 
+    Returns:
+        dict with 'table' (per-km deltas for display), 'final_lead_min'
+        (2025 lead at the finish) and 'biggest' (row of the km with the
+        largest split gain)
+    """
+    table = deltas.rename(columns={
+        'km': 'Km',
+        'split_first': '2022 Split (s)',
+        'split_second': '2025 Split (s)',
+        'pace_delta': 'Pace Δ (min/km)',
+        'hr_first': '2022 HR',
+        'hr_second': '2025 HR',
+        'hr_delta': 'HR Δ (bpm)',
+        'gap': 'Gap (s)',
+    }).round(2)
+    return {
+        'table': table,
+        'final_lead_min': -comparison['gap'][-1] / 60,
+        'biggest': deltas.loc[deltas['split_second'].sub(deltas['split_first']).idxmin()].to_dict(),
+    }
+
+
+def _timeline_figure(races, times_minutes, times_labels, pace_decimal, pace_labels, colors):
+    """Finish time and average pace of every race on two axes."""
     fig_timeline = make_subplots(specs=[[{"secondary_y": True}]])
 
     # Add finish time trace
@@ -273,30 +161,11 @@ def render(colors, vo2max_df):
         hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
         margin=dict(l=70, r=70, t=30, b=60)
     )
+    return fig_timeline
 
-    st.plotly_chart(fig_timeline, use_container_width=True)
-
-    # Insights for Performance Timeline
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid {colors[0]};
-                margin: 20px 0;'>
-        <h4 style='color: {colors[0]}; margin-top: 0; font-size: 15px;'>Analysis: Non-Linear Progress Pattern</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The dual-axis chart shows that improvement has been non-linear across the six races. The largest single improvement
-            occurred from RVM 2023 to RVM 2024 (29 minutes) following a year-long break from marathon racing, while consecutive
-            race blocks showed more gradual gains. The pace curve demonstrates an accelerating rate of improvement in recent races.
-            The steepest pace improvement occurred between RVM 2024 and RVM 2025.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # VISUALIZATION 2: CUMULATIVE IMPROVEMENT WATERFALL
-    st.markdown("### Cumulative Improvement Breakdown")
-    st.markdown("*How much each race contributed to overall progress*")
 
+def _waterfall_figure(races, times_minutes, times_labels, total_improvement, colors):
+    """Minutes each race took off the previous finish time."""
     # Calculate improvements for waterfall
     improvements = [0]  # Start at 0
     for i in range(1, len(times_minutes)):
@@ -340,43 +209,11 @@ def render(colors, vo2max_df):
         ),
         margin=dict(l=70, r=30, t=30, b=60)
     )
+    return fig_waterfall
 
-    st.plotly_chart(fig_waterfall, use_container_width=True)
-
-    # Insights for Cumulative Improvement
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid {colors[1]};
-                margin: 20px 0;'>
-        <h4 style='color: {colors[1]}; margin-top: 0; font-size: 15px;'>Analysis: Cumulative Improvement Breakdown</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The waterfall chart shows how each race contributed to the total 80-minute improvement over three years. The first major
-            breakthrough (BMO 2023) yielded a 20-minute improvement, while RVM 2024 contributed the largest single gain of 29 minutes,
-            representing 36% of total improvement. Recent improvements have been smaller in magnitude: BMO 2025 contributed 10 minutes
-            and RVM 2025 added 11 minutes, reflecting the law of diminishing returns as performance levels increase.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-     # VISUALIZATION 3: SPLIT TIME COMPARISON - First vs Latest Marathon
-    st.markdown("### Split Time Comparison: First vs Latest Marathon")
-    st.markdown("*Time taken for each segment showing execution improvement*")
-
-    # Segment splits data (time in minutes for each segment)
-    # Based on official race results from Startline Timing
-    split_distances = ["0-10km", "10-21.1km", "21.1-30km", "30-40km", "40-42.2km"]
-
-    # RVM 2022 - Official splits (Chip time: 4:46:07)
-    # 10K: 59:14, 21.1K: 2:04:45, 30K: 3:07:32, 40K: 4:31:05, Finish: 4:46:07
-    first_splits = [59.23, 65.52, 62.78, 83.55, 15.03]  # Calculated from cumulative times
-
-    # RVM 2025 - Official splits (Chip time: 3:26:00)
-    # 10K: 45:09, 21.1K: 1:34:54, 30K: 2:17:20, 40K: 3:13:17, Finish: 3:26:00
-    latest_splits = [45.15, 49.75, 42.43, 55.95, 12.72]  # Calculated from cumulative times
 
-    # Create split comparison bar chart
+def _splits_figure(split_distances, first_splits, latest_splits, colors):
+    """Segment times of the first and latest marathon side by side."""
     fig_splits = go.Figure()
 
     fig_splits.add_trace(go.Bar(
@@ -432,66 +269,75 @@ def render(colors, vo2max_df):
         hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
         margin=dict(l=70, r=30, t=30, b=60)
     )
+    return fig_splits
 
-    st.plotly_chart(fig_splits, use_container_width=True)
 
-    # Insights for Split Time Comparison
-    # Calculate percentage improvements for each segment
-    segment_improvements = [(first_splits[i] - latest_splits[i]) / first_splits[i] * 100 for i in range(len(first_splits))]
-    avg_segment_improvement = sum(segment_improvements) / len(segment_improvements)
+def _ghost_figure(comparison, colors):
+    """2025 lead over the 2022 ghost and both paces along the course distance."""
+    overlay_km = comparison['distance'] / 1000
+    lead_min = -comparison['gap'] / 60
 
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid #00ff9f;
-                margin: 20px 0;'>
-        <h4 style='color: #00ff9f; margin-top: 0; font-size: 15px;'>Analysis: Split Time Comparison</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The split comparison shows improvement across all segments between first and latest marathon. The 30-40km segment demonstrates
-            the largest absolute improvement: 83.55 min to 55.95 min (33% faster). In RVM 2022, this segment included significant slowdown
-            and walking breaks, while RVM 2025 maintained a more controlled pace throughout.
-        </p>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            Average improvement across all segments is {avg_segment_improvement:.1f}%. The final 2.2km segment (40-42.2km) shows relatively
-            consistent finishing times despite the 80-minute overall improvement, indicating maintained energy levels through the late stages
-            of the race.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # VISUALIZATION 4: PACE COMPARISON - First vs Latest Marathon
-    st.markdown("### Pace Comparison: First vs Latest Marathon")
-    st.markdown("*Pace evolution across distance showing improved consistency*")
-
-    # Distance markers for marathon split points
-    distance_km = [10, 21.1, 30, 40, 42.2]
+    fig_ghost = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08, row_heights=[0.55, 0.45],
+    )
 
-    # RVM 2022 - Official paces from Startline Timing
-    # 10K: 05:55/km, 21.1K: 05:54/km, 30K: 06:15/km, 40K: 06:46/km, Overall: 06:46/km
-    first_marathon_pace = [5.92, 5.90, 6.25, 6.77, 6.77]
-    # First marathon pace in min:seconds format
-    first_marathon_pace_labels = [
-        "05:55",  # 10K pace
-        "05:54",  # 21.1K pace
-        "06:15",  # 30K pace
-        "06:46",  # 40K pace
-        "06:46"   # Overall pace
-    ]
+    fig_ghost.add_trace(go.Scatter(
+        x=overlay_km,
+        y=lead_min,
+        mode='lines',
+        name='2025 lead',
+        line=dict(color=colors[0], width=3),
+        fill='tozeroy',
+        fillcolor='rgba(0, 217, 255, 0.15)',
+        hovertemplate="<b>%{x:.2f} km</b><br>2025 ahead by %{y:.1f} min<extra></extra>"
+    ), row=1, col=1)
+
+    for pace, name, color in (
+        (comparison['pace_first'], 'RVM 2022 pace', colors[1]),
+        (comparison['pace_second'], 'RVM 2025 pace', colors[0]),
+    ):
+        fig_ghost.add_trace(go.Scatter(
+            x=overlay_km,
+            y=pace,
+            mode='lines',
+            name=name,
+            line=dict(color=color, width=2),
+            hovertemplate=f"<b>{name}</b><br>%{{x:.2f}} km<br>%{{y:.2f}} min/km<extra></extra>"
+        ), row=2, col=1)
+
+    fig_ghost.update_layout(
+        height=600,
+        plot_bgcolor="black",
+        paper_bgcolor="black",
+        font=dict(family='Arial', color=colors[4]),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            font=dict(color=colors[4])
+        ),
+        hovermode='x unified',
+        hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
+        margin=dict(l=70, r=30, t=30, b=60)
+    )
+    fig_ghost.update_xaxes(tickfont=dict(size=12, color=colors[4]), showgrid=False)
+    fig_ghost.update_xaxes(title_text="Distance (km)", title_font=dict(size=14, color=colors[0]), row=2, col=1)
+    fig_ghost.update_yaxes(
+        tickfont=dict(size=12, color=colors[4]),
+        showgrid=True,
+        gridcolor='rgba(0, 217, 255, 0.15)',
+        title_font=dict(size=14, color=colors[0])
+    )
+    fig_ghost.update_yaxes(title_text="2025 Lead (min)", row=1, col=1)
+    fig_ghost.update_yaxes(title_text="Pace (min/km)", autorange='reversed', row=2, col=1)
+    return fig_ghost
 
-    # RVM 2025 - Official paces from Startline Timing
-    # 10K: 04:30/km, 21.1K: 04:29/km, 30K: 04:34/km, 40K: 04:49/km, Overall: 04:52/km
-    latest_marathon_pace = [4.50, 4.48, 4.57, 4.82, 4.87]
-    # Latest marathon pace in min:seconds format
-    latest_marathon_pace_labels = [
-        "04:30",  # 10K pace
-        "04:29",  # 21.1K pace
-        "04:34",  # 30K pace
-        "04:49",  # 40K pace
-        "04:52"   # Overall pace
-    ]
 
-    # Create pace comparison line chart
+def _pace_comparison_figure(distance_km, first_marathon_pace, first_marathon_pace_labels,
+                            latest_marathon_pace, latest_marathon_pace_labels, colors):
+    """Pace at the split points of the first and latest marathon."""
     fig_pace_comparison = go.Figure()
 
     # Add first marathon pace line
@@ -568,57 +414,11 @@ def render(colors, vo2max_df):
         hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
         margin=dict(l=70, r=30, t=30, b=60)
     )
+    return fig_pace_comparison
 
-    st.plotly_chart(fig_pace_comparison, use_container_width=True)
-
-    # Insights for Pace Comparison
-    # Calculate pace variability for both races
-    pace_range_2022 = max(first_marathon_pace) - min(first_marathon_pace)
-    pace_range_2025 = max(latest_marathon_pace) - min(latest_marathon_pace)
-    variability_improvement = ((pace_range_2022 - pace_range_2025) / pace_range_2022) * 100
-
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid {colors[0]};
-                margin: 20px 0;'>
-        <h4 style='color: {colors[0]}; margin-top: 0; font-size: 15px;'>Insight: Conquering The Wall</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            This visualization tells the story of <strong>mental resilience and improved endurance</strong>. RVM 2022's pace line shows the classic
-            marathon challenge: starting too fast (05:54-05:55) then hitting the wall dramatically (06:46 by 40km). The pace variability was
-            <strong>{pace_range_2022:.2f} min/km</strong>—indicating poor energy management and premature glycogen depletion.
-        </p>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            RVM 2025 demonstrates significant growth: the pace line stays within the shaded consistency zone (04:29-04:52), representing
-            just <strong>{pace_range_2025:.2f} min/km variability</strong>—a {variability_improvement:.0f}% improvement in consistency.
-            While I haven't achieved negative splits, what stands out is the <strong>ability to push through the wall</strong> and maintain
-            a sustainable pace even when fatigue sets in. The controlled slowdown in later segments shows mental toughness rather than collapse.
-        </p>
-        <p style='color: {colors[1]}; line-height: 1.8; font-size: 13px; margin: 10px 0; padding: 12px;
-                  background: rgba(0, 217, 255, 0.05); border-radius: 6px;'>
-            <strong>Key Takeaway:</strong> Progress isn't always about running faster—it's about running smarter and stronger. The significant
-            reduction in pace variability demonstrates improved endurance and the mental fortitude to maintain form when the body wants to quit.
-            This is the foundation for future breakthroughs.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-
-    # VISUALIZATION 5: PERFORMANCE CONSISTENCY METRIC
-    st.markdown("### Pace Consistency Analysis")
-    st.markdown("*Standard deviation of pace across race segments (lower = more consistent)*")
-
-    # Calculate pace consistency for each race (simulated data based on race narratives)
-    consistency_scores = [
-        {'race': 'RVM 2022', 'std_dev': 0.95, 'rating': 'Poor'},
-        {'race': 'BMO 2023', 'std_dev': 0.42, 'rating': 'Good'},
-        {'race': 'RVM 2023', 'std_dev': 0.38, 'rating': 'Good'},
-        {'race': 'RVM 2024', 'std_dev': 0.28, 'rating': 'Excellent'},
-        {'race': 'BMO 2025', 'std_dev': 0.35, 'rating': 'Very Good'},
-        {'race': 'RVM 2025', 'std_dev': 0.18, 'rating': 'Outstanding'}
-    ]
 
+def _consistency_figure(consistency_scores, colors):
+    """Pace standard deviation of every race against the rating thresholds."""
     consistency_x = [item['race'] for item in consistency_scores]
     consistency_y = [item['std_dev'] for item in consistency_scores]
     consistency_colors_list = [colors[1] if val > 0.5 else colors[0] if val > 0.3 else '#00ff9f' for val in consistency_y]
@@ -676,38 +476,12 @@ def render(colors, vo2max_df):
         ),
         margin=dict(l=70, r=30, t=30, b=60)
     )
+    return fig_consistency
 
-    st.plotly_chart(fig_consistency, use_container_width=True)
-
-    # Insights for Pace Consistency
-    consistency_improvement = ((consistency_scores[0]['std_dev'] - consistency_scores[-1]['std_dev']) /
-                               consistency_scores[0]['std_dev']) * 100
-
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid {colors[1]};
-                margin: 20px 0;'>
-        <h4 style='color: {colors[1]}; margin-top: 0; font-size: 15px;'>Analysis: Pace Consistency Metrics</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            Pace consistency improved {consistency_improvement:.0f}% from first to latest marathon, with standard deviation decreasing
-            from 0.95 min/km (Poor) to 0.18 min/km (Outstanding). Lower standard deviation indicates more even pacing throughout the race.
-        </p>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The largest single consistency improvement occurred from RVM 2022 to BMO 2023 (0.95 to 0.42), while subsequent races
-            showed gradual refinement. RVM 2025's 0.18 standard deviation represents the most consistent pacing across all six marathons,
-            with minimal pace variation across the 42km distance despite accumulating fatigue.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # VISUALIZATION 6: VO2 MAX PROGRESSION (2025)
-    st.markdown("### VO₂ Max Progression (2025)")
-    st.markdown("*Estimated aerobic capacity throughout the 2025 training cycle*")
 
-    # Filter VO2 Max data for 2025 running activities
-    vo2_2025 = vo2max_df[vo2max_df['Activity Type'] == 'running'].copy()
+def _vo2_figure(vo2max_df, colors):
+    """Monthly VO2 max estimate of running activities."""
+    vo2_2025 = _running_vo2(vo2max_df)
 
     # Create VO2 Max line chart
     fig_vo2 = go.Figure()
@@ -746,13 +520,502 @@ def render(colors, vo2max_df):
         margin=dict(l=70, r=30, t=30, b=60),
         showlegend=False
     )
+    return fig_vo2
+
+
+@st.fragment
+def render_race_replay(colors, comparison):
+    """
+    Render the RVM 2022 vs 2025 replay: both runners' positions at the same
+    race time.
+
+    A fragment, so moving the replay slider reruns only this chart instead
+    of the whole app.
+
+    Args:
+        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
+        comparison (dict): Race comparison from race_comparison.compare_races
+    """
+    replay_min = st.slider(
+        "Race replay (minutes from the start)",
+        min_value=0.0,
+        max_value=float(np.ceil(comparison['time_first'][-1] / 60)),
+        value=120.0,
+        step=0.5,
+    )
+    replay_tracks = {
+        'RVM 2022': get_track(active_athlete(), RVM_2022_FILE, track_cache_key(RVM_2022_FILE)),
+        'RVM 2025': get_track(active_athlete(), RVM_2025_FILE, track_cache_key(RVM_2025_FILE)),
+    }
+    frame = frame_at(replay_tracks, replay_min * 60)
+    course_lat, course_lon = get_course_outline(active_athlete(), RVM_2025_FILE, track_cache_key(RVM_2025_FILE))
+
+    fig_replay = go.Figure()
+    fig_replay.add_trace(go.Scatter(
+        x=course_lon,
+        y=course_lat,
+        mode='lines',
+        name='Course',
+        line=dict(color='rgba(224, 244, 255, 0.35)', width=2),
+        hoverinfo='skip'
+    ))
+    for i, (label, color) in enumerate(zip(frame['labels'], (colors[1], colors[0]))):
+        status = "finished" if frame['finished'][i] else f"{frame['distance'][i] / 1000:.2f} km"
+        fig_replay.add_trace(go.Scatter(
+            x=[frame['lon'][i]],
+            y=[frame['lat'][i]],
+            mode='markers+text',
+            name=label,
+            marker=dict(color=color, size=16, line=dict(color=colors[4], width=2)),
+            text=[f"{label}: {status}"],
+            textposition='top center',
+            textfont=dict(color=color, size=13),
+            hovertemplate=f"<b>{label}</b><br>{status}<extra></extra>"
+        ))
+
+    fig_replay.update_layout(
+        height=500,
+        plot_bgcolor="black",
+        paper_bgcolor="black",
+        font=dict(family='Arial', color=colors[4]),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, scaleanchor='x', scaleratio=1 / np.cos(np.radians(float(np.mean(course_lat))))),
+        showlegend=False,
+        margin=dict(l=10, r=10, t=10, b=10)
+    )
+
+    st.plotly_chart(fig_replay, use_container_width=True)
+
+
+def render(colors, vo2max_df):
+    """
+    Render the Marathon Performance Analytics page with race data and visualizations.
+
+    Args:
+        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
+        vo2max_df (pd.DataFrame): VO2 Max data with columns ['Month', 'Activity Type', 'VO2 Max']
+    """
+    st.title("Marathon Performance Analytics")
+    st.markdown("*Visualizing 3 years of improvement across 6 marathon races*")
+
+    # Define comprehensive race data
+    races = ["RVM 2022", "BMO 2023", "RVM 2023", "RVM 2024", "BMO 2025", "RVM 2025"]
+    times_minutes = [286.12, 265.80, 256.97, 227.78, 217.38, 206.00]  # In decimal minutes
+    times_labels = ["4:46:07", "4:25:48", "4:16:58", "3:47:47", "3:37:23", "3:26:00"]
+    pace_decimal = [6.50, 6.22, 6.07, 5.37, 5.12, 4.83]
+    pace_labels = ["6:30", "6:13", "6:04", "5:22", "5:07", "4:50"]
+
+    # Calculate key metrics
+    total_improvement = times_minutes[0] - times_minutes[-1]
+    total_improvement_pct = (total_improvement / times_minutes[0]) * 100
+    avg_pace_improvement = pace_decimal[0] - pace_decimal[-1]
+    best_race_improvement = max([times_minutes[i] - times_minutes[i+1] for i in range(len(times_minutes)-1)])
+
+    # KEY PERFORMANCE METRICS - Compact Cards
+    st.markdown("### Performance at a Glance")
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[0]};
+                    text-align: center;'>
+            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Total Time Saved</h4>
+            <h3 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{int(total_improvement)} min</h2>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>{total_improvement_pct:.1f}% faster</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[1]};
+                    text-align: center;'>
+            <h4 style='color: {colors[1]}; margin: 0; font-size: 14px;'>Pace Improvement</h4>
+            <h3 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{avg_pace_improvement:.1f} min/km</h2>
+            <p style='color: {colors[0]}; margin: 0; font-size: 12px;'>{pace_labels[0]} → {pace_labels[-1]}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid #00ff9f;
+                    text-align: center;'>
+            <h4 style='color: #00ff9f; margin: 0; font-size: 14px;'>Best Improvement</h4>
+            <h3 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{int(best_race_improvement)} min</h2>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>Single race jump</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[0]};
+                    text-align: center;'>
+            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Avg Per Race</h4>
+            <h3 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{int(total_improvement/5)} min</h3>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>Consistency rate</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+     # RACE NARRATIVES - Detailed Stories
+    st.markdown("### Race Narratives: The Journey")
+    st.markdown("*The story behind each marathon*")
+
+    race_narratives = [
+        {
+            'race': 'RVM 2022',
+            'title': 'The Beginning: First Marathon Experience',
+            'story': '''My marathon journey began with a true test of grit and humility. With almost no structured training,
+            little race-day experience, and still regaining strength after a severe illness just weeks before, I stood at the
+            start line just hoping to somehow make it through. By the time I was 16 km into the race, I hit the infamous wall—my
+            legs heavy and cramped, my energy fading. Much of the remainder was a battle of willpower, alternating between running
+            and walking, each step a lesson in perseverance. I crossed the finish line in 4:46:07, managing to secure a sub-5 hour finish.
+            This first marathon exposed my weaknesses—pacing, nutrition, and mental resilience—while igniting a deep desire to improve.
+            It was a humbling beginning, but it became the cornerstone for every breakthrough that followed.''',
+            'key_learning': 'Completion over speed - establishing the foundation.'
+        },
+        {
+            'race': 'BMO 2023',
+            'title': 'Breakthrough Performance: First Sub-4:30',
+            'story': '''I signed up for the BMO Vancouver Marathon 2023 the day after my first RVM, while I was barely recovered. Armed with
+            improved training volume and a longer prep period, this race delivered a significant 20-minute improvement. The 4:25:48 finish represented
+            the first major breakthrough, demonstrating that structured training yields measurable results.''',
+            'key_learning': 'Structured training with adequate preparation time yields substantial improvements.'
+        },
+        {
+            'race': 'RVM 2023',
+            'title': 'Consolidation: Sub-4:20 Achievement',
+            'story': '''Building on previous success, this race focused on maintaining momentum rather than
+            dramatic improvements. Even though I had a better preparation for RVM 2023, I was mentally fatigued after going through 2 consecutive marathons and
+            prep phases over a span of 8 months. This resulted in me slacking off and not following through with the training plan as diligently as before.
+            A 4:16:58 finish showed steady progression—9 minutes faster than the previous race, but I felt that there was untapped potential that I could have unlocked in this race.''',
+            'key_learning': 'Mental fatigue and inconsistent training limit physical gains - mindset matters.'
+        },
+        {
+            'race': 'RVM 2024',
+            'title': 'Major Breakthrough: Sub-4:00 Barrier Broken',
+            'story': '''After RVM 2023, I decided to take time off and came back for RVM 2024 a year later. I saw the most dramatic single-race
+            improvement: 29 minutes faster than the previous marathon. This performance resulted from refined training periodization, improved running
+            economy, and optimal race-day execution. The 3:47:47 finish demonstrated that when training, recovery, and execution align,
+            breakthrough performances become possible.''',
+            'key_learning': 'Strategic recovery and renewed focus enable breakthrough performances.'
+        },
+        {
+            'race': 'BMO 2025',
+            'title': 'First Attempt at Sub-3:30',
+            'story': '''After a successful breakthrough in RVM 2024, I decided to make my first sub-3:30 attempt at BMO 2025.
+            I went through an intensive prep phase with a heavy emphasis on long runs and overall training volume.
+            I secured a finish time of 3:37:23—a 10-minute improvement.
+            Race execution was characterized by even pacing and effective fueling strategy. I hit the wall around 35 km, after which I got slower and couldn't keep
+            up the pace. I understood that I needed more tempo runs, speed work, and lactate threshold-specific training in my training plan to be able to sustain a faster pace
+            for longer.''',
+            'key_learning': 'Volume alone is not enough - specificity and intensity work are essential.'
+        },
+        {
+            'race': 'RVM 2025',
+            'title': 'Peak Performance: Sub-3:30 Achieved',
+            'story': '''The culmination of three years of systematic training. A 3:26:00 finish represented an
+            11-minute improvement and 80-minute total reduction since the first marathon. This performance
+            demonstrated mature race execution: disciplined pacing, efficient energy systems, and mental fortitude.
+            The achievement marks a significant milestone while highlighting the law of diminishing returns ahead.''',
+            'key_learning': 'Mastery comes from sustained, intelligent effort over time.'
+        }
+    ]
+
+    for i, narrative in enumerate(race_narratives):
+        border_color = colors[0] if i % 2 == 0 else colors[1]
+
+        with st.expander(f"**{narrative['race']}** - {times_labels[i]} - {narrative['title']}", expanded=False):
+            st.markdown(f"""
+            <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 8px;
+                    border-left: 4px solid {border_color};
+                    margin: 10px 0;'>
+            <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin-bottom: 15px;'>
+                {narrative['story']}
+            </p>
+            <div style='background: rgba(0, 217, 255, 0.1);
+                        padding: 12px;
+                        border-radius: 6px;
+                        border-left: 3px solid {border_color};'>
+            <p style='color: {border_color}; font-weight: bold; font-size: 13px; margin: 0;'>
+                Key Learning: <span style='color: {colors[4]}; font-weight: normal;'>{narrative['key_learning']}</span>
+            </p>
+            </div>
+            </div>
+            """, unsafe_allow_html=True)
+
+            # Add race-specific metrics
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Finish Time", times_labels[i])
+            with col2:
+                st.metric("Average Pace", f"{pace_labels[i]}/km")
+            with col3:
+                if i > 0:
+                    improvement = times_minutes[i-1] - times_minutes[i]
+                    st.metric("Time Improvement", f"{int(improvement)} min", delta=f"-{int(improvement)} min")
+                else:
+                    st.metric("Status", "Baseline")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # VISUALIZATION 1: DUAL AXIS PERFORMANCE TIMELINE
+    st.markdown("### Performance Timeline: Time & Pace Evolution")
+
+    plotly_chart(PAGE, 'timeline', None, colors, lambda: _timeline_figure(races, times_minutes, times_labels, pace_decimal, pace_labels, colors), use_container_width=True)
+
+    # Insights for Performance Timeline
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid {colors[0]};
+                margin: 20px 0;'>
+        <h4 style='color: {colors[0]}; margin-top: 0; font-size: 15px;'>Analysis: Non-Linear Progress Pattern</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The dual-axis chart shows that improvement has been non-linear across the six races. The largest single improvement
+            occurred from RVM 2023 to RVM 2024 (29 minutes) following a year-long break from marathon racing, while consecutive
+            race blocks showed more gradual gains. The pace curve demonstrates an accelerating rate of improvement in recent races.
+            The steepest pace improvement occurred between RVM 2024 and RVM 2025.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # VISUALIZATION 2: CUMULATIVE IMPROVEMENT WATERFALL
+    st.markdown("### Cumulative Improvement Breakdown")
+    st.markdown("*How much each race contributed to overall progress*")
+
+    plotly_chart(PAGE, 'waterfall', None, colors, lambda: _waterfall_figure(races, times_minutes, times_labels, total_improvement, colors), use_container_width=True)
+
+    # Insights for Cumulative Improvement
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid {colors[1]};
+                margin: 20px 0;'>
+        <h4 style='color: {colors[1]}; margin-top: 0; font-size: 15px;'>Analysis: Cumulative Improvement Breakdown</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The waterfall chart shows how each race contributed to the total 80-minute improvement over three years. The first major
+            breakthrough (BMO 2023) yielded a 20-minute improvement, while RVM 2024 contributed the largest single gain of 29 minutes,
+            representing 36% of total improvement. Recent improvements have been smaller in magnitude: BMO 2025 contributed 10 minutes
+            and RVM 2025 added 11 minutes, reflecting the law of diminishing returns as performance levels increase.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+     # VISUALIZATION 3: SPLIT TIME COMPARISON - First vs Latest Marathon
+    st.markdown("### Split Time Comparison: First vs Latest Marathon")
+    st.markdown("*Time taken for each segment showing execution improvement*")
+
+    # Segment splits data (time in minutes for each segment)
+    # Based on official race results from Startline Timing
+    split_distances = ["0-10km", "10-21.1km", "21.1-30km", "30-40km", "40-42.2km"]
+
+    # RVM 2022 - Official splits (Chip time: 4:46:07)
+    # 10K: 59:14, 21.1K: 2:04:45, 30K: 3:07:32, 40K: 4:31:05, Finish: 4:46:07
+    first_splits = [59.23, 65.52, 62.78, 83.55, 15.03]  # Calculated from cumulative times
+
+    # RVM 2025 - Official splits (Chip time: 3:26:00)
+    # 10K: 45:09, 21.1K: 1:34:54, 30K: 2:17:20, 40K: 3:13:17, Finish: 3:26:00
+    latest_splits = [45.15, 49.75, 42.43, 55.95, 12.72]  # Calculated from cumulative times
+
+    # Create split comparison bar chart
+    plotly_chart(PAGE, 'splits', None, colors, lambda: _splits_figure(split_distances, first_splits, latest_splits, colors), use_container_width=True)
+
+    # Insights for Split Time Comparison
+    # Calculate percentage improvements for each segment
+    segment_improvements = [(first_splits[i] - latest_splits[i]) / first_splits[i] * 100 for i in range(len(first_splits))]
+    avg_segment_improvement = sum(segment_improvements) / len(segment_improvements)
+
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid #00ff9f;
+                margin: 20px 0;'>
+        <h4 style='color: #00ff9f; margin-top: 0; font-size: 15px;'>Analysis: Split Time Comparison</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The split comparison shows improvement across all segments between first and latest marathon. The 30-40km segment demonstrates
+            the largest absolute improvement: 83.55 min to 55.95 min (33% faster). In RVM 2022, this segment included significant slowdown
+            and walking breaks, while RVM 2025 maintained a more controlled pace throughout.
+        </p>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            Average improvement across all segments is {avg_segment_improvement:.1f}%. The final 2.2km segment (40-42.2km) shows relatively
+            consistent finishing times despite the 80-minute overall improvement, indicating maintained energy levels through the late stages
+            of the race.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # RACE OVERLAY: RVM 2022 vs RVM 2025 aligned by distance
+    st.markdown("### Ghost Runner: RVM 2022 vs RVM 2025")
+    st.markdown("*Both GPS tracks lined up by course distance: how far ahead the 2025 race was at every point*")
+
+    if track_file_exists(RVM_2022_FILE) and track_file_exists(RVM_2025_FILE):
+        track_version = (track_cache_key(RVM_2022_FILE), track_cache_key(RVM_2025_FILE))
+        comparison, deltas = get_race_comparison(active_athlete(), RVM_2022_FILE, track_version[0], RVM_2025_FILE, track_version[1])
+    else:
+        comparison, deltas = None, None
+
+    if comparison is None or len(comparison['distance']) == 0:
+        st.info("Race overlay needs both RVM 2022 and RVM 2025 activity files with GPS and time data.")
+    else:
+        plotly_chart(PAGE, 'ghost', track_version, colors, lambda: _ghost_figure(comparison, colors), use_container_width=True)
+
+        render_race_replay(colors, comparison)
+
+        ghost = cached_values(PAGE, 'ghost', track_version, lambda: ghost_summary(comparison, deltas))
+        st.dataframe(ghost['table'], use_container_width=True, hide_index=True)
+
+        lead_min, biggest = ghost['final_lead_min'], ghost['biggest']
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border-left: 4px solid #00ff9f;
+                    margin: 20px 0;'>
+            <h4 style='color: #00ff9f; margin-top: 0; font-size: 15px;'>Analysis: Ghost Runner</h4>
+            <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+                Racing its 2022 ghost, the 2025 run finishes {lead_min:.1f} minutes ahead on the GPS tracks. The lead grows
+                fastest at km {biggest['km']:.0f}, where the 2025 split was {biggest['split_first'] - biggest['split_second']:.0f} seconds quicker,
+                and the pace traces show where 2022 faded while 2025 held steady.
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # VISUALIZATION 4: PACE COMPARISON - First vs Latest Marathon
+    st.markdown("### Pace Comparison: First vs Latest Marathon")
+    st.markdown("*Pace evolution across distance showing improved consistency*")
+
+    # Distance markers for marathon split points
+    distance_km = [10, 21.1, 30, 40, 42.2]
+
+    # RVM 2022 - Official paces from Startline Timing
+    # 10K: 05:55/km, 21.1K: 05:54/km, 30K: 06:15/km, 40K: 06:46/km, Overall: 06:46/km
+    first_marathon_pace = [5.92, 5.90, 6.25, 6.77, 6.77]
+    # First marathon pace in min:seconds format
+    first_marathon_pace_labels = [
+        "05:55",  # 10K pace
+        "05:54",  # 21.1K pace
+        "06:15",  # 30K pace
+        "06:46",  # 40K pace
+        "06:46"   # Overall pace
+    ]
+
+    # RVM 2025 - Official paces from Startline Timing
+    # 10K: 04:30/km, 21.1K: 04:29/km, 30K: 04:34/km, 40K: 04:49/km, Overall: 04:52/km
+    latest_marathon_pace = [4.50, 4.48, 4.57, 4.82, 4.87]
+    # Latest marathon pace in min:seconds format
+    latest_marathon_pace_labels = [
+        "04:30",  # 10K pace
+        "04:29",  # 21.1K pace
+        "04:34",  # 30K pace
+        "04:49",  # 40K pace
+        "04:52"   # Overall pace
+    ]
+
+    # Create pace comparison line chart
+    plotly_chart(PAGE, 'pace_comparison', None, colors, lambda: _pace_comparison_figure(
+        distance_km, first_marathon_pace, first_marathon_pace_labels,
+        latest_marathon_pace, latest_marathon_pace_labels, colors), use_container_width=True)
+
+    # Insights for Pace Comparison
+    # Calculate pace variability for both races
+    pace_range_2022 = max(first_marathon_pace) - min(first_marathon_pace)
+    pace_range_2025 = max(latest_marathon_pace) - min(latest_marathon_pace)
+    variability_improvement = ((pace_range_2022 - pace_range_2025) / pace_range_2022) * 100
+
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid {colors[0]};
+                margin: 20px 0;'>
+        <h4 style='color: {colors[0]}; margin-top: 0; font-size: 15px;'>Insight: Conquering The Wall</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            This visualization tells the story of <strong>mental resilience and improved endurance</strong>. RVM 2022's pace line shows the classic
+            marathon challenge: starting too fast (05:54-05:55) then hitting the wall dramatically (06:46 by 40km). The pace variability was
+            <strong>{pace_range_2022:.2f} min/km</strong>—indicating poor energy management and premature glycogen depletion.
+        </p>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            RVM 2025 demonstrates significant growth: the pace line stays within the shaded consistency zone (04:29-04:52), representing
+            just <strong>{pace_range_2025:.2f} min/km variability</strong>—a {variability_improvement:.0f}% improvement in consistency.
+            While I haven't achieved negative splits, what stands out is the <strong>ability to push through the wall</strong> and maintain
+            a sustainable pace even when fatigue sets in. The controlled slowdown in later segments shows mental toughness rather than collapse.
+        </p>
+        <p style='color: {colors[1]}; line-height: 1.8; font-size: 13px; margin: 10px 0; padding: 12px;
+                  background: rgba(0, 217, 255, 0.05); border-radius: 6px;'>
+            <strong>Key Takeaway:</strong> Progress isn't always about running faster—it's about running smarter and stronger. The significant
+            reduction in pace variability demonstrates improved endurance and the mental fortitude to maintain form when the body wants to quit.
+            This is the foundation for future breakthroughs.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+    # VISUALIZATION 5: PERFORMANCE CONSISTENCY METRIC
+    st.markdown("### Pace Consistency Analysis")
+    st.markdown("*Standard deviation of pace across race segments (lower = more consistent)*")
+
+    # Calculate pace consistency for each race (simulated data based on race narratives)
+    consistency_scores = [
+        {'race': 'RVM 2022', 'std_dev': 0.95, 'rating': 'Poor'},
+        {'race': 'BMO 2023', 'std_dev': 0.42, 'rating': 'Good'},
+        {'race': 'RVM 2023', 'std_dev': 0.38, 'rating': 'Good'},
+        {'race': 'RVM 2024', 'std_dev': 0.28, 'rating': 'Excellent'},
+        {'race': 'BMO 2025', 'std_dev': 0.35, 'rating': 'Very Good'},
+        {'race': 'RVM 2025', 'std_dev': 0.18, 'rating': 'Outstanding'}
+    ]
+
+    plotly_chart(PAGE, 'consistency', None, colors, lambda: _consistency_figure(consistency_scores, colors), use_container_width=True)
+
+    # Insights for Pace Consistency
+    consistency_improvement = ((consistency_scores[0]['std_dev'] - consistency_scores[-1]['std_dev']) /
+                               consistency_scores[0]['std_dev']) * 100
+
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid {colors[1]};
+                margin: 20px 0;'>
+        <h4 style='color: {colors[1]}; margin-top: 0; font-size: 15px;'>Analysis: Pace Consistency Metrics</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            Pace consistency improved {consistency_improvement:.0f}% from first to latest marathon, with standard deviation decreasing
+            from 0.95 min/km (Poor) to 0.18 min/km (Outstanding). Lower standard deviation indicates more even pacing throughout the race.
+        </p>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The largest single consistency improvement occurred from RVM 2022 to BMO 2023 (0.95 to 0.42), while subsequent races
+            showed gradual refinement. RVM 2025's 0.18 standard deviation represents the most consistent pacing across all six marathons,
+            with minimal pace variation across the 42km distance despite accumulating fatigue.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # VISUALIZATION 6: VO2 MAX PROGRESSION (2025)
+    st.markdown("### VO₂ Max Progression (2025)")
+    st.markdown("*Estimated aerobic capacity throughout the 2025 training cycle*")
 
-    st.plotly_chart(fig_vo2, use_container_width=True)
+    vo2_version = data_version(VO2MAX_CSV)
+    plotly_chart(PAGE, 'vo2', vo2_version, colors, lambda: _vo2_figure(vo2max_df, colors), use_container_width=True)
 
-    # Calculate VO2 Max improvement
-    vo2_start = vo2_2025['VO2 Max'].iloc[0]
-    vo2_peak = vo2_2025['VO2 Max'].max()
-    vo2_current = vo2_2025['VO2 Max'].iloc[-1]
+    vo2 = cached_values(PAGE, 'vo2', vo2_version, lambda: vo2_stats(vo2max_df))
+    vo2_start, vo2_peak, vo2_current = vo2['start'], vo2['peak'], vo2['current']
     vo2_improvement = vo2_peak - vo2_start
 
     st.markdown(f"""
@@ -0,0 +1,38 @@
+"""
+Page Registry
+
+The dashboard's page table, dataset loaders and theme colors, shared by
+App.py and the static site builder (static_site.py). Importing it runs no
+Streamlit code and imports no page, plotting or data stack.
+"""
+
+import importlib
+
+# Theme color palette [cyan, purple, violet, abyss, ice-blue]
+COLORS = ["#00d9ff", "#b957ff", "#1a0d2e", "#0a0420", "#e0f4ff"]
+
+# Page table: sidebar label -> (page module, datasets its render() takes
+# after colors). A page module is imported only when its page is selected,
+# so visitors don't pay for the plotting, mapping and track-parsing stacks
+# of pages they never open.
+PAGES = {
+    "Home": ("home", ()),
+    "Project Background": ("background", ()),
+    "Race Performance Analytics": ("marathon_performance", ("vo2max",)),
+    "Training Volume Analysis": ("training_metrics", ()),
+    "Cardiovascular Efficiency": ("heart_rate_analysis", ("heart_rate",)),
+    "Geospatial Visualization": ("route_visualization", ()),
+    "Contact": ("contact", ()),
+}
+
+# Dataset -> (module, loader). Loaders are imported lazily too, so pages
+# without data don't import pandas.
+DATASETS = {
+    "vo2max": ("data_loader", "load_vo2max"),
+    "heart_rate": ("activity_frame", "load_heart_rate_activities"),
+}
+
+
+def load_dataset(name):
+    module_name, loader = DATASETS[name]
+    return getattr(importlib.import_module(module_name), loader)()
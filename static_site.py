@@ -0,0 +1,518 @@
+"""
+Static Site
+
+Writes a static HTML snapshot of the dashboard that can be served after a
+race without running Streamlit per visitor:
+
+- the page datasets are loaded once, in this process, and handed to the
+  page renders
+- every page is rendered headlessly (Streamlit's AppTest) across a process
+  pool, each page in its default state; its Plotly figures are embedded in
+  the page as JSON and drawn by plotly.js, folium maps as standalone
+  Leaflet documents
+- each figure also gets a PNG thumbnail (used as the no-JavaScript
+  fallback and the page's link preview) when kaleido is installed
+- a manifest records the inputs of every page (its code and the local
+  modules it imports, the data it reads, theme and page list), so a rebuild
+  only renders the pages whose inputs changed
+
+The site shows one athlete (--athlete, see athletes); other athletes'
+sites go to their own directory under site/.
+
+Usage:
+    python static_site.py [--athlete ID] [--output DIR] [--workers N] [--force] [--no-thumbnails]
+"""
+
+import argparse
+import ast
+import hashlib
+import html
+import importlib.util
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from athletes import DEFAULT_ATHLETE, SESSION_KEY, active_athlete, athlete_profile, list_athletes, set_active_athlete
+from page_registry import COLORS, PAGES, load_dataset
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = "site"
+MANIFEST_NAME = "manifest.json"
+STYLES_CSS = "styles.css"
+SITE_TITLE = "The Sub-3:30 Protocol"
+
+# Bump when the page HTML layout changes (every page is rebuilt)
+SITE_VERSION = 1
+
+PAGE_TIMEOUT_S = 300        # AppTest timeout for one page render
+THUMBNAIL_SIZE = (640, 360)  # PNG thumbnail width, height (px)
+
+# Local modules whose data a page depends on when it imports them
+# (directly or through other local modules), beyond its declared datasets
+EXPORT_MODULES = {'data_loader'}
+INGEST_MODULES = {'activity_catalog', 'track_store'}
+
+# Layout of the snapshot (the app's own styles.css is linked after it)
+SITE_CSS = """
+body { margin: 0; background: #000; color: #e0f4ff; font-family: Arial, sans-serif; }
+nav { display: flex; flex-wrap: wrap; gap: 0.5rem; padding: 1rem 2rem; background: #0a0420;
+      border-bottom: 1px solid rgba(0, 217, 255, 0.3); }
+nav .site-title { color: #00d9ff; font-weight: 700; margin-right: 1.5rem; }
+nav a { padding: 0.3rem 0.8rem; border-radius: 6px; }
+nav a.current { background: rgba(0, 217, 255, 0.15); }
+main { max-width: 1400px; margin: 0 auto; padding: 1rem 2rem 3rem 2rem; }
+.columns { display: flex; gap: 1rem; align-items: flex-start; }
+.columns > .column { min-width: 0; }
+.chart { width: 100%; margin: 0.5rem 0; }
+.chart img { max-width: 100%; }
+details { border: 1px solid rgba(0, 217, 255, 0.2); border-radius: 8px; padding: 0.5rem 1rem; margin: 0.5rem 0; }
+summary { cursor: pointer; }
+.metric { padding: 0.5rem 0; }
+.metric .label { font-size: 0.85rem; opacity: 0.8; }
+.metric .value { font-size: 1.8rem; }
+.alert { padding: 0.8rem 1rem; border-radius: 8px; margin: 0.5rem 0; background: rgba(0, 217, 255, 0.08); }
+.alert.warning { background: rgba(255, 170, 0, 0.12); }
+.alert.error { background: rgba(255, 85, 85, 0.15); }
+.widget { font-size: 0.85rem; opacity: 0.7; margin: 0.5rem 0; }
+table.dataframe { border-collapse: collapse; font-size: 0.85rem; margin: 0.5rem 0; }
+table.dataframe th, table.dataframe td { padding: 0.3rem 0.6rem; border-bottom: 1px solid rgba(0, 217, 255, 0.15); }
+footer.snapshot { text-align: center; font-size: 0.8rem; opacity: 0.6; padding: 2rem 0; }
+"""
+
+NAV_CURRENT = ' class="current"'
+
+# Draws every embedded figure once plotly.js has loaded
+FIGURE_SCRIPT = """
+document.querySelectorAll('script[data-figure]').forEach(function (source) {
+    var spec = JSON.parse(source.textContent);
+    var target = document.getElementById(source.dataset.figure);
+    target.innerHTML = '';
+    Plotly.newPlot(target, spec.data, spec.layout, {responsive: true, displaylogo: false});
+});
+"""
+
+
+def page_slug(label: str) -> str:
+    """File name stem of a page ('index' for the first page)."""
+    if label == next(iter(PAGES)):
+        return 'index'
+    return re.sub(r'[^a-z0-9]+', '-', label.lower()).strip('-')
+
+
+def _module_path(module: str) -> Optional[str]:
+    """Source file of a module in this directory (None for other modules)."""
+    path = os.path.join(APP_DIR, f"{module}.py")
+    return path if os.path.exists(path) else None
+
+
+def local_modules(module: str) -> List[str]:
+    """
+    A local module and every local module it imports, transitively
+    (imports inside functions included).
+    """
+    seen, pending = set(), [module]
+    while pending:
+        name = pending.pop()
+        path = _module_path(name)
+        if name in seen or path is None:
+            continue
+        seen.add(name)
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                pending.append(node.module.split('.')[0])
+    return sorted(seen)
+
+
+def page_inputs(label: str) -> dict:
+    """
+    Everything a page's snapshot is built from: site version, page list
+    (the navigation), theme, athlete, the code of the page and the local
+    modules it imports, and the versions of the data those modules read.
+    """
+    from activity_catalog import catalog_signature
+    from data_loader import data_version, file_version
+
+    module_name, _ = PAGES[label]
+    modules = local_modules(module_name)
+    data = {}
+    if EXPORT_MODULES & set(modules):
+        data['exports'] = data_version()
+    if INGEST_MODULES & set(modules):
+        data['ingest'] = list(catalog_signature())
+    return {
+        'site': SITE_VERSION,
+        'pages': list(PAGES),
+        'colors': COLORS,
+        'athlete': [active_athlete(), athlete_profile()],
+        'styles': file_version(os.path.join(APP_DIR, STYLES_CSS)),
+        'code': {module: file_version(_module_path(module)) for module in modules},
+        'data': data,
+    }
+
+
+def inputs_signature(inputs: dict) -> str:
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+def _inline_markdown(text: str) -> str:
+    """Escape text and convert inline markdown (bold, italics, code, links)."""
+    text = html.escape(text, quote=False)
+    text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    text = re.sub(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])', r'<em>\1</em>', text)
+    return re.sub(r'\[([^\]]+)\]\(([^)\s]+)\)', r'<a href="\2">\1</a>', text)
+
+
+def markdown_html(text: str) -> str:
+    """
+    HTML of a markdown element. Elements written as HTML (the pages'
+    unsafe_allow_html cards) pass through; markdown is converted for the
+    subset the pages use: headings, rules, bullet lists and paragraphs.
+    """
+    if text.lstrip().startswith('<'):
+        return text
+
+    blocks, paragraph, items = [], [], []
+
+    def flush():
+        if paragraph:
+            blocks.append(f"<p>{_inline_markdown(' '.join(paragraph))}</p>")
+            paragraph.clear()
+        if items:
+            blocks.append("<ul>" + "".join(f"<li>{_inline_markdown(item)}</li>" for item in items) + "</ul>")
+            items.clear()
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = re.match(r'(#{1,6})\s+(.*)', stripped)
+        if not stripped:
+            flush()
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{_inline_markdown(heading.group(2))}</h{level}>")
+        elif re.fullmatch(r'-{3,}|\*{3,}', stripped):
+            flush()
+            blocks.append("<hr>")
+        elif re.match(r'[-*]\s+', stripped):
+            if paragraph:
+                flush()
+            items.append(stripped[2:].strip())
+        elif items and line[:1].isspace():
+            items[-1] += ' ' + stripped     # continuation of a list item
+        else:
+            if items:
+                flush()
+            paragraph.append(stripped)
+    flush()
+    return "\n".join(blocks)
+
+
+def _folium_document(args: dict) -> str:
+    """Standalone Leaflet page of a streamlit-folium map."""
+    links = "".join(f'<link rel="stylesheet" href="{html.escape(link)}">' for link in args.get('css_links', []))
+    scripts = "".join(f'<script src="{html.escape(link)}"></script>' for link in args.get('js_links', []))
+    return (
+        f"<!DOCTYPE html><html><head>{links}{scripts}{args.get('header', '')}"
+        f"<style>html, body {{ margin: 0; height: 100%; }}</style></head>"
+        f"<body><div id=\"{args.get('id', 'map_div')}\" style=\"height: 100%;\"></div>{args.get('html', '')}"
+        f"<script>{args.get('script', '')}</script></body></html>"
+    )
+
+
+def _widget_value(node) -> str:
+    """Display text of an input widget's value."""
+    if getattr(node, 'options', None) and getattr(node, 'index', None) is not None:
+        return str(node.options[node.index])     # option label, as the widget shows it
+    value = node.value
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, tuple):
+        return " – ".join(str(item) for item in value)
+    if isinstance(value, list):
+        return ", ".join(map(str, value))
+    return str(value)
+
+
+class _PageWriter:
+    """Converts one rendered page's element tree to HTML, collecting its figures."""
+
+    def __init__(self, slug: str, thumbnail_dir: Optional[str]):
+        self.slug = slug
+        self.thumbnail_dir = thumbnail_dir
+        self.thumbnails: List[str] = []
+        self.figures = 0
+
+    def children(self, node) -> str:
+        return "\n".join(self.element(child) for child in getattr(node, 'children', {}).values())
+
+    def element(self, node) -> str:
+        kind = getattr(node, 'type', '')
+        if kind in ('markdown', 'caption'):
+            return markdown_html(node.value)
+        if kind == 'divider':
+            return "<hr>"
+        if kind in ('title', 'header', 'subheader'):
+            tag = {'title': 'h1', 'header': 'h2', 'subheader': 'h3'}[kind]
+            return f"<{tag}>{_inline_markdown(node.value)}</{tag}>"
+        if kind in ('info', 'warning', 'error', 'success'):
+            return f'<div class="alert {kind}">{markdown_html(node.value)}</div>'
+        if kind == 'metric':
+            delta = f'<div class="delta">{html.escape(node.proto.delta)}</div>' if node.proto.delta else ""
+            return (f'<div class="metric"><div class="label">{_inline_markdown(node.label)}</div>'
+                    f'<div class="value">{html.escape(str(node.value))}</div>{delta}</div>')
+        if kind == 'dataframe':
+            return node.value.to_html(index=False, classes='dataframe', border=0, na_rep='')
+        if kind == 'plotly_chart':
+            return self.figure(json.loads(node.proto.spec))
+        if kind == 'component_instance':
+            return self.component(node.proto)
+        if kind == 'expander':
+            state = " open" if node.proto.expanded else ""
+            return f"<details{state}><summary>{_inline_markdown(node.label)}</summary>\n{self.children(node)}\n</details>"
+        if kind == 'column':
+            return f'<div class="column" style="flex: {node.weight};">\n{self.children(node)}\n</div>'
+        if hasattr(node, 'children'):
+            columns = all(getattr(child, 'type', '') == 'column' for child in node.children.values())
+            return f'<div class="{"columns" if columns and node.children else "block"}">\n{self.children(node)}\n</div>'
+        if hasattr(node, 'label') and hasattr(node, 'value'):
+            # Input widgets are shown with the value the page was rendered with
+            return f'<div class="widget">{_inline_markdown(node.label)}: {html.escape(_widget_value(node))}</div>'
+        logger.debug(f"{self.slug}: skipped {kind or type(node).__name__} element")
+        return ""
+
+    def figure(self, spec: dict) -> str:
+        figure_id = f"figure-{self.figures}"
+        self.figures += 1
+        fallback = ""
+        if self.thumbnail_dir is not None:
+            import plotly.io as pio
+
+            name = f"{self.slug}-{figure_id}.png"
+            width, height = THUMBNAIL_SIZE
+            with open(os.path.join(self.thumbnail_dir, name), 'wb') as f:
+                f.write(pio.to_image(spec, format='png', width=width, height=height, validate=False))
+            self.thumbnails.append(name)
+            fallback = f'<img src="thumbnails/{name}" alt="">'
+        data = json.dumps(spec, separators=(',', ':')).replace('</', '<\\/')
+        return (f'<div class="chart" id="{figure_id}">{fallback}</div>\n'
+                f'<script type="application/json" data-figure="{figure_id}">{data}</script>')
+
+    def component(self, proto) -> str:
+        if proto.component_name != 'streamlit_folium.st_folium':
+            logger.debug(f"{self.slug}: skipped component {proto.component_name}")
+            return ""
+        args = json.loads(proto.json_args)
+        return (f'<iframe class="map" srcdoc="{html.escape(_folium_document(args))}" '
+                f'style="width: 100%; height: {args.get("height") or 450}px; border: 0;"></iframe>')
+
+
+def _page_script(module_name, colors, datasets):
+    """AppTest script: render one page (run by AppTest, not called directly)."""
+    import importlib
+
+    importlib.import_module(module_name).render(colors, *datasets)
+
+
+def _page_document(label: str, body: str, thumbnails: List[str], built: str) -> str:
+    import plotly
+
+    nav = "".join(
+        f'<a href="{page_slug(other)}.html"{NAV_CURRENT if other == label else ""}>{html.escape(other)}</a>'
+        for other in PAGES
+    )
+    preview = f'<meta property="og:image" content="thumbnails/{thumbnails[0]}">' if thumbnails else ""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(label)} · {SITE_TITLE}</title>
+<meta property="og:title" content="{html.escape(label)} · {SITE_TITLE}">
+{preview}
+<style>{SITE_CSS}</style>
+<link rel="stylesheet" href="{STYLES_CSS}">
+<script src="https://cdn.plot.ly/plotly-{plotly.offline.get_plotlyjs_version()}.min.js" charset="utf-8"></script>
+</head>
+<body>
+<nav><span class="site-title">{SITE_TITLE}</span>{nav}</nav>
+<main>
+{body}
+</main>
+<footer class="snapshot">Static snapshot built {built}</footer>
+<script>{FIGURE_SCRIPT}</script>
+</body>
+</html>
+"""
+
+
+def build_page(label: str, datasets: list, output_dir: str, thumbnails: bool, athlete: str = DEFAULT_ATHLETE) -> dict:
+    """
+    Render one page of an athlete headlessly and write its HTML (run in a
+    worker process).
+
+    Returns:
+        dict with 'label', 'files' (written, relative to output_dir),
+        'figures', 'seconds' and 'exceptions' (raised by the page render)
+    """
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    module_name, _ = PAGES[label]
+    app = AppTest.from_function(_page_script, default_timeout=PAGE_TIMEOUT_S, args=(module_name, COLORS, datasets))
+    # The script runs in its own thread: the athlete is passed the way the app does
+    app.session_state[SESSION_KEY] = athlete
+    app.run()
+
+    slug = page_slug(label)
+    thumbnail_dir = os.path.join(output_dir, 'thumbnails') if thumbnails else None
+    writer = _PageWriter(slug, thumbnail_dir)
+    body = writer.children(app.main)
+    built = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
+
+    page_file = f"{slug}.html"
+    tmp_path = os.path.join(output_dir, f"{page_file}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(_page_document(label, body, writer.thumbnails, built))
+    os.replace(tmp_path, os.path.join(output_dir, page_file))
+
+    return {
+        'label': label,
+        'files': [page_file] + [f"thumbnails/{name}" for name in writer.thumbnails],
+        'figures': writer.figures,
+        'seconds': time.perf_counter() - start,
+        'exceptions': [exception.value for exception in app.exception],
+    }
+
+
+def load_manifest(output_dir: str) -> dict:
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'pages': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, output_dir: str) -> None:
+    """Write the manifest as JSON, atomically."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def build_site(output_dir: str = SITE_DIR, workers: Optional[int] = None, force: bool = False, thumbnails: bool = True) -> Dict[str, dict]:
+    """
+    Build the static site of the active athlete, rendering only the pages
+    whose inputs changed.
+
+    Args:
+        output_dir (str): Site directory
+        workers (int, optional): Render processes (default: one per CPU)
+        force (bool): Render every page
+        thumbnails (bool): Write PNG thumbnails of the figures (needs kaleido)
+
+    Returns:
+        Manifest entries of the pages rendered in this build, by label
+    """
+    if thumbnails and importlib.util.find_spec('kaleido') is None:
+        logger.warning("kaleido is not installed: building without PNG thumbnails")
+        thumbnails = False
+    os.makedirs(os.path.join(output_dir, 'thumbnails'), exist_ok=True)
+    shutil.copyfile(os.path.join(APP_DIR, STYLES_CSS), os.path.join(output_dir, STYLES_CSS))
+
+    manifest = load_manifest(output_dir)
+    previous = manifest.get('pages', {})
+    if manifest.get('thumbnails') != thumbnails:
+        force = True
+    signatures = {label: inputs_signature(page_inputs(label)) for label in PAGES}
+    stale = [
+        label for label in PAGES
+        if force
+        or previous.get(label, {}).get('inputs') != signatures[label]
+        or not all(os.path.exists(os.path.join(output_dir, name)) for name in previous[label]['files'])
+    ]
+
+    # Drop the files of pages removed from the app and the thumbnails of
+    # stale pages (their figures are rewritten); a stale page's HTML is
+    # replaced in place, so it keeps being served if its render fails
+    for label, entry in previous.items():
+        if label in PAGES and label not in stale:
+            continue
+        for name in entry['files']:
+            path = os.path.join(output_dir, name)
+            if os.path.exists(path) and (label not in PAGES or not name.endswith('.html')):
+                os.remove(path)
+
+    pages = {label: entry for label, entry in previous.items() if label in PAGES and label not in stale}
+    logger.info(f"{len(stale)} of {len(PAGES)} pages to render")
+    if not stale:
+        return {}
+
+    # Every dataset the stale pages take is loaded once, here
+    names = sorted({name for label in stale for name in PAGES[label][1]})
+    datasets = {name: load_dataset(name) for name in names}
+
+    rendered = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            label: pool.submit(build_page, label, [datasets[name] for name in PAGES[label][1]], output_dir, thumbnails, active_athlete())
+            for label in stale
+        }
+        for label, future in futures.items():
+            result = future.result()
+            if result['exceptions']:
+                # Left out of the manifest, so the page is rendered again next build
+                logger.warning(f"{label}: page raised {len(result['exceptions'])} exception(s): {result['exceptions'][0]}")
+                continue
+            entry = {'inputs': signatures[label], 'files': result['files'], 'figures': result['figures']}
+            rendered[label] = pages[label] = entry
+            logger.info(f"{label}: {result['figures']} figures in {result['seconds']:.1f} s")
+
+    manifest = {
+        'version': SITE_VERSION,
+        'built': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'thumbnails': thumbnails,
+        'pages': pages,
+    }
+    save_manifest(manifest, output_dir)
+    return rendered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a static HTML snapshot of every dashboard page")
+    parser.add_argument("--athlete", default=DEFAULT_ATHLETE, choices=list_athletes(), help="athlete whose dashboard to snapshot")
+    parser.add_argument("--output", default=None, help="site directory (default: site/, or site/<athlete> for other athletes)")
+    parser.add_argument("--workers", type=int, default=None, help="number of render processes")
+    parser.add_argument("--force", action="store_true", help="render every page, changed or not")
+    parser.add_argument("--no-thumbnails", action="store_true", help="skip the PNG thumbnails")
+    args = parser.parse_args()
+    set_active_athlete(args.athlete)
+    if args.output is None:
+        args.output = SITE_DIR if args.athlete == DEFAULT_ATHLETE else os.path.join(SITE_DIR, args.athlete)
+
+    # Build through the importable module: AppTest replaces __main__ in the
+    # worker processes with the page script, so tasks must refer to
+    # static_site.build_page rather than __main__.build_page
+    import static_site
+
+    start = time.perf_counter()
+    rendered = static_site.build_site(args.output, args.workers, args.force, not args.no_thumbnails)
+    logger.info(f"Site written to {args.output}: {len(rendered)} page(s) rendered in {time.perf_counter() - start:.1f} s")
+    if len(static_site.load_manifest(args.output)['pages']) < len(PAGES):
+        sys.exit(1)
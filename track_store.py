@@ -0,0 +1,168 @@
+"""
+Parsed Track Cache
+
+Parsing a FIT file takes seconds, so parsed activity streams are stored
+as .npz files keyed by the source file's path, size and modification
+time. Each activity file is parsed once; later loads are a single
+uncompressed array read.
+
+For work across the whole history, ingest also writes a consolidated
+track table: selected streams of every activity concatenated into flat
+arrays, with an offsets array marking where each activity's points start,
+so per-activity values are segment reductions over a few large arrays.
+
+A track reference is a file path, optionally suffixed with "#N" to name
+the Nth track with points (0-based) of a multi-track GPX file such as a merged bulk
+export. The whole file is cached once and split on load. References and
+cache paths are relative to the active athlete's partition (see athletes).
+"""
+
+import hashlib
+import os
+from typing import Dict, Iterable
+
+import numpy as np
+
+from athletes import athlete_path
+from gpx_utils import parse_activity_streams, split_tracks
+
+CACHE_DIR = ".cache"
+TRACK_CACHE_DIR = os.path.join(CACHE_DIR, "tracks")
+TRACK_TABLE_PATH = os.path.join(CACHE_DIR, "track_table.npz")
+
+# Streams kept in the consolidated track table
+TABLE_FIELDS = ('lat', 'lon', 'distance')
+
+# Bump when the parsed stream layout or parser output changes
+TRACK_FORMAT_VERSION = 4
+
+TRACK_REF_SEPARATOR = "#"
+
+
+def split_track_ref(ref: str):
+    """
+    Split a track reference into its file path and track number.
+
+    Returns:
+        (filepath, track index or None for the whole file)
+    """
+    filepath, separator, index = ref.rpartition(TRACK_REF_SEPARATOR)
+    if separator and index.isdigit():
+        return filepath, int(index)
+    return ref, None
+
+
+def track_ref(filepath: str, index: int) -> str:
+    """Reference to the index-th track of a multi-track file."""
+    return f"{filepath}{TRACK_REF_SEPARATOR}{index}"
+
+
+def track_file_exists(ref: str) -> bool:
+    """Whether the file behind a track reference exists."""
+    return bool(ref) and os.path.exists(split_track_ref(athlete_path(ref))[0])
+
+
+def track_cache_key(filepath: str) -> str:
+    """
+    Identify a version of an activity file.
+
+    The key changes whenever the file is replaced or modified, or the
+    parser output changes, which invalidates its cached track. Track
+    references share the key of their file.
+
+    Returns:
+        16-character hex digest of (format version, path, size, mtime)
+    """
+    filepath = split_track_ref(athlete_path(filepath))[0]
+    stat = os.stat(filepath)
+    signature = f"{TRACK_FORMAT_VERSION}|{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+
+
+def save_track(path: str, streams: Dict[str, np.ndarray]) -> None:
+    """Write streams to an .npz file atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **streams)
+    os.replace(tmp_path, path)
+
+
+def load_track(filepath: str, cache_dir: str = TRACK_CACHE_DIR) -> Dict[str, np.ndarray]:
+    """
+    Load an activity's streams, parsing the source file only on a cache miss.
+
+    Args:
+        filepath (str): Path to a GPX/TCX/FIT activity file, or a track
+            reference to one track of a multi-track file
+        cache_dir (str): Directory holding cached .npz tracks
+
+    Returns:
+        Dict of stream arrays as returned by gpx_utils.parse_activity_streams
+    """
+    filepath, index = split_track_ref(athlete_path(filepath))
+    cache_dir = athlete_path(cache_dir)
+    path = os.path.join(cache_dir, f"{track_cache_key(filepath)}.npz")
+
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            streams = {name: cached[name] for name in cached.files}
+    else:
+        # Empty tracks (indoor workouts) are cached too so they aren't re-parsed
+        streams = parse_activity_streams(filepath)
+        save_track(path, streams)
+
+    if index is None:
+        return streams
+
+    tracks = split_tracks(streams)
+    if index >= len(tracks):
+        raise IndexError(f"{filepath} has {len(tracks)} tracks, no track {index}")
+    return tracks[index]
+
+
+def build_track_table(activity_ids: Iterable[int], tracks: Iterable[Dict[str, np.ndarray]], fields: Iterable[str] = TABLE_FIELDS) -> Dict[str, np.ndarray]:
+    """
+    Concatenate many activities' streams into one table.
+
+    Args:
+        activity_ids (iterable): Activity ID of each track
+        tracks (iterable): Streams as returned by load_track
+        fields (iterable): Stream names to keep
+
+    Returns:
+        Dict with 'activity_id' (one per track), 'offsets' (start index of
+        each track's points plus the total point count) and one flat array
+        per field. Track i's points are [offsets[i], offsets[i + 1]).
+    """
+    fields = tuple(fields)
+    ids, counts = [], []
+    columns = {name: [] for name in fields}
+    for activity_id, streams in zip(activity_ids, tracks):
+        ids.append(activity_id)
+        counts.append(len(streams['lat']))
+        for name in fields:
+            columns[name].append(streams[name])
+
+    table = {
+        'activity_id': np.array(ids, dtype=np.int64),
+        'offsets': np.concatenate(([0], np.cumsum(counts, dtype=np.int64))),
+    }
+    for name in fields:
+        table[name] = np.concatenate(columns[name]) if columns[name] else np.empty(0, dtype=np.float64)
+    return table
+
+
+def save_track_table(table: Dict[str, np.ndarray], path: str = TRACK_TABLE_PATH) -> None:
+    """Write the consolidated track table atomically."""
+    path = athlete_path(path)
+    save_track(path, table)
+
+
+def load_track_table(path: str = TRACK_TABLE_PATH) -> Dict[str, np.ndarray]:
+    """Load the consolidated track table (None if ingest hasn't written it)."""
+    path = athlete_path(path)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as stored:
+        return {name: stored[name] for name in stored.files}
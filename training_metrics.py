@@ -4,46 +4,60 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 
+from activity_store import parse_dates, read_sql, store_inputs
+from figure_cache import cached_values, plotly_chart
 
-def render(colors, activities_df):
-    """
-    Render the Training Metrics Analysis page with volume and consistency data.
+PAGE = "training_metrics"
 
-    Args:
-        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
-        activities_df (pd.DataFrame): Activities data with training metrics
+# RVM 2025 prep block: the 16 weeks before race day
+RVM_2025_RACE_DAY = pd.Timestamp('2025-10-12')
+RVM_2025_PREP_WEEKS = 16
+
+# Runs, and the runs of the RVM 2025 prep block (filters on the store's (type, date) index)
+RUNS = "FROM activities WHERE type = 'Run'"
+PREP_RUNS = f"{RUNS} AND date >= ? AND date <= ?"
+
+
+def _prep_range():
+    """Query parameters of the prep block's first and last instant."""
+    start = RVM_2025_RACE_DAY - pd.Timedelta(weeks=RVM_2025_PREP_WEEKS)
+    return (f"{start:%Y-%m-%d %H:%M:%S}", f"{RVM_2025_RACE_DAY:%Y-%m-%d %H:%M:%S}")
+
+
+def _prep_weeks():
+    """Distance and run count per week of the prep block."""
+    weekly_rvm = read_sql(
+        f"SELECT week_start AS Week, TOTAL(distance_km) AS Distance, COUNT(activity_id) AS Runs {PREP_RUNS} GROUP BY week_start ORDER BY week_start",
+        _prep_range()
+    )
+    weekly_rvm['Week'] = pd.to_datetime(weekly_rvm['Week'])
+    return weekly_rvm
+
+
+def volume_stats():
     """
-    st.title("Training Metrics Analysis")
-    st.markdown("*Building the foundation through consistent volume and smart progression*")
+    Summary values the page's cards and captions quote, aggregated in SQL.
 
-    # Prepare data
-    yearly_data = activities_df[activities_df['Activity Type'] == 'Run'].copy()
-    yearly_data['Activity Date'] = pd.to_datetime(yearly_data['Activity Date'], format="%b %d, %Y, %I:%M:%S %p")
-    yearly_data['Year'] = yearly_data['Activity Date'].dt.year
-    yearly_data['Month'] = yearly_data['Activity Date'].dt.to_period('M')
-    yearly_data['Week'] = yearly_data['Activity Date'].dt.to_period('W')
+    Returns:
+        dict of plain Python values; 'prep' holds the RVM 2025 prep block
+        values (None if it has no runs)
+    """
+    totals = read_sql(
+        "SELECT COUNT(*) AS runs, TOTAL(distance_km) AS distance, AVG(distance_km) AS avg_distance,"
+        f" TOTAL(elapsed_time_s) AS elapsed, COUNT(DISTINCT week_start) AS weeks, MIN(date) AS first, MAX(date) AS last {RUNS}"
+    ).iloc[0]
 
     # Calculate overall metrics
-    total_distance = yearly_data['Distance'].sum()
-    total_runs = len(yearly_data)
-    avg_distance_per_run = yearly_data['Distance'].mean()
-    total_time_hours = yearly_data['Elapsed Time'].sum() / 3600
+    total_distance = float(totals['distance'])
+    total_runs = int(totals['runs'])
 
     # Calculate consistency metrics
-    weeks_with_runs = yearly_data['Week'].nunique()
-    total_weeks = (yearly_data['Activity Date'].max() - yearly_data['Activity Date'].min()).days / 7
-    consistency_pct = (weeks_with_runs / total_weeks * 100) if total_weeks > 0 else 0
+    weeks_with_runs = int(totals['weeks'])
+    total_weeks = (pd.Timestamp(totals['last']) - pd.Timestamp(totals['first'])).days / 7
 
     # Calculate yearly totals
-    yearly_summary = yearly_data.groupby('Year').agg({
-        'Distance': 'sum',
-        'Activity ID': 'count'
-    }).reset_index()
-    yearly_summary.columns = ['Year', 'Total Distance (km)', 'Number of Runs']
-
-    years = yearly_summary['Year'].astype(int).tolist()
-    distances = yearly_summary['Total Distance (km)'].tolist()
-    run_counts = yearly_summary['Number of Runs'].tolist()
+    yearly_summary = read_sql(f"SELECT year, TOTAL(distance_km) AS distance, COUNT(activity_id) AS runs {RUNS} GROUP BY year ORDER BY year")
+    distances = yearly_summary['distance'].tolist()
 
     # Calculate year-over-year growth
     if len(distances) > 1:
@@ -53,66 +67,54 @@ def render(colors, activities_df):
         yoy_growth = 0
         avg_annual_growth = 0
 
-    # KEY PERFORMANCE METRICS - Compact Cards
-    st.markdown("### Training at a Glance")
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[0]};
-                    text-align: center;'>
-            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Total Distance</h4>
-            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{total_distance:,.0f} km</h2>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>{total_runs:,} runs</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col2:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[1]};
-                    text-align: center;'>
-            <h4 style='color: {colors[1]}; margin: 0; font-size: 14px;'>Consistency</h4>
-            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{consistency_pct:.1f}%</h2>
-            <p style='color: {colors[0]}; margin: 0; font-size: 12px;'>{weeks_with_runs} active weeks</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col3:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid #00ff9f;
-                    text-align: center;'>
-            <h4 style='color: #00ff9f; margin: 0; font-size: 14px;'>Avg Run</h4>
-            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{avg_distance_per_run:.1f} km</h2>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>Per activity</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col4:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
-                    padding: 20px;
-                    border-radius: 10px;
-                    border: 2px solid {colors[0]};
-                    text-align: center;'>
-            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>YoY Growth</h4>
-            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>+{avg_annual_growth:.1f}%</h2>
-            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>Annual avg increase</p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    # VISUALIZATION 1: ANNUAL VOLUME WITH DUAL AXIS
-    st.markdown("### Annual Training Volume Evolution")
+    # Distance categories in order
+    category_order = ['Recovery (< 5km)', 'Short (5-10km)', 'Medium (10-15km)', 'Long (15-25km)', 'Ultra Long (> 25km)']
+    category_counts = read_sql(f"SELECT distance_category, COUNT(*) AS runs {RUNS} GROUP BY distance_category").set_index('distance_category')['runs']
+    distance_categories = {c: int(category_counts[c]) for c in category_order if c in category_counts.index}
+    long_runs = distance_categories.get('Long (15-25km)', 0) + distance_categories.get('Ultra Long (> 25km)', 0)
+
+    stats = {
+        'total_distance': total_distance,
+        'total_runs': total_runs,
+        'avg_distance_per_run': float(totals['avg_distance']),
+        'total_time_s': float(totals['elapsed']),
+        'total_time_hours': float(totals['elapsed']) / 3600,
+        'weeks_with_runs': weeks_with_runs,
+        'total_weeks': total_weeks,
+        'consistency_pct': (weeks_with_runs / total_weeks * 100) if total_weeks > 0 else 0,
+        'years': yearly_summary['year'].astype(int).tolist(),
+        'distances': distances,
+        'run_counts': yearly_summary['runs'].tolist(),
+        'yoy_growth': yoy_growth,
+        'avg_annual_growth': avg_annual_growth,
+        'distance_categories': distance_categories,
+        'recovery_pct': (distance_categories.get('Recovery (< 5km)', 0) / total_runs * 100) if total_runs > 0 else 0,
+        'long_run_pct': (long_runs / total_runs * 100) if total_runs > 0 else 0,
+        'prep': None,
+    }
+
+    prep = read_sql(
+        f"SELECT COUNT(*) AS runs, TOTAL(distance_km) AS distance, AVG(distance_km) AS avg_distance, MAX(distance_km) AS longest {PREP_RUNS}",
+        _prep_range()
+    ).iloc[0]
+    if prep['runs'] > 0:
+        weekly_rvm = _prep_weeks()
+        stats['prep'] = {
+            'total_distance': float(prep['distance']),
+            'total_runs': int(prep['runs']),
+            'avg_distance': float(prep['avg_distance']),
+            'longest_run': float(prep['longest']),
+            'avg_weekly': float(prep['distance']) / RVM_2025_PREP_WEEKS,
+            'peak_week_distance': float(weekly_rvm['Distance'].max()),
+            'taper_week_distance': float(weekly_rvm['Distance'].iloc[-2]) if len(weekly_rvm) > 1 else 0,
+            'avg_weekly_rvm': float(weekly_rvm['Distance'].mean()),
+        }
+    return stats
+
+
+def _annual_volume_figure(stats, colors):
+    """Annual distance bars with the run count on a second axis."""
+    years, distances, run_counts = stats['years'], stats['distances'], stats['run_counts']
 
     # Color gradient
     bar_colors = ['#8b3fff', '#b957ff', '#00a8ff', '#00d9ff']
@@ -190,48 +192,16 @@ def render(colors, activities_df):
         margin=dict(l=70, r=70, t=30, b=60)
     )
 
-    st.plotly_chart(fig_annual, use_container_width=True)
+    return fig_annual
 
-    # Insights for Annual Volume Evolution
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
-                padding: 20px;
-                border-radius: 10px;
-                border-left: 4px solid {colors[0]};
-                margin: 20px 0;'>
-        <h4 style='color: {colors[0]}; margin-top: 0; font-size: 15px;'>Analysis: Progressive Volume Growth Pattern</h4>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The dual-axis chart shows a consistent upward trend in both total distance and number of runs across the years,
-            with an average annual growth rate of <strong>{avg_annual_growth:.1f}%</strong>. The number of runs (green line) increases
-            proportionally with total distance, indicating that volume growth comes from both increased running frequency and longer individual runs.
-        </p>
-        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
-            The progression shows no dramatic year-over-year spikes, suggesting a measured approach to volume accumulation.
-            Each year builds upon the previous baseline with gradual increases in both metrics.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # VISUALIZATION 2: CUMULATIVE DISTANCE OVER TIME
-    st.markdown("### Cumulative Training Progress")
-    st.markdown("*Total distance accumulation over time*")
 
-    # Calculate cumulative distance
-    yearly_data_sorted = yearly_data.sort_values('Activity Date')
-    yearly_data_sorted['Cumulative Distance'] = yearly_data_sorted['Distance'].cumsum()
-
-    # Calculate weekly and monthly summaries (needed for later visualizations)
-    weekly_summary = yearly_data.groupby('Week').agg({
-        'Distance': 'sum',
-        'Activity ID': 'count'
-    }).reset_index()
-    weekly_summary.columns = ['Week', 'Weekly Distance', 'Number of Runs']
-
-    monthly_summary = yearly_data.groupby('Month').agg({
-        'Distance': 'sum',
-        'Activity ID': 'count'
-    }).reset_index()
-    monthly_summary.columns = ['Month', 'Total Distance (km)', 'Number of Runs']
+def _cumulative_distance_figure(colors):
+    """Cumulative distance over every run (running total computed in SQL)."""
+    yearly_data_sorted = read_sql(
+        "SELECT date AS \"Activity Date\", SUM(distance_km) OVER (ORDER BY date, activity_id ROWS UNBOUNDED PRECEDING) AS \"Cumulative Distance\""
+        f" {RUNS} ORDER BY date, activity_id"
+    )
+    yearly_data_sorted['Activity Date'] = parse_dates(yearly_data_sorted['Activity Date'])
 
     fig_cumulative = go.Figure()
 
@@ -267,7 +237,339 @@ def render(colors, activities_df):
         margin=dict(l=70, r=30, t=30, b=60)
     )
 
-    st.plotly_chart(fig_cumulative, use_container_width=True)
+    return fig_cumulative
+
+
+def _distance_category_pie(stats, colors):
+    """Share of runs per distance category."""
+    dist_category_counts = pd.Series(stats['distance_categories'])
+
+    fig_dist_cat = go.Figure()
+
+    fig_dist_cat.add_trace(go.Pie(
+        labels=dist_category_counts.index.tolist(),
+        values=dist_category_counts.values.tolist(),
+        marker=dict(
+            colors=[colors[1], colors[0], '#00ff9f', '#ffaa00', '#ff5555'],
+            line=dict(color='#000000', width=2)
+        ),
+        textfont=dict(size=13, color='white'),
+        hovertemplate="<b>%{label}</b><br>Runs: %{value}<br>Percentage: %{percent}<extra></extra>"
+    ))
+
+    fig_dist_cat.update_layout(
+        height=500,
+        paper_bgcolor="black",
+        font=dict(family='Arial', color=colors[0]),
+        legend=dict(font=dict(color=colors[4], size=11)),
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+
+    return fig_dist_cat
+
+
+def _distance_category_bar(stats, colors):
+    """Number of runs per distance category."""
+    dist_category_counts = pd.Series(stats['distance_categories'])
+
+    fig_dist_bar = go.Figure()
+
+    fig_dist_bar.add_trace(go.Bar(
+        y=dist_category_counts.index.tolist(),
+        x=dist_category_counts.values.tolist(),
+        orientation='h',
+        marker=dict(
+            color=[colors[1], colors[0], '#00ff9f', '#ffaa00', '#ff5555'],
+            line=dict(color=colors[4], width=1)
+        ),
+        text=dist_category_counts.values.tolist(),
+        textposition='outside',
+        textfont=dict(size=12, color=colors[4]),
+        hovertemplate="<b>%{y}</b><br>Runs: %{x}<extra></extra>"
+    ))
+
+    fig_dist_bar.update_layout(
+        height=500,
+        plot_bgcolor="black",
+        paper_bgcolor="black",
+        font=dict(family='Arial', color=colors[4]),
+        xaxis=dict(
+            title="Number of Runs",
+            tickfont=dict(size=11, color=colors[4]),
+            showgrid=True,
+            gridcolor='rgba(0, 217, 255, 0.15)',
+            title_font=dict(size=12, color=colors[0])
+        ),
+        yaxis=dict(
+            tickfont=dict(size=11, color=colors[4]),
+            showgrid=False
+        ),
+        margin=dict(l=150, r=20, t=20, b=60)
+    )
+
+    return fig_dist_bar
+
+
+def _workout_type_count_pie(colors):
+    """Prep-block workouts by type, by number of runs."""
+    workout_type_counts = read_sql(
+        f"SELECT workout_type, COUNT(*) AS runs {PREP_RUNS} GROUP BY workout_type ORDER BY runs DESC, MIN(date)",
+        _prep_range()
+    ).set_index('workout_type')['runs']
+
+    fig_workout_pie = go.Figure()
+    fig_workout_pie.add_trace(go.Pie(
+        labels=workout_type_counts.index.tolist(),
+        values=workout_type_counts.values.tolist(),
+        marker=dict(
+            colors=[colors[1], colors[0], '#00ff9f', '#ffaa00', '#ff5555', '#00d9ff', '#b957ff', '#8b3fff'],
+            line=dict(color='#000000', width=2)
+        ),
+        textfont=dict(size=12, color='white'),
+        hovertemplate="<b>%{label}</b><br>Runs: %{value}<br>Percentage: %{percent}<extra></extra>"
+    ))
+
+    fig_workout_pie.update_layout(
+        title=dict(text="By Number of Runs", font=dict(size=14, color=colors[0])),
+        height=400,
+        paper_bgcolor="black",
+        font=dict(family='Arial', color=colors[0]),
+        legend=dict(font=dict(color=colors[4], size=10)),
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+
+    return fig_workout_pie
+
+
+def _workout_type_distance_pie(colors):
+    """Prep-block workouts by type, by total distance."""
+    workout_type_distance = read_sql(
+        f"SELECT workout_type, TOTAL(distance_km) AS distance {PREP_RUNS} GROUP BY workout_type ORDER BY workout_type",
+        _prep_range()
+    ).set_index('workout_type')['distance']
+
+    fig_workout_dist_pie = go.Figure()
+    fig_workout_dist_pie.add_trace(go.Pie(
+        labels=workout_type_distance.index.tolist(),
+        values=workout_type_distance.values.tolist(),
+        marker=dict(
+            colors=[colors[1], colors[0], '#00ff9f', '#ffaa00', '#ff5555', '#00d9ff', '#b957ff', '#8b3fff'],
+            line=dict(color='#000000', width=2)
+        ),
+        textfont=dict(size=12, color='white'),
+        hovertemplate="<b>%{label}</b><br>Distance: %{value:.1f} km<br>Percentage: %{percent}<extra></extra>"
+    ))
+
+    fig_workout_dist_pie.update_layout(
+        title=dict(text="By Total Distance", font=dict(size=14, color=colors[0])),
+        height=400,
+        paper_bgcolor="black",
+        font=dict(family='Arial', color=colors[0]),
+        legend=dict(font=dict(color=colors[4], size=10)),
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+
+    return fig_workout_dist_pie
+
+
+def _prep_weekly_figure(colors):
+    """Weekly distance and run count through the prep block."""
+    weekly_rvm = _prep_weeks()
+
+    fig_weekly = make_subplots(specs=[[{"secondary_y": True}]])
+
+    # Distance bars
+    fig_weekly.add_trace(
+        go.Bar(
+            x=weekly_rvm['Week'],
+            y=weekly_rvm['Distance'],
+            name='Weekly Distance',
+            marker=dict(
+                color=weekly_rvm['Distance'],
+                colorscale=[[0, colors[1]], [0.5, colors[0]], [1, '#00ff9f']],
+                line=dict(color=colors[4], width=1)
+            ),
+            text=[f"{dist:.0f}" for dist in weekly_rvm['Distance']],
+            textposition='inside',
+            textfont=dict(size=10, color='#000000', weight='bold'),
+            hovertemplate="<b>Week of %{x|%b %d}</b><br>Distance: %{y:.0f} km<extra></extra>"
+        ),
+        secondary_y=False
+    )
+
+    # Runs line
+    fig_weekly.add_trace(
+        go.Scatter(
+            x=weekly_rvm['Week'],
+            y=weekly_rvm['Runs'],
+            name='Number of Runs',
+            mode='lines+markers',
+            marker=dict(size=10, color='#00ff9f', line=dict(color=colors[4], width=2)),
+            line=dict(width=3, color='#00ff9f'),
+            hovertemplate="<b>Week of %{x|%b %d}</b><br>Runs: %{y}<extra></extra>"
+        ),
+        secondary_y=True
+    )
+
+    fig_weekly.update_xaxes(
+        title_text="Week",
+        title_font=dict(size=14, color=colors[0]),
+        tickfont=dict(size=11, color=colors[4]),
+        showgrid=False
+    )
+
+    fig_weekly.update_yaxes(
+        title_text="Distance (km)",
+        title_font=dict(size=14, color=colors[0]),
+        tickfont=dict(size=12, color=colors[4]),
+        showgrid=True,
+        gridcolor='rgba(0, 217, 255, 0.15)',
+        secondary_y=False
+    )
+
+    fig_weekly.update_yaxes(
+        title_text="Number of Runs",
+        title_font=dict(size=14, color='#00ff9f'),
+        tickfont=dict(size=12, color=colors[4]),
+        showgrid=False,
+        secondary_y=True
+    )
+
+    fig_weekly.update_layout(
+        height=500,
+        plot_bgcolor="black",
+        paper_bgcolor="black",
+        font=dict(family='Arial', color=colors[0]),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            font=dict(color=colors[4])
+        ),
+        hovermode='x unified',
+        hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
+        margin=dict(l=70, r=70, t=30, b=60)
+    )
+
+    return fig_weekly
+
+
+def render(colors):
+    """
+    Render the Training Metrics Analysis page with volume and consistency data.
+
+    Args:
+        colors (list): Theme color palette [cyan, purple, violet, abyss, ice-blue]
+    """
+    st.title("Training Metrics Analysis")
+    st.markdown("*Building the foundation through consistent volume and smart progression*")
+
+    # Summary values and figures are queried from the activity store once per
+    # data version; a rerun only emits them
+    version = store_inputs()
+    stats = cached_values(PAGE, 'stats', version, volume_stats)
+
+    total_distance = stats['total_distance']
+    total_runs = stats['total_runs']
+    avg_distance_per_run = stats['avg_distance_per_run']
+    total_time_hours = stats['total_time_hours']
+    weeks_with_runs = stats['weeks_with_runs']
+    total_weeks = stats['total_weeks']
+    consistency_pct = stats['consistency_pct']
+    distances = stats['distances']
+    yoy_growth = stats['yoy_growth']
+    avg_annual_growth = stats['avg_annual_growth']
+
+    # KEY PERFORMANCE METRICS - Compact Cards
+    st.markdown("### Training at a Glance")
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[0]};
+                    text-align: center;'>
+            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>Total Distance</h4>
+            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{total_distance:,.0f} km</h2>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>{total_runs:,} runs</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[1]};
+                    text-align: center;'>
+            <h4 style='color: {colors[1]}; margin: 0; font-size: 14px;'>Consistency</h4>
+            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{consistency_pct:.1f}%</h2>
+            <p style='color: {colors[0]}; margin: 0; font-size: 12px;'>{weeks_with_runs} active weeks</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid #00ff9f;
+                    text-align: center;'>
+            <h4 style='color: #00ff9f; margin: 0; font-size: 14px;'>Avg Run</h4>
+            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>{avg_distance_per_run:.1f} km</h2>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>Per activity</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #0a0420 0%, #1a0d2e 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    border: 2px solid {colors[0]};
+                    text-align: center;'>
+            <h4 style='color: {colors[0]}; margin: 0; font-size: 14px;'>YoY Growth</h4>
+            <h2 style='color: {colors[4]}; margin: 10px 0; font-size: 32px;'>+{avg_annual_growth:.1f}%</h2>
+            <p style='color: {colors[1]}; margin: 0; font-size: 12px;'>Annual avg increase</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # VISUALIZATION 1: ANNUAL VOLUME WITH DUAL AXIS
+    st.markdown("### Annual Training Volume Evolution")
+
+    plotly_chart(PAGE, 'annual_volume', version, colors, lambda: _annual_volume_figure(stats, colors), use_container_width=True)
+
+    # Insights for Annual Volume Evolution
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
+                padding: 20px;
+                border-radius: 10px;
+                border-left: 4px solid {colors[0]};
+                margin: 20px 0;'>
+        <h4 style='color: {colors[0]}; margin-top: 0; font-size: 15px;'>Analysis: Progressive Volume Growth Pattern</h4>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The dual-axis chart shows a consistent upward trend in both total distance and number of runs across the years,
+            with an average annual growth rate of <strong>{avg_annual_growth:.1f}%</strong>. The number of runs (green line) increases
+            proportionally with total distance, indicating that volume growth comes from both increased running frequency and longer individual runs.
+        </p>
+        <p style='color: {colors[4]}; line-height: 1.8; font-size: 14px; margin: 10px 0;'>
+            The progression shows no dramatic year-over-year spikes, suggesting a measured approach to volume accumulation.
+            Each year builds upon the previous baseline with gradual increases in both metrics.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # VISUALIZATION 2: CUMULATIVE DISTANCE OVER TIME
+    st.markdown("### Cumulative Training Progress")
+    st.markdown("*Total distance accumulation over time*")
+
+    plotly_chart(PAGE, 'cumulative_distance', version, colors, lambda: _cumulative_distance_figure(colors), use_container_width=True)
 
     # Insights for Cumulative Distance
     st.markdown(f"""
@@ -295,96 +597,19 @@ def render(colors, activities_df):
     st.markdown("### Run Distance Categories")
     st.markdown("*Distribution of training across different run types*")
 
-    # Categorize runs
-    def categorize_distance(dist):
-        if dist < 5:
-            return 'Recovery (< 5km)'
-        elif dist < 10:
-            return 'Short (5-10km)'
-        elif dist < 15:
-            return 'Medium (10-15km)'
-        elif dist < 25:
-            return 'Long (15-25km)'
-        else:
-            return 'Ultra Long (> 25km)'
-
-    yearly_data['Distance_Category'] = yearly_data['Distance'].apply(categorize_distance)
-    dist_category_counts = yearly_data['Distance_Category'].value_counts()
-
-    # Define order
-    category_order = ['Recovery (< 5km)', 'Short (5-10km)', 'Medium (10-15km)', 'Long (15-25km)', 'Ultra Long (> 25km)']
-    dist_category_counts = dist_category_counts.reindex([c for c in category_order if c in dist_category_counts.index])
-
     col1, col2 = st.columns([1, 1])
 
     with col1:
         # Pie chart
-        fig_dist_cat = go.Figure()
-
-        fig_dist_cat.add_trace(go.Pie(
-            labels=dist_category_counts.index.tolist(),
-            values=dist_category_counts.values.tolist(),
-            marker=dict(
-                colors=[colors[1], colors[0], '#00ff9f', '#ffaa00', '#ff5555'],
-                line=dict(color='#000000', width=2)
-            ),
-            textfont=dict(size=13, color='white'),
-            hovertemplate="<b>%{label}</b><br>Runs: %{value}<br>Percentage: %{percent}<extra></extra>"
-        ))
-
-        fig_dist_cat.update_layout(
-            height=500,
-            paper_bgcolor="black",
-            font=dict(family='Arial', color=colors[0]),
-            legend=dict(font=dict(color=colors[4], size=11)),
-            margin=dict(l=20, r=20, t=20, b=20)
-        )
-
-        st.plotly_chart(fig_dist_cat, use_container_width=True)
+        plotly_chart(PAGE, 'distance_category_pie', version, colors, lambda: _distance_category_pie(stats, colors), use_container_width=True)
 
     with col2:
         # Bar chart alternative
-        fig_dist_bar = go.Figure()
-
-        fig_dist_bar.add_trace(go.Bar(
-            y=dist_category_counts.index.tolist(),
-            x=dist_category_counts.values.tolist(),
-            orientation='h',
-            marker=dict(
-                color=[colors[1], colors[0], '#00ff9f', '#ffaa00', '#ff5555'],
-                line=dict(color=colors[4], width=1)
-            ),
-            text=dist_category_counts.values.tolist(),
-            textposition='outside',
-            textfont=dict(size=12, color=colors[4]),
-            hovertemplate="<b>%{y}</b><br>Runs: %{x}<extra></extra>"
-        ))
-
-        fig_dist_bar.update_layout(
-            height=500,
-            plot_bgcolor="black",
-            paper_bgcolor="black",
-            font=dict(family='Arial', color=colors[4]),
-            xaxis=dict(
-                title="Number of Runs",
-                tickfont=dict(size=11, color=colors[4]),
-                showgrid=True,
-                gridcolor='rgba(0, 217, 255, 0.15)',
-                title_font=dict(size=12, color=colors[0])
-            ),
-            yaxis=dict(
-                tickfont=dict(size=11, color=colors[4]),
-                showgrid=False
-            ),
-            margin=dict(l=150, r=20, t=20, b=60)
-        )
-
-        st.plotly_chart(fig_dist_bar, use_container_width=True)
+        plotly_chart(PAGE, 'distance_category_bar', version, colors, lambda: _distance_category_bar(stats, colors), use_container_width=True)
 
     # Insights for Run Distance Distribution
-    recovery_pct = (dist_category_counts.get('Recovery (< 5km)', 0) / total_runs * 100) if total_runs > 0 else 0
-    long_runs = dist_category_counts.get('Long (15-25km)', 0) + dist_category_counts.get('Ultra Long (> 25km)', 0)
-    long_run_pct = (long_runs / total_runs * 100) if total_runs > 0 else 0
+    recovery_pct = stats['recovery_pct']
+    long_run_pct = stats['long_run_pct']
 
     st.markdown(f"""
     <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
@@ -413,46 +638,18 @@ def render(colors, activities_df):
     st.markdown("*16-Week Training Block: A Deep Dive into Race Preparation*")
     st.markdown("<br>", unsafe_allow_html=True)
 
-    # Filter RVM 2025 prep data (16 weeks before race day: Oct 12, 2025)
-    rvm_2025_end = pd.to_datetime('2025-10-12')  # Race day
-    rvm_2025_start = rvm_2025_end - pd.Timedelta(weeks=16)  # 16 weeks back
-    rvm_2025_data = yearly_data[(yearly_data['Activity Date'] >= rvm_2025_start) &
-                                 (yearly_data['Activity Date'] <= rvm_2025_end)].copy()
-
-    if len(rvm_2025_data) > 0:
-        # Calculate RVM 2025 metrics
-        rvm_2025_total_distance = rvm_2025_data['Distance'].sum()
-        rvm_2025_total_runs = len(rvm_2025_data)
-        rvm_2025_avg_distance = rvm_2025_data['Distance'].mean()
-        rvm_2025_longest_run = rvm_2025_data['Distance'].max()
-        rvm_2025_weeks = 16  # Exactly 16 weeks
-        rvm_2025_avg_weekly = rvm_2025_total_distance / rvm_2025_weeks
-
-        # Categorize workouts based on activity names and descriptions
-        def categorize_workout(row):
-            name = str(row['Activity Name']).lower()
-            desc = str(row['Activity Description']).lower() if pd.notna(row['Activity Description']) else ''
-
-            if 'zone 2' in name or 'z2' in desc:
-                if 'long' in name:
-                    return 'Long Run (Zone 2)'
-                return 'Easy/Zone 2'
-            elif 'tempo' in name or 'tempo' in desc:
-                return 'Tempo'
-            elif 'track' in name or 'repeats' in name or '800m' in desc or '400m' in desc or '200m' in desc:
-                return 'Track/Intervals'
-            elif 'marathon pace' in name or 'marathon pace' in desc:
-                return 'Marathon Pace'
-            elif 'speedwork' in name or 'hill' in name:
-                return 'Speedwork/Hills'
-            elif 'shakeout' in name:
-                return 'Shakeout'
-            elif row['Distance'] >= 18:
-                return 'Long Run'
-            else:
-                return 'Easy Run'
-
-        rvm_2025_data['Workout_Type'] = rvm_2025_data.apply(categorize_workout, axis=1)
+    # RVM 2025 prep data (16 weeks before race day: Oct 12, 2025)
+    rvm_2025_end = RVM_2025_RACE_DAY
+    rvm_2025_start = rvm_2025_end - pd.Timedelta(weeks=RVM_2025_PREP_WEEKS)
+    prep = stats['prep']
+
+    if prep is not None:
+        rvm_2025_total_distance = prep['total_distance']
+        rvm_2025_total_runs = prep['total_runs']
+        rvm_2025_avg_distance = prep['avg_distance']
+        rvm_2025_longest_run = prep['longest_run']
+        rvm_2025_weeks = RVM_2025_PREP_WEEKS
+        rvm_2025_avg_weekly = prep['avg_weekly']
 
         # RVM 2025 Summary Cards
         st.markdown("### Training Block Summary")
@@ -516,60 +713,15 @@ def render(colors, activities_df):
         st.markdown("### Workout Type Distribution")
         st.markdown("*How training was structured across different workout types*")
 
-        workout_type_counts = rvm_2025_data['Workout_Type'].value_counts()
-        workout_type_distance = rvm_2025_data.groupby('Workout_Type')['Distance'].sum()
-
         col1, col2 = st.columns([1, 1])
 
         with col1:
             # Pie chart by count
-            fig_workout_pie = go.Figure()
-            fig_workout_pie.add_trace(go.Pie(
-                labels=workout_type_counts.index.tolist(),
-                values=workout_type_counts.values.tolist(),
-                marker=dict(
-                    colors=[colors[1], colors[0], '#00ff9f', '#ffaa00', '#ff5555', '#00d9ff', '#b957ff', '#8b3fff'],
-                    line=dict(color='#000000', width=2)
-                ),
-                textfont=dict(size=12, color='white'),
-                hovertemplate="<b>%{label}</b><br>Runs: %{value}<br>Percentage: %{percent}<extra></extra>"
-            ))
-
-            fig_workout_pie.update_layout(
-                title=dict(text="By Number of Runs", font=dict(size=14, color=colors[0])),
-                height=400,
-                paper_bgcolor="black",
-                font=dict(family='Arial', color=colors[0]),
-                legend=dict(font=dict(color=colors[4], size=10)),
-                margin=dict(l=20, r=20, t=50, b=20)
-            )
-
-            st.plotly_chart(fig_workout_pie, use_container_width=True)
+            plotly_chart(PAGE, 'workout_type_count', version, colors, lambda: _workout_type_count_pie(colors), use_container_width=True)
 
         with col2:
             # Pie chart by distance
-            fig_workout_dist_pie = go.Figure()
-            fig_workout_dist_pie.add_trace(go.Pie(
-                labels=workout_type_distance.index.tolist(),
-                values=workout_type_distance.values.tolist(),
-                marker=dict(
-                    colors=[colors[1], colors[0], '#00ff9f', '#ffaa00', '#ff5555', '#00d9ff', '#b957ff', '#8b3fff'],
-                    line=dict(color='#000000', width=2)
-                ),
-                textfont=dict(size=12, color='white'),
-                hovertemplate="<b>%{label}</b><br>Distance: %{value:.1f} km<br>Percentage: %{percent}<extra></extra>"
-            ))
-
-            fig_workout_dist_pie.update_layout(
-                title=dict(text="By Total Distance", font=dict(size=14, color=colors[0])),
-                height=400,
-                paper_bgcolor="black",
-                font=dict(family='Arial', color=colors[0]),
-                legend=dict(font=dict(color=colors[4], size=10)),
-                margin=dict(l=20, r=20, t=50, b=20)
-            )
-
-            st.plotly_chart(fig_workout_dist_pie, use_container_width=True)
+            plotly_chart(PAGE, 'workout_type_distance', version, colors, lambda: _workout_type_distance_pie(colors), use_container_width=True)
 
         # Insights for Workout Type Distribution
         st.markdown(f"""
@@ -596,96 +748,12 @@ def render(colors, activities_df):
         st.markdown("### Weekly Training Progression")
         st.markdown("*Volume and consistency throughout the prep cycle*")
 
-        rvm_2025_data['Week_Start'] = rvm_2025_data['Activity Date'].dt.to_period('W').apply(lambda r: r.start_time)
-        weekly_rvm = rvm_2025_data.groupby('Week_Start').agg({
-            'Distance': 'sum',
-            'Activity ID': 'count'
-        }).reset_index()
-        weekly_rvm.columns = ['Week', 'Distance', 'Runs']
-
-        fig_weekly = make_subplots(specs=[[{"secondary_y": True}]])
-
-        # Distance bars
-        fig_weekly.add_trace(
-            go.Bar(
-                x=weekly_rvm['Week'],
-                y=weekly_rvm['Distance'],
-                name='Weekly Distance',
-                marker=dict(
-                    color=weekly_rvm['Distance'],
-                    colorscale=[[0, colors[1]], [0.5, colors[0]], [1, '#00ff9f']],
-                    line=dict(color=colors[4], width=1)
-                ),
-                text=[f"{dist:.0f}" for dist in weekly_rvm['Distance']],
-                textposition='inside',
-                textfont=dict(size=10, color='#000000', weight='bold'),
-                hovertemplate="<b>Week of %{x|%b %d}</b><br>Distance: %{y:.0f} km<extra></extra>"
-            ),
-            secondary_y=False
-        )
-
-        # Runs line
-        fig_weekly.add_trace(
-            go.Scatter(
-                x=weekly_rvm['Week'],
-                y=weekly_rvm['Runs'],
-                name='Number of Runs',
-                mode='lines+markers',
-                marker=dict(size=10, color='#00ff9f', line=dict(color=colors[4], width=2)),
-                line=dict(width=3, color='#00ff9f'),
-                hovertemplate="<b>Week of %{x|%b %d}</b><br>Runs: %{y}<extra></extra>"
-            ),
-            secondary_y=True
-        )
-
-        fig_weekly.update_xaxes(
-            title_text="Week",
-            title_font=dict(size=14, color=colors[0]),
-            tickfont=dict(size=11, color=colors[4]),
-            showgrid=False
-        )
-
-        fig_weekly.update_yaxes(
-            title_text="Distance (km)",
-            title_font=dict(size=14, color=colors[0]),
-            tickfont=dict(size=12, color=colors[4]),
-            showgrid=True,
-            gridcolor='rgba(0, 217, 255, 0.15)',
-            secondary_y=False
-        )
-
-        fig_weekly.update_yaxes(
-            title_text="Number of Runs",
-            title_font=dict(size=14, color='#00ff9f'),
-            tickfont=dict(size=12, color=colors[4]),
-            showgrid=False,
-            secondary_y=True
-        )
-
-        fig_weekly.update_layout(
-            height=500,
-            plot_bgcolor="black",
-            paper_bgcolor="black",
-            font=dict(family='Arial', color=colors[0]),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5,
-                font=dict(color=colors[4])
-            ),
-            hovermode='x unified',
-            hoverlabel=dict(bgcolor="#0d1f26", font_size=13, bordercolor=colors[1], font_color=colors[4]),
-            margin=dict(l=70, r=70, t=30, b=60)
-        )
-
-        st.plotly_chart(fig_weekly, use_container_width=True)
+        plotly_chart(PAGE, 'prep_weekly', version, colors, lambda: _prep_weekly_figure(colors), use_container_width=True)
 
         # Insights for Weekly Progression
-        peak_week_distance = weekly_rvm['Distance'].max()
-        taper_week_distance = weekly_rvm['Distance'].iloc[-2] if len(weekly_rvm) > 1 else 0
-        avg_weekly_rvm = weekly_rvm['Distance'].mean()
+        peak_week_distance = prep['peak_week_distance']
+        taper_week_distance = prep['taper_week_distance']
+        avg_weekly_rvm = prep['avg_weekly_rvm']
 
         st.markdown(f"""
         <div style='background: linear-gradient(135deg, #0d1f26 0%, #1a0d2e 100%);
@@ -765,7 +833,7 @@ def render(colors, activities_df):
             <h4 style='color: {colors[1]}; font-size: 16px;'>Total Training Time</h4>
             <p style='color: {colors[4]}; font-family: monospace; font-size: 14px; margin: 10px 0;'>
                 Total Time (hours) = Σ(Elapsed Time in seconds) / 3600<br>
-                = {yearly_data['Elapsed Time'].sum():.0f} seconds / 3600<br>
+                = {stats['total_time_s']:.0f} seconds / 3600<br>
                 = {total_time_hours:.2f} hours
             </p>
         </div>
@@ -862,7 +930,7 @@ def render(colors, activities_df):
         """, unsafe_allow_html=True)
 
         # RVM 2025 Prep Specific Metrics
-        if len(rvm_2025_data) > 0:
+        if prep is not None:
             st.markdown(f"""
             <h3 style='color: {colors[0]}; margin-top: 20px;'>6. RVM 2025 Marathon Prep Metrics</h3>
             """, unsafe_allow_html=True)